@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def bench_circle(measure, n):
+    # a polygon with n edges
+    alpha = np.linspace(0.0, 2 * np.pi, n, endpoint=False)
+    points = np.column_stack([np.cos(alpha), np.sin(alpha)])
+    constraints = np.column_stack([np.arange(n), np.roll(np.arange(n), -1)])
+    measure(pygalmesh.generate_2d, points, constraints)
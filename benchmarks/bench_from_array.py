@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+def _labeled_balls(n):
+    # two nested balls with labels 1 and 2 in a unit cube of n³ voxels
+    x = (np.arange(n) + 0.5) / n - 0.5
+    r2 = x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2
+    vol = np.zeros((n, n, n), dtype=np.uint8)
+    vol[r2 < 0.4**2] = 1
+    vol[r2 < 0.2**2] = 2
+    return vol
+
+
+@pytest.mark.parametrize("n", [128, 256, pytest.param(512, marks=pytest.mark.large)])
+def bench_from_array(measure, n):
+    vol = _labeled_balls(n)
+    # The criteria don't depend on the resolution, so that the differences are due to
+    # the size of the image alone.
+    measure(
+        pygalmesh.generate_from_array,
+        vol,
+        (1.0 / n, 1.0 / n, 1.0 / n),
+        max_facet_distance=0.01,
+        max_cell_circumradius=0.1,
+        verbose=False,
+    )
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+import pytest
+
+# Every statement runs in a fresh interpreter; "pass" gives the startup time of the
+# interpreter itself.
+
+
+def _run(statement):
+    subprocess.run([sys.executable, "-c", statement], check=True)
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "pass",
+        "import pygalmesh",
+        "import pygalmesh; pygalmesh.Ball",
+        "import pygalmesh; pygalmesh.generate_mesh",
+    ],
+)
+def bench_import(measure, statement):
+    measure(_run, statement, rounds=10)
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import meshio
+import numpy as np
+import pytest
+
+# The generators hand their results over through a Medit file. This measures that
+# round-trip alone, for a synthetic tetrahedral mesh of the given size.
+
+
+def _round_trip(mesh):
+    fh, outfile = tempfile.mkstemp(suffix=".mesh")
+    os.close(fh)
+    meshio.write(outfile, mesh)
+    out = meshio.read(outfile)
+    os.remove(outfile)
+    return out
+
+
+@pytest.mark.parametrize("num_cells", [100_000, 1_000_000])
+def bench_medit_round_trip(measure, num_cells):
+    rng = np.random.default_rng(0)
+    num_points = num_cells // 5
+    mesh = meshio.Mesh(
+        rng.random((num_points, 3)),
+        [("tetra", rng.integers(0, num_points, size=(num_cells, 4)))],
+        cell_data={"medit:ref": [np.ones(num_cells, dtype=int)]},
+    )
+    measure(_round_trip, mesh)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+def _icosphere(num_subdivisions):
+    t = (1.0 + np.sqrt(5.0)) / 2.0
+    points = np.array(
+        [
+            [-1, t, 0],
+            [1, t, 0],
+            [-1, -t, 0],
+            [1, -t, 0],
+            [0, -1, t],
+            [0, 1, t],
+            [0, -1, -t],
+            [0, 1, -t],
+            [t, 0, -1],
+            [t, 0, 1],
+            [-t, 0, -1],
+            [-t, 0, 1],
+        ]
+    )
+    triangles = np.array(
+        [
+            [0, 11, 5],
+            [0, 5, 1],
+            [0, 1, 7],
+            [0, 7, 10],
+            [0, 10, 11],
+            [1, 5, 9],
+            [5, 11, 4],
+            [11, 10, 2],
+            [10, 7, 6],
+            [7, 1, 8],
+            [3, 9, 4],
+            [3, 4, 2],
+            [3, 2, 6],
+            [3, 6, 8],
+            [3, 8, 9],
+            [4, 9, 5],
+            [2, 4, 11],
+            [6, 2, 10],
+            [8, 6, 7],
+            [9, 8, 1],
+        ]
+    )
+    for _ in range(num_subdivisions):
+        # split every triangle into four at the edge midpoints
+        edges = np.sort(triangles[:, [[0, 1], [1, 2], [2, 0]]].reshape(-1, 2), axis=1)
+        unique_edges, inverse = np.unique(edges, axis=0, return_inverse=True)
+        midpoints = (len(points) + inverse).reshape(-1, 3)
+        points = np.concatenate(
+            [points, 0.5 * (points[unique_edges[:, 0]] + points[unique_edges[:, 1]])]
+        )
+        a, b, c = triangles.T
+        ab, bc, ca = midpoints.T
+        triangles = np.concatenate(
+            [
+                np.column_stack([a, ab, ca]),
+                np.column_stack([ab, b, bc]),
+                np.column_stack([ca, bc, c]),
+                np.column_stack([ab, bc, ca]),
+            ]
+        )
+    points /= np.linalg.norm(points, axis=1)[:, None]
+    return points, triangles
+
+
+# 81920 and 1310720 triangles
+@pytest.mark.parametrize(
+    "num_subdivisions", [6, pytest.param(8, marks=pytest.mark.large)]
+)
+def bench_remesh_surface(measure, num_subdivisions):
+    surface = _icosphere(num_subdivisions)
+    measure(
+        pygalmesh.remesh_surface,
+        surface,
+        min_facet_angle=25.0,
+        max_radius_surface_delaunay_ball=0.05,
+        max_facet_distance=0.005,
+        verbose=False,
+    )
@@ -0,0 +1,62 @@
+import numpy as np
+
+import pygalmesh
+
+
+class PythonBallsUnion(pygalmesh.DomainBase):
+    # the same domain as _native_balls_union(), evaluated in Python
+    def __init__(self):
+        super().__init__()
+
+    def eval(self, x):
+        x = np.asarray(x)
+        return min(
+            np.sqrt((x[0] - 0.5) ** 2 + x[1] ** 2 + x[2] ** 2) - 1.0,
+            np.sqrt((x[0] + 0.5) ** 2 + x[1] ** 2 + x[2] ** 2) - 1.0,
+        )
+
+    def get_bounding_sphere_squared_radius(self):
+        return 1.5**2
+
+
+def _native_balls_union():
+    return pygalmesh.Union(
+        [pygalmesh.Ball([0.5, 0.0, 0.0], 1.0), pygalmesh.Ball([-0.5, 0.0, 0.0], 1.0)]
+    )
+
+
+def _generate(domain):
+    return pygalmesh.generate_mesh(
+        domain,
+        max_radius_surface_delaunay_ball=0.1,
+        max_cell_circumradius=0.1,
+        verbose=False,
+    )
+
+
+def bench_balls_union_native(measure):
+    measure(_generate, _native_balls_union())
+
+
+def bench_balls_union_python(measure):
+    measure(_generate, PythonBallsUnion())
+
+
+def bench_csg(measure):
+    domain = pygalmesh.Difference(
+        pygalmesh.Union(
+            [
+                pygalmesh.Cuboid([-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]),
+                pygalmesh.Ball([0.0, 0.0, 1.0], 0.8),
+            ]
+        ),
+        pygalmesh.Cylinder(-2.0, 2.0, 0.4, 0.05),
+    )
+    measure(
+        pygalmesh.generate_mesh,
+        domain,
+        max_edge_size_at_feature_edges=0.05,
+        max_radius_surface_delaunay_ball=0.1,
+        max_cell_circumradius=0.1,
+        verbose=False,
+    )
@@ -0,0 +1,75 @@
+import resource
+import sys
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--large",
+        action="store_true",
+        default=False,
+        help="also run the large workloads (512³ images, 1M-triangle surfaces)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # the option is missing when collected from the root of the repository
+    if config.getoption("--large", default=False):
+        return
+    skip = pytest.mark.skip(reason="needs --large")
+    for item in items:
+        if "large" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "large: large workload, only run with --large")
+
+
+def _reset_peak_rss():
+    # Linux only; elsewhere, the peak is that of the whole process
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Run `fun(*args, **kwargs)` under the benchmark, `rounds` times without warmup, and
+    record the peak RSS and the size of the resulting mesh in the `extra_info` of the
+    benchmark, which ends up in the saved JSON along with the timings.
+    """
+
+    def run(fun, *args, rounds: int = 3, **kwargs):
+        _reset_peak_rss()
+        result = benchmark.pedantic(
+            fun, args=args, kwargs=kwargs, rounds=rounds, iterations=1
+        )
+        benchmark.extra_info["peak_rss_mb"] = _peak_rss() / 2**20
+
+        mesh = result[0] if isinstance(result, tuple) else result
+        if mesh is not None:
+            benchmark.extra_info["num_points"] = len(mesh.points)
+            benchmark.extra_info["num_cells"] = {
+                cells.type: len(cells.data) for cells in mesh.cells
+            }
+        return result
+
+    return run
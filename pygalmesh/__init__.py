@@ -1,39 +1,51 @@
-# https://github.com/pybind/pybind11/issues/1004
-from _pygalmesh import (
-    Ball,
-    Cone,
-    Cuboid,
-    Cylinder,
-    Difference,
-    DomainBase,
-    Ellipsoid,
-    Extrude,
-    HalfSpace,
-    Intersection,
-    Polygon2D,
-    RingExtrude,
-    Rotate,
-    Scale,
-    Stretch,
-    Tetrahedron,
-    Torus,
-    Translate,
-    Union,
-)
+import importlib
+from typing import TYPE_CHECKING
 
-from . import _cli
-from .__about__ import __cgal_version__, __version__
-from .main import (
-    generate_2d,
-    generate_from_array,
-    generate_from_inr,
-    generate_mesh,
-    generate_periodic_mesh,
-    generate_surface_mesh,
-    generate_volume_mesh_from_surface_mesh,
-    remesh_surface,
-    save_inr,
-)
+if TYPE_CHECKING:
+    # https://github.com/pybind/pybind11/issues/1004
+    from _pygalmesh import (
+        Ball,
+        Cone,
+        Cuboid,
+        Cylinder,
+        Difference,
+        DistanceSizingField2D,
+        DomainBase,
+        Ellipsoid,
+        Extrude,
+        GridSizingField2D,
+        HalfSpace,
+        Intersection,
+        MeshingCancelled,
+        MeshQuality,
+        MultiDomain,
+        Polygon2D,
+        RingExtrude,
+        Rotate,
+        Scale,
+        Stretch,
+        SurfaceMeshDomain,
+        Tetrahedron,
+        Torus,
+        Translate,
+        Union,
+    )
+
+    from . import _cli
+    from .__about__ import __cgal_version__, __version__
+    from ._cache import cache
+    from ._volume import read_volume
+    from .main import (
+        generate_2d,
+        generate_from_array,
+        generate_from_inr,
+        generate_mesh,
+        generate_periodic_mesh,
+        generate_surface_mesh,
+        generate_volume_mesh_from_surface_mesh,
+        remesh_surface,
+        save_inr,
+    )
 
 __all__ = [
     "__version__",
@@ -49,6 +61,7 @@ __all__ = [
     "Intersection",
     "Union",
     "Difference",
+    "MultiDomain",
     "Extrude",
     "Ball",
     "Cuboid",
@@ -60,6 +73,15 @@ __all__ = [
     "HalfSpace",
     "Polygon2D",
     "RingExtrude",
+    "SurfaceMeshDomain",
+    #
+    "GridSizingField2D",
+    "DistanceSizingField2D",
+    #
+    "MeshQuality",
+    "MeshingCancelled",
+    #
+    "cache",
     #
     "generate_mesh",
     "generate_2d",
@@ -70,4 +92,46 @@ __all__ = [
     "generate_from_inr",
     "remesh_surface",
     "save_inr",
+    "read_volume",
 ]
+
+# The extension module, meshio (with all of its formats) and the command-line tools
+# take a while to import, so nothing is imported before it's used: every public name
+# is looked up in the module that defines it on first access.
+_MODULES = {
+    **dict.fromkeys(["__version__", "__cgal_version__"], ".__about__"),
+    "cache": "._cache",
+    "read_volume": "._volume",
+    **dict.fromkeys(
+        [
+            "generate_mesh",
+            "generate_2d",
+            "generate_periodic_mesh",
+            "generate_surface_mesh",
+            "generate_volume_mesh_from_surface_mesh",
+            "generate_from_array",
+            "generate_from_inr",
+            "remesh_surface",
+            "save_inr",
+        ],
+        ".main",
+    ),
+}
+
+
+def __getattr__(name):
+    if name == "_cli":
+        value = importlib.import_module("._cli", __name__)
+    elif name in _MODULES:
+        value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    elif name in __all__:
+        value = getattr(importlib.import_module("_pygalmesh"), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # later lookups don't go through __getattr__ anymore
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+import tempfile
+import zipfile
+from typing import Callable
+
+import meshio
+import numpy as np
+from _pygalmesh import DomainBase
+
+from .__about__ import __cgal_version__, __version__
+
+# bump when the key or the archive layout changes
+_FORMAT_VERSION = 1
+
+_active_cache = None
+
+
+class MeshCache:
+    """
+    On-disk cache of generated meshes. Every mesh is stored as a compressed NumPy
+    archive whose name is the SHA-256 of a canonical serialization of the call: the
+    function, the domain, all criteria, the seed, and the pygalmesh and CGAL versions.
+    Since all generators seed CGAL's random generator, equal calls give equal meshes.
+
+    When the archives in the directory exceed `max_bytes`, the least recently used ones
+    are deleted.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int):
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._previous = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        global _active_cache
+        _active_cache = self._previous
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str) -> meshio.Mesh | None:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                mesh = _unpack(data)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # missing, or a truncated, corrupted or foreign file
+            return None
+        # mark as recently used
+        os.utime(path)
+        return mesh
+
+    def store(self, key: str, mesh: meshio.Mesh):
+        # Write to a temporary file first so that concurrent readers never see
+        # partial archives.
+        fh, tmp = tempfile.mkstemp(prefix=".", suffix=".part", dir=self.directory)
+        with os.fdopen(fh, "wb") as f:
+            np.savez_compressed(f, **_pack(mesh))
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def cache(directory: str | os.PathLike | None, max_bytes: int = 2**30):
+    """
+    Store the meshes of `generate_mesh()`, `generate_from_inr()` and
+    `generate_from_array()` in `directory` and return them from there when the same
+    call is made again. Calls that involve code, i.e., domains defined in Python or
+    sizing fields given as functions, as well as calls with `quality=True`,
+    `stats=True`, or `parallel=True`, are not cached.
+
+    Can be used as a context manager, in which case the previous cache setting is
+    restored on exit. `cache(None)` turns caching off.
+    """
+    global _active_cache
+    if directory is None:
+        _active_cache = None
+        return None
+    mesh_cache = MeshCache(directory, max_bytes)
+    mesh_cache._previous = _active_cache
+    _active_cache = mesh_cache
+    return mesh_cache
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+def _canonical(value):
+    if isinstance(value, DomainBase):
+        serialization = value.get_serialization()
+        if not serialization:
+            raise _Uncacheable()
+        return serialization
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.dtype) or (
+        isinstance(value, type) and issubclass(value, np.generic)
+    ):
+        return np.dtype(value).str
+    raise _Uncacheable()
+
+
+def _file_hash(filename) -> str:
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _array_hash(value) -> dict:
+    vol = np.asarray(value)
+    h = hashlib.sha256()
+    # the values in Fortran order, read without a copy from Fortran-ordered arrays
+    h.update(np.asfortranarray(vol).T.data)
+    return {"dtype": vol.dtype.str, "shape": list(vol.shape), "sha256": h.hexdigest()}
+
+
+def _key(
+    function_name: str,
+    arguments: dict,
+    files: tuple[str, ...],
+    arrays: tuple[str, ...] = (),
+) -> str | None:
+    # parallel meshing isn't reproducible
+    if arguments.get("quality") or arguments.get("stats") or arguments.get("parallel"):
+        return None
+
+    def key_of(name, value):
+        if name in files:
+            return _file_hash(value)
+        if name in arrays:
+            return _array_hash(value)
+        return _canonical(value)
+
+    try:
+        canonical = {
+            name: key_of(name, value)
+            for name, value in arguments.items()
+            if name not in ("verbose", "progress")
+        }
+    except _Uncacheable:
+        return None
+    serialization = json.dumps(
+        {
+            "format": _FORMAT_VERSION,
+            "function": function_name,
+            "arguments": canonical,
+            "pygalmesh": __version__,
+            "cgal": __cgal_version__,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(serialization.encode()).hexdigest()
+
+
+def cached(files: tuple[str, ...] = (), arrays: tuple[str, ...] = ()) -> Callable:
+    """
+    Decorator for mesh generators that looks up the result in the active cache.
+    Arguments named in `files` are file names; they're keyed by the file contents.
+    Arguments named in `arrays` are (large) arrays; they're keyed by their type,
+    shape, and contents.
+    """
+
+    def decorator(fun):
+        signature = inspect.signature(fun)
+
+        @functools.wraps(fun)
+        def wrapper(*args, **kwargs):
+            mesh_cache = _active_cache
+            if mesh_cache is None:
+                return fun(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _key(fun.__name__, bound.arguments, files, arrays)
+            if key is None:
+                return fun(*args, **kwargs)
+
+            mesh = mesh_cache.load(key)
+            if mesh is None:
+                mesh = fun(*args, **kwargs)
+                mesh_cache.store(key, mesh)
+            return mesh
+
+        return wrapper
+
+    return decorator
+
+
+def _pack(mesh: meshio.Mesh) -> dict[str, np.ndarray]:
+    arrays = {"points": mesh.points}
+    for k, cells in enumerate(mesh.cells):
+        arrays[f"cells/{k}/{cells.type}"] = cells.data
+    for name, data in mesh.cell_data.items():
+        for k, d in enumerate(data):
+            arrays[f"cell_data/{k}/{name}"] = d
+    for name, data in mesh.point_data.items():
+        arrays[f"point_data/{name}"] = data
+    return arrays
+
+
+def _unpack(data) -> meshio.Mesh:
+    cells = {}
+    cell_data = {}
+    point_data = {}
+    for name in data.files:
+        parts = name.split("/", 2)
+        if parts[0] == "cells":
+            cells[int(parts[1])] = (parts[2], data[name])
+        elif parts[0] == "cell_data":
+            cell_data.setdefault(parts[2], {})[int(parts[1])] = data[name]
+        elif parts[0] == "point_data":
+            point_data[name.split("/", 1)[1]] = data[name]
+
+    num_blocks = len(cells)
+    return meshio.Mesh(
+        data["points"],
+        [cells[k] for k in range(num_blocks)],
+        point_data=point_data,
+        cell_data={
+            name: [blocks[k] for k in range(num_blocks)]
+            for name, blocks in cell_data.items()
+        },
+    )
@@ -245,6 +245,8 @@ def volume_from_surface(args):
         max_cell_circumradius=args.max_cell_circumradius,
         reorient=args.reorient,
         verbose=not args.quiet,
+        detect_features=args.detect_features,
+        feature_angle=args.feature_angle,
     )
     meshio.write(args.outfile, mesh)
 
@@ -342,6 +344,21 @@ def _cli_volume_from_surface(parser):
         help="automatically fix face orientation (default: False)",
     )
 
+    parser.add_argument(
+        "--detect-features",
+        "-f",
+        action="store_true",
+        default=False,
+        help="detect and protect sharp edges (default: False)",
+    )
+
+    parser.add_argument(
+        "--feature-angle",
+        type=float,
+        default=60.0,
+        help="minimum angle between facet normals at sharp edges (default: 60.0)",
+    )
+
     parser.add_argument(
         "--quiet",
         "-q",
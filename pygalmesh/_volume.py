@@ -0,0 +1,339 @@
+"""
+Readers for the volume image formats that scans come in: INR, NRRD and NIfTI-1.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import pathlib
+import struct
+import sys
+
+import numpy as np
+
+# file name suffixes -> format
+_SUFFIXES = {
+    ".inr": "inr",
+    ".inr.gz": "inr",
+    ".nrrd": "nrrd",
+    ".nhdr": "nrrd",
+    ".nii": "nifti",
+    ".nii.gz": "nifti",
+}
+
+
+def _format(path: pathlib.Path) -> str | None:
+    name = path.name.lower()
+    for suffix, fmt in _SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def read_volume(
+    path: str | os.PathLike,
+) -> tuple[np.ndarray, tuple[float, float, float], np.ndarray]:
+    """
+    Read a 3D image from an INR (`.inr`, `.inr.gz`), NRRD (`.nrrd`, `.nhdr`) or NIfTI-1
+    (`.nii`, `.nii.gz`) file. Returns the voxel values as an array `vol`, the voxel
+    size, and the 4x4 `affine` that places `vol[i, j, k]` at
+    `affine @ ((i, j, k) * voxel_size, 1)` in world coordinates. The latter is a rigid
+    transformation (rotation, reflection and translation), as `generate_from_array()`
+    takes it; images with sheared voxel axes are rejected.
+
+    NIfTI values are scaled with `scl_slope` and `scl_inter` if the header says so.
+    Otherwise, uncompressed data in native byte order isn't read, but memory-mapped
+    (read-only); the volume is only loaded where it's accessed.
+    """
+    path = pathlib.Path(path)
+    fmt = _format(path)
+    if fmt == "inr":
+        return _read_inr(path)
+    if fmt == "nrrd":
+        return _read_nrrd(path)
+    if fmt == "nifti":
+        return _read_nifti(path)
+    raise ValueError(f"Unknown volume file format: {path}")
+
+
+def _affine(linear, origin, path):
+    # Split the linear part of an index-to-world map into the voxel size and a rigid
+    # 4x4 matrix, as generate_from_array() takes them.
+    linear = np.asarray(linear, dtype=float)
+    voxel_size = np.linalg.norm(linear, axis=0)
+    if np.any(voxel_size == 0.0):
+        raise ValueError(f"{path} has a voxel size of 0")
+    rotation = linear / voxel_size
+    # headers store the directions in single precision, or rounded
+    if not np.allclose(rotation.T @ rotation, np.eye(3), atol=1.0e-4):
+        raise ValueError(f"The voxel axes of {path} aren't orthogonal")
+    u, _, vt = np.linalg.svd(rotation)
+    affine = np.eye(4)
+    affine[:3, :3] = u @ vt
+    affine[:3, 3] = origin
+    return tuple(float(h) for h in voxel_size), affine
+
+
+def _data(
+    path: pathlib.Path,
+    offset: int,
+    dtype: np.dtype,
+    shape: tuple[int, int, int],
+    compressed: bool,
+) -> np.ndarray:
+    # voxels are stored with x varying fastest, i.e., in Fortran order
+    if compressed:
+        with gzip.open(path, "rb") as f:
+            f.seek(offset)
+            buffer = f.read(int(np.prod(shape)) * dtype.itemsize)
+        vol = np.frombuffer(buffer, dtype=dtype).reshape(shape, order="F")
+    else:
+        vol = np.memmap(
+            path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F"
+        )
+    if not dtype.isnative:
+        vol = vol.astype(dtype.newbyteorder("="), order="F")
+    return vol
+
+
+def _read_inr(path):
+    compressed = path.name.lower().endswith(".gz")
+    opener = gzip.open if compressed else open
+    with opener(path, "rb") as f:
+        header = f.read(256)
+        if not header.startswith(b"#INRIMAGE-4#{"):
+            raise ValueError(f"{path} isn't an INR file")
+        # the header is a multiple of 256 bytes, ended by "##}\n"
+        while b"##}\n" not in header:
+            block = f.read(256)
+            if len(block) < 256:
+                raise ValueError(f"The INR header of {path} is truncated")
+            header += block
+
+    fields = {}
+    for line in header.decode("ascii", errors="replace").splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            fields[key.strip()] = value.strip()
+
+    shape = (int(fields["XDIM"]), int(fields["YDIM"]), int(fields["ZDIM"]))
+    if int(fields.get("VDIM", 1)) != 1:
+        raise ValueError(f"{path} has vectorial voxels (VDIM={fields['VDIM']})")
+    bits = int(fields["PIXSIZE"].split()[0])
+    kind = {"unsigned fixed": "u", "signed fixed": "i", "float": "f"}[fields["TYPE"]]
+    byteorder = ">" if fields.get("CPU", "decm") in ["sun", "sgi"] else "<"
+    dtype = np.dtype(f"{byteorder}{kind}{bits // 8}")
+
+    voxel_size = tuple(float(fields.get(key, 1.0)) for key in ["VX", "VY", "VZ"])
+    affine = np.eye(4)
+    affine[:3, 3] = [
+        float(fields.get(key, fields.get(alt, 0.0)))
+        for key, alt in [("XO", "TX"), ("YO", "TY"), ("ZO", "TZ")]
+    ]
+    vol = _data(path, len(header), dtype, shape, compressed)
+    return vol, voxel_size, affine
+
+
+_NRRD_TYPES = {
+    **dict.fromkeys(["signed char", "int8", "int8_t"], "i1"),
+    **dict.fromkeys(["uchar", "unsigned char", "uint8", "uint8_t"], "u1"),
+    **dict.fromkeys(
+        ["short", "short int", "signed short", "signed short int", "int16", "int16_t"],
+        "i2",
+    ),
+    **dict.fromkeys(
+        [
+            "ushort",
+            "unsigned short",
+            "unsigned short int",
+            "uint16",
+            "uint16_t",
+        ],
+        "u2",
+    ),
+    **dict.fromkeys(["int", "signed int", "int32", "int32_t"], "i4"),
+    **dict.fromkeys(["uint", "unsigned int", "uint32", "uint32_t"], "u4"),
+    **dict.fromkeys(
+        [
+            "longlong",
+            "long long",
+            "long long int",
+            "signed long long",
+            "signed long long int",
+            "int64",
+            "int64_t",
+        ],
+        "i8",
+    ),
+    **dict.fromkeys(
+        [
+            "ulonglong",
+            "unsigned long long",
+            "unsigned long long int",
+            "uint64",
+            "uint64_t",
+        ],
+        "u8",
+    ),
+    "float": "f4",
+    "double": "f8",
+}
+
+
+def _read_nrrd(path):
+    fields = {}
+    with open(path, "rb") as f:
+        magic = f.readline()
+        if not magic.startswith(b"NRRD"):
+            raise ValueError(f"{path} isn't an NRRD file")
+        # the header ends with an empty line (or the end of detached headers)
+        for raw_line in f:
+            line = raw_line.decode("ascii", errors="replace").rstrip("\r\n")
+            if not line:
+                break
+            if line.startswith("#"):
+                continue
+            key, sep, value = line.partition(": ")
+            if sep:
+                fields[key.strip().lower()] = value.strip()
+        data_offset = f.tell()
+
+    if int(fields["dimension"]) != 3:
+        raise ValueError(f"{path} isn't three-dimensional")
+    shape = tuple(int(n) for n in fields["sizes"].split())
+    dtype = np.dtype(_NRRD_TYPES[fields["type"]])
+    if dtype.itemsize > 1:
+        byteorder = {"little": "<", "big": ">"}[fields.get("endian", sys.byteorder)]
+        dtype = dtype.newbyteorder(byteorder)
+
+    encoding = fields.get("encoding", "raw")
+    if encoding not in ["raw", "gzip", "gz"]:
+        raise ValueError(f"Unsupported NRRD encoding: {encoding}")
+    if int(fields.get("byte skip", 0)) != 0 or int(fields.get("line skip", 0)) != 0:
+        raise ValueError("NRRD files with byte or line skips aren't supported")
+
+    if "data file" in fields:
+        data_path = path.parent / fields["data file"]
+        data_offset = 0
+    else:
+        data_path = path
+
+    if "space origin" in fields:
+        origin = [float(c) for c in fields["space origin"].strip("()").split(",")]
+    else:
+        origin = [0.0, 0.0, 0.0]
+
+    # the space directions are the (world) steps along the axes, i.e., the columns of
+    # the linear part
+    if "space directions" in fields:
+        directions = [
+            [float(c) for c in d.strip("()").split(",")]
+            for d in fields["space directions"].split()
+        ]
+        if len(directions) != 3 or any(len(d) != 3 for d in directions):
+            raise ValueError(f"{path} isn't in a three-dimensional space")
+        linear = np.transpose(directions)
+    elif "spacings" in fields:
+        linear = np.diag([float(h) for h in fields["spacings"].split()])
+    else:
+        linear = np.eye(3)
+    voxel_size, affine = _affine(linear, origin, path)
+
+    if encoding == "raw":
+        vol = _data(data_path, data_offset, dtype, shape, False)
+    else:
+        # gzip streams can't be memory-mapped; decompress from the data offset on
+        with open(data_path, "rb") as f:
+            f.seek(data_offset)
+            buffer = gzip.decompress(f.read())
+        vol = np.frombuffer(buffer, dtype=dtype).reshape(shape, order="F")
+        if not dtype.isnative:
+            vol = vol.astype(dtype.newbyteorder("="), order="F")
+    return vol, voxel_size, affine
+
+
+_NIFTI_TYPES = {
+    2: "u1",
+    4: "i2",
+    8: "i4",
+    16: "f4",
+    64: "f8",
+    256: "i1",
+    512: "u2",
+    768: "u4",
+    1024: "i8",
+    1280: "u8",
+}
+
+
+def _read_nifti(path):
+    compressed = path.name.lower().endswith(".gz")
+    opener = gzip.open if compressed else open
+    with opener(path, "rb") as f:
+        header = f.read(348)
+    if len(header) < 348:
+        raise ValueError(f"{path} isn't a NIfTI-1 file")
+
+    # sizeof_hdr is 348; it tells the byte order
+    for byteorder in "<>":
+        if struct.unpack(f"{byteorder}i", header[:4])[0] == 348:
+            break
+    else:
+        raise ValueError(f"{path} isn't a NIfTI-1 file")
+
+    def unpack(fmt, offset):
+        return struct.unpack_from(byteorder + fmt, header, offset)
+
+    dim = unpack("8h", 40)
+    if dim[0] < 3 or any(n != 1 for n in dim[4 : dim[0] + 1]):
+        raise ValueError(f"{path} isn't three-dimensional")
+    shape = tuple(dim[1:4])
+    datatype = unpack("h", 70)[0]
+    if datatype not in _NIFTI_TYPES:
+        raise ValueError(f"Unsupported NIfTI data type: {datatype}")
+    dtype = np.dtype(byteorder + _NIFTI_TYPES[datatype])
+    pixdim = unpack("8f", 76)
+    vox_offset = int(unpack("f", 108)[0])
+    scl_slope, scl_inter = unpack("2f", 112)
+
+    # the index-to-world map from the sform if there's one, from the qform otherwise
+    qform_code, sform_code = unpack("2h", 252)
+    if sform_code > 0:
+        srow = np.array(unpack("12f", 280)).reshape(3, 4)
+        voxel_size, affine = _affine(srow[:, :3], srow[:, 3], path)
+    elif qform_code > 0:
+        b, c, d = unpack("3f", 256)
+        a = np.sqrt(max(1.0 - (b * b + c * c + d * d), 0.0))
+        rotation = np.array(
+            [
+                [
+                    a * a + b * b - c * c - d * d,
+                    2 * (b * c - a * d),
+                    2 * (b * d + a * c),
+                ],
+                [
+                    2 * (b * c + a * d),
+                    a * a + c * c - b * b - d * d,
+                    2 * (c * d - a * b),
+                ],
+                [
+                    2 * (b * d - a * c),
+                    2 * (c * d + a * b),
+                    a * a + d * d - c * c - b * b,
+                ],
+            ]
+        )
+        # pixdim[0] is qfac, -1 for left-handed voxel axes
+        qfac = -1.0 if pixdim[0] < 0.0 else 1.0
+        linear = rotation * [pixdim[1], pixdim[2], qfac * pixdim[3]]
+        voxel_size, affine = _affine(linear, unpack("3f", 268), path)
+    else:
+        voxel_size, affine = _affine(np.diag(np.abs(pixdim[1:4])), [0.0] * 3, path)
+
+    vol = _data(path, vox_offset, dtype, shape, compressed)
+    # a slope of 0 (or NaN) means that the values aren't scaled
+    if not np.isfinite(scl_inter):
+        scl_inter = 0.0
+    if np.isfinite(scl_slope) and scl_slope != 0.0 and (scl_slope, scl_inter) != (1, 0):
+        vol = vol * np.float64(scl_slope) + np.float64(scl_inter)
+    return vol, voxel_size, affine
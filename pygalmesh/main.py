@@ -3,21 +3,38 @@ from __future__ import annotations
 import math
 import os
 import tempfile
+import time
+import warnings
 from typing import Callable
 
 import meshio
 import numpy as np
 from _pygalmesh import (
+    _PARALLEL_MESHING,
+    MeshQuality,
+    MeshStats,
+    MultiDomain,
+    ProgressBase,
     SizingFieldBase,
+    SurfaceMeshDomain,
+    _downsample_image,
     _generate_2d,
-    _generate_from_inr,
-    _generate_from_inr_with_subdomain_sizing,
-    _generate_from_off,
+    _generate_from_gray_image,
+    _generate_from_labeled_image,
+    _generate_from_surface_mesh_domain,
     _generate_mesh,
     _generate_periodic_mesh,
+    _generate_periodic_mesh_arrays,
     _generate_surface_mesh,
-    _remesh_surface,
+    _relabel_image,
+    _remesh_surface_domain,
+    _reorder_points,
+    _smooth_image,
 )
+from numpy.typing import ArrayLike, DTypeLike
+
+from ._cache import cached
+from ._volume import read_volume
 
 
 class Wrapper(SizingFieldBase):
@@ -29,6 +46,185 @@ class Wrapper(SizingFieldBase):
         return self.f(x)
 
 
+class ProgressWrapper(ProgressBase):
+    def __init__(self, f):
+        self.f = f
+        super().__init__()
+
+    def update(self, phase, num_vertices, num_cells, elapsed):
+        event = {
+            "phase": phase,
+            "num_vertices": None if num_vertices < 0 else num_vertices,
+            "num_cells": None if num_cells < 0 else num_cells,
+            "elapsed": elapsed,
+        }
+        return self.f(event) is not False
+
+
+def _progress(progress):
+    return None if progress is None else ProgressWrapper(progress)
+
+
+def _stats_dict(mesh_stats: MeshStats, read_time: float, total_time: float) -> dict:
+    return {
+        "phase_times": dict(mesh_stats.phase_times),
+        "domain_evals": mesh_stats.domain_evals.count,
+        "domain_eval_time": mesh_stats.domain_evals.time,
+        "sizing_field_evals": mesh_stats.sizing_field_evals.count,
+        "sizing_field_eval_time": mesh_stats.sizing_field_evals.time,
+        "python_calls": mesh_stats.python_calls.count,
+        "python_time": mesh_stats.python_calls.time,
+        "max_num_vertices": mesh_stats.max_num_vertices,
+        "num_vertices": mesh_stats.num_vertices,
+        "num_cells": mesh_stats.num_cells,
+        "output_time": mesh_stats.output_time + read_time,
+        "total_time": total_time,
+    }
+
+
+def _check_parallel(parallel: bool):
+    if parallel and not _PARALLEL_MESHING:
+        warnings.warn(
+            "pygalmesh was built without TBB, meshing sequentially", stacklevel=3
+        )
+
+
+def _world_affine(origin, affine):
+    # The 4x4 matrix that maps image coordinates, (i, j, k) * voxel_size, to world
+    # coordinates; None for the identity. The linear part must be orthogonal (a
+    # rotation, possibly with a reflection) so that the mesh sizes are the same in both.
+    if origin is not None and affine is not None:
+        raise ValueError("Specify either origin or affine, not both.")
+    if affine is not None:
+        affine = np.array(affine, dtype=float)
+        if affine.shape != (4, 4) or not np.allclose(affine[3], [0.0, 0.0, 0.0, 1.0]):
+            raise ValueError(
+                "affine must be a 4x4 matrix with the last row 0, 0, 0, 1."
+            )
+        linear = affine[:3, :3]
+        if not np.allclose(linear.T @ linear, np.eye(3), atol=1.0e-6):
+            raise ValueError(
+                "The linear part of affine must be orthogonal; "
+                "scale the image with voxel_size."
+            )
+        return affine
+    if origin is not None:
+        affine = np.eye(4)
+        affine[:3, 3] = origin
+        return affine
+    return None
+
+
+def _transform(affine):
+    # the image-to-world map as the C++ code takes it
+    return [] if affine is None else affine[:3].ravel().tolist()
+
+
+def _output_subdomains(output, output_subdomains):
+    # the output selection as the C++ code takes it
+    if output not in ["both", "surface", "volume"]:
+        raise ValueError(
+            f'output must be "both", "surface", or "volume", not "{output}".'
+        )
+    if output_subdomains is None:
+        return []
+    if len(output_subdomains) == 0:
+        raise ValueError("output_subdomains must not be empty.")
+    return [int(index) for index in output_subdomains]
+
+
+def _orient(out, affine):
+    # Reflections turn the cells inside out; turn them back.
+    if affine is not None and np.linalg.det(affine[:3, :3]) < 0.0:
+        mesh = out[0] if isinstance(out, tuple) else out
+        for cell_block in mesh.cells:
+            cell_block.data[:, [0, 1]] = cell_block.data[:, [1, 0]]
+    return out
+
+
+def _reorder(mesh, reorder, mesh_quality=None):
+    # Renumber the points for locality, and sort the cells by their smallest point
+    # index (stably, so that cells with the same one stay in order). The quality
+    # measures of the tetrahedra are sorted along.
+    if reorder is None:
+        return mesh
+    order = _reorder_points(mesh.points, [c.data for c in mesh.cells], reorder)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+
+    mesh.points = mesh.points[order]
+    for name, data in mesh.point_data.items():
+        mesh.point_data[name] = data[order]
+    for k, cell_block in enumerate(mesh.cells):
+        data = new_index[cell_block.data]
+        cell_order = np.argsort(data.min(axis=1), kind="stable")
+        cell_block.data = data[cell_order]
+        for values in mesh.cell_data.values():
+            values[k] = values[k][cell_order]
+        if mesh_quality is not None and cell_block.type == "tetra":
+            mesh_quality._permute(cell_order)
+    return mesh
+
+
+def _cast(mesh, dtype, index_dtype):
+    # Convert the points and the cells of the mesh to the requested types, in place.
+    # Arrays that have the type already aren't copied.
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+        if dtype.kind != "f":
+            raise ValueError(f"dtype must be a floating-point type, not {dtype}.")
+        mesh.points = mesh.points.astype(dtype, copy=False)
+    if index_dtype is not None:
+        index_dtype = np.dtype(index_dtype)
+        if index_dtype.kind not in "iu":
+            raise ValueError(f"index_dtype must be an integer type, not {index_dtype}.")
+        if len(mesh.points) - 1 > np.iinfo(index_dtype).max:
+            raise ValueError(
+                f"The indices of the {len(mesh.points)} points of the mesh "
+                f"don't fit into {index_dtype}."
+            )
+        for cell_block in mesh.cells:
+            cell_block.data = cell_block.data.astype(index_dtype, copy=False)
+    return mesh
+
+
+def _read_output(
+    outfile,
+    mesh_quality,
+    mesh_stats,
+    start_time,
+    reorder=None,
+    dtype=None,
+    index_dtype=None,
+):
+    read_start = time.perf_counter()
+    mesh = meshio.read(outfile)
+    mesh = _cast(_reorder(mesh, reorder, mesh_quality), dtype, index_dtype)
+    os.remove(outfile)
+
+    extras = []
+    if mesh_quality is not None:
+        extras.append(mesh_quality)
+    if mesh_stats is not None:
+        end = time.perf_counter()
+        extras.append(_stats_dict(mesh_stats, end - read_start, end - start_time))
+    return (mesh, *extras) if extras else mesh
+
+
+def _surface_mesh_domain(
+    surface: str | SurfaceMeshDomain | tuple[ArrayLike, ArrayLike], reorient: bool
+) -> SurfaceMeshDomain:
+    if isinstance(surface, SurfaceMeshDomain):
+        return surface
+    if isinstance(surface, tuple):
+        points, triangles = surface
+    else:
+        mesh = meshio.read(surface)
+        points, triangles = mesh.points, mesh.get_cells_type("triangle")
+    return SurfaceMeshDomain(points, triangles, reorient=reorient)
+
+
+@cached()
 def generate_mesh(
     domain,
     extra_feature_edges: list | None = None,
@@ -47,6 +243,13 @@ def generate_mesh(
     exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    quality: bool = False,
+    detect_features: bool = False,
+    progress: Callable[[dict], bool | None] | None = None,
+    stats: bool = False,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
     """
     From <https://doc.cgal.org/latest/Mesh_3/classCGAL_1_1Mesh__criteria__3.html>:
@@ -69,15 +272,48 @@ def generate_mesh(
     max_cell_circumradius:
         a scalar field (resp. a constant) describing a space varying (resp. a uniform)
         upper-bound for the circumradii of the mesh tetrahedra.
+
+    quality:
+        also return a `MeshQuality` with per-tetrahedron measures and histograms.
+    detect_features:
+        protect the creases of combined domains; needs a positive constant
+        `max_edge_size_at_feature_edges`.
+    progress:
+        called with a dict with the `phase`, the numbers of vertices and cells, and the
+        `elapsed` time; returning `False` raises `MeshingCancelled`.
+    stats:
+        also return a dict with the timings and evaluation counts of the run, after the
+        mesh and the quality.
+    dtype, index_dtype:
+        the types of the points and of the cells of the returned mesh, by default
+        float64 and int64.
+    reorder:
+        `"hilbert"` or `"rcm"` to renumber the points for locality and sort the cells
+        (and the quality measures) along; by default, the order is CGAL's.
+
+    A `MultiDomain([(domain, label, cell_size, facet_size), ...])` meshes several
+    labeled parts at once, each with its own sizes; see the README.
     """
+    if detect_features and not (
+        isinstance(max_edge_size_at_feature_edges, (int, float))
+        and not isinstance(max_edge_size_at_feature_edges, bool)
+        and max_edge_size_at_feature_edges > 0.0
+    ):
+        raise ValueError(
+            "detect_features needs a positive constant max_edge_size_at_feature_edges"
+        )
+
     extra_feature_edges = [] if extra_feature_edges is None else extra_feature_edges
+    start_time = time.perf_counter()
+    mesh_quality = MeshQuality() if quality else None
+    mesh_stats = MeshStats() if stats else None
 
     fh, outfile = tempfile.mkstemp(suffix=".mesh")
     os.close(fh)
 
     def _select(obj):
-        if isinstance(obj, float):
-            return obj, None
+        if isinstance(obj, (int, float)) and not isinstance(obj, bool):
+            return float(obj), None
         assert callable(obj)
         return -1.0, Wrapper(obj)
 
@@ -108,6 +344,7 @@ def generate_mesh(
         domain,
         outfile,
         extra_feature_edges=extra_feature_edges,
+        detect_features=detect_features,
         bounding_sphere_radius=bounding_sphere_radius,
         lloyd=lloyd,
         odt=odt,
@@ -127,23 +364,51 @@ def generate_mesh(
         exude_sliver_bound=exude_sliver_bound,
         verbose=verbose,
         seed=seed,
+        quality=mesh_quality,
+        progress=_progress(progress),
+        stats=mesh_stats,
     )
 
-    mesh = meshio.read(outfile)
-    os.remove(outfile)
-    return mesh
+    return _read_output(
+        outfile, mesh_quality, mesh_stats, start_time, reorder, dtype, index_dtype
+    )
 
 
 def generate_2d(
-    points,
-    constraints,
+    points: ArrayLike,
+    constraints: ArrayLike,
     B: float = math.sqrt(2),
-    max_edge_size: float = 0.0,
+    max_edge_size: float | Callable | SizingFieldBase = 0.0,
     num_lloyd_steps: int = 0,
+    seeds: ArrayLike | None = None,
+    holes: ArrayLike | None = None,
+    region_max_edge_size: ArrayLike | None = None,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
+    """
+    `points` and `constraints` are arrays of shape (n, 2); they're passed to CGAL
+    without copying if they're C-contiguous and of dtype float64 and int64,
+    respectively. Likewise, the arrays of the output mesh aren't copied.
+
+    `max_edge_size` is either a number, a function that takes a point `[x, y]` and
+    returns the bound there, or a sizing field such as `pygalmesh.GridSizingField2D` or
+    `pygalmesh.DistanceSizingField2D`. The latter are evaluated without calling into
+    Python, which is a lot faster for fine meshes. A bound of 0 means no bound.
+
+    The domain consists of all regions enclosed by constraints, except those that
+    contain one of the `holes`. With `seeds`, several regions can be meshed at once: the
+    triangles in the region that contains `seeds[k]` get the id `k + 1` in
+    `mesh.cell_data["region"]`, those in regions without a seed 0.
+    `region_max_edge_size[k]`, if positive, is the edge size bound in the region of
+    `seeds[k]`; it's combined with `max_edge_size`, the smaller one wins.
+
+    For `reorder`, `dtype`, and `index_dtype`, see `generate_mesh()`.
+    """
     # some sanity checks
-    points = np.asarray(points)
-    constraints = np.asarray(constraints)
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    constraints = np.ascontiguousarray(constraints, dtype=np.int64)
     assert np.all(constraints >= 0)
     assert np.all(constraints < len(points))
     # make sure there are no edges of 0 length
@@ -152,14 +417,42 @@ def generate_2d(
     if np.any(length2 < 1.0e-15):
         raise RuntimeError("Constraint of (near)-zero length.")
 
-    points, cells = _generate_2d(
+    if isinstance(max_edge_size, SizingFieldBase):
+        max_edge_size_value, max_edge_size_field = 0.0, max_edge_size
+    elif callable(max_edge_size):
+        f = max_edge_size
+        max_edge_size_value, max_edge_size_field = 0.0, Wrapper(lambda x: f(x[:2]))
+    else:
+        max_edge_size_value, max_edge_size_field = float(max_edge_size), None
+
+    seeds_array = np.ascontiguousarray(
+        np.zeros((0, 2)) if seeds is None else seeds, dtype=np.float64
+    ).reshape(-1, 2)
+    holes_array = np.ascontiguousarray(
+        np.zeros((0, 2)) if holes is None else holes, dtype=np.float64
+    ).reshape(-1, 2)
+    if region_max_edge_size is None:
+        region_max_edge_size = np.zeros(len(seeds_array))
+    region_max_edge_size = np.ascontiguousarray(region_max_edge_size, dtype=np.float64)
+    if region_max_edge_size.shape != (len(seeds_array),):
+        raise ValueError("Need one region_max_edge_size per seed.")
+
+    points, cells, regions = _generate_2d(
         points,
         constraints,
         B,
-        max_edge_size,
+        max_edge_size_value,
+        max_edge_size_field,
         num_lloyd_steps,
+        seeds_array,
+        region_max_edge_size,
+        holes_array,
     )
-    return meshio.Mesh(np.array(points), {"triangle": np.array(cells)})
+    if seeds is None:
+        mesh = meshio.Mesh(points, {"triangle": cells})
+    else:
+        mesh = meshio.Mesh(points, {"triangle": cells}, cell_data={"region": [regions]})
+    return _cast(_reorder(mesh, reorder), dtype, index_dtype)
 
 
 def generate_periodic_mesh(
@@ -178,7 +471,68 @@ def generate_periodic_mesh(
     number_of_copies_in_output: int = 1,
     verbose: bool = True,
     seed: int = 0,
+    periodic_data: bool = False,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
+    """
+    With `periodic_data=True`, the mesh of one period is taken directly from the
+    periodic triangulation instead of going through a file, and returned along with a
+    dict of arrays describing its periodicity:
+
+      * `points` (n, 3): every vertex once,
+      * `cells` (m, 4) and `offsets` (m, 4, 3): vertex `j` of cell `k` is at
+        `points[cells[k, j]] + offsets[k, j] * period`,
+      * `node_pairs` (p, 2): the pairs (vertex, copy) of vertices of the returned mesh
+        that are identified by periodicity, the copy being at the position of the vertex
+        shifted by `node_pair_offsets` (p, 3) periods.
+
+    The first n points of the returned mesh are `points`. The cells are tagged with
+    their subdomain in `cell_data["medit:ref"]`.
+
+    For `reorder`, `dtype`, and `index_dtype`, see `generate_mesh()`; `dtype` and
+    `index_dtype` apply to `points`, and to `cells` and `node_pairs`, respectively, as
+    well. `reorder` isn't supported with `periodic_data=True`.
+    """
+    if periodic_data:
+        if number_of_copies_in_output != 1:
+            raise ValueError("periodic_data requires number_of_copies_in_output=1")
+        if reorder is not None:
+            raise ValueError("periodic_data doesn't support reorder")
+        arrays = _generate_periodic_mesh_arrays(
+            domain,
+            bounding_cuboid,
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
+            max_facet_distance=max_facet_distance,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            max_cell_circumradius=max_cell_circumradius,
+            verbose=verbose,
+            seed=seed,
+        )
+        mesh = meshio.Mesh(
+            arrays["unrolled_points"],
+            [("tetra", arrays["unrolled_cells"])],
+            cell_data={"medit:ref": [arrays["subdomains"]]},
+        )
+        mesh = _cast(mesh, dtype, index_dtype)
+        periodic = {
+            key: arrays[key]
+            for key in ["points", "cells", "offsets", "node_pairs", "node_pair_offsets"]
+        }
+        if dtype is not None:
+            periodic["points"] = periodic["points"].astype(dtype, copy=False)
+        if index_dtype is not None:
+            for key in ["cells", "node_pairs"]:
+                periodic[key] = periodic[key].astype(index_dtype, copy=False)
+        return mesh, periodic
+
     fh, outfile = tempfile.mkstemp(suffix=".mesh")
     os.close(fh)
 
@@ -205,7 +559,7 @@ def generate_periodic_mesh(
 
     mesh = meshio.read(outfile)
     os.remove(outfile)
-    return mesh
+    return _cast(_reorder(mesh, reorder), dtype, index_dtype)
 
 
 def generate_surface_mesh(
@@ -216,7 +570,13 @@ def generate_surface_mesh(
     max_facet_distance: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
+    """
+    For `reorder`, `dtype`, and `index_dtype`, see `generate_mesh()`.
+    """
     fh, outfile = tempfile.mkstemp(suffix=".off")
     os.close(fh)
 
@@ -233,11 +593,11 @@ def generate_surface_mesh(
 
     mesh = meshio.read(outfile)
     os.remove(outfile)
-    return mesh
+    return _cast(_reorder(mesh, reorder), dtype, index_dtype)
 
 
 def generate_volume_mesh_from_surface_mesh(
-    filename: str,
+    filename: str | SurfaceMeshDomain | MultiDomain | tuple[ArrayLike, ArrayLike],
     lloyd: bool = False,
     odt: bool = False,
     perturb: bool = True,
@@ -253,18 +613,94 @@ def generate_volume_mesh_from_surface_mesh(
     verbose: bool = True,
     reorient: bool = False,
     seed: int = 0,
+    quality: bool = False,
+    detect_features: bool = False,
+    feature_angle: float = 60.0,
+    extra_feature_edges: list | None = None,
+    progress: Callable[[dict], bool | None] | None = None,
+    stats: bool = False,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
-    mesh = meshio.read(filename)
+    """
+    detect_features:
+        protect the sharp edges and the borders of the surface. An edge is sharp if
+        the normals of its two adjacent facets differ by more than `feature_angle`
+        degrees. Protected edges are sampled first, so the facet criteria don't need
+        to resolve them by refinement, which keeps element counts low for CAD-like
+        inputs. Set `max_edge_size_at_feature_edges` to a positive value when feature
+        protection is used.
+    extra_feature_edges:
+        a list of polylines, given as arrays of shape (k, 3), to protect in addition
+        to the detected features.
 
-    fh, off_file = tempfile.mkstemp(suffix=".off")
-    os.close(fh)
-    meshio.write(off_file, mesh)
+    Instead of a file name, `filename` can also be a tuple `(points, triangles)` of
+    arrays of shape (n, 3) and (m, 3); the surface is then built directly from the
+    array buffers without going through any file.
+
+    It can also be a `SurfaceMeshDomain`. Its polyhedron and the CGAL mesh domain built
+    from it (including the AABB tree) are then kept in memory and reused by subsequent
+    calls, so repeated meshing of the same surface with different criteria skips all
+    I/O and setup. In this case, `reorient` has no effect; pass it to the
+    `SurfaceMeshDomain` constructor instead.
+
+    Several closed surfaces are meshed together, with a label and sizes each, by passing
+    a `MultiDomain` of `SurfaceMeshDomain`s (see `generate_mesh()`). The volumes they
+    bound are then meshed as implicit domains; their creases are only protected if
+    given in `extra_feature_edges`, and `detect_features` protects the curves where
+    the surfaces intersect, including those between two parts. `feature_angle` and
+    `reorient` don't apply and raise a `ValueError`.
+
+    For `progress`, `stats`, `reorder`, `dtype`, and `index_dtype`, see
+    `generate_mesh()`.
+    """
+    if isinstance(filename, MultiDomain):
+        if reorient:
+            raise ValueError(
+                "reorient has no effect on a MultiDomain; "
+                "pass it to the SurfaceMeshDomain constructors instead."
+            )
+        if feature_angle != 60.0:
+            raise ValueError(
+                "feature_angle has no effect on a MultiDomain; "
+                "sharp edges of its surfaces aren't detected."
+            )
+        return generate_mesh(
+            filename,
+            extra_feature_edges=extra_feature_edges,
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
+            max_facet_distance=max_facet_distance,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            max_cell_circumradius=max_cell_circumradius,
+            exude_time_limit=exude_time_limit,
+            exude_sliver_bound=exude_sliver_bound,
+            verbose=verbose,
+            seed=seed,
+            quality=quality,
+            detect_features=detect_features,
+            progress=progress,
+            stats=stats,
+            reorder=reorder,
+            dtype=dtype,
+            index_dtype=index_dtype,
+        )
+
+    start_time = time.perf_counter()
+    mesh_quality = MeshQuality() if quality else None
+    mesh_stats = MeshStats() if stats else None
 
     fh, outfile = tempfile.mkstemp(suffix=".mesh")
     os.close(fh)
 
-    _generate_from_off(
-        off_file,
+    _generate_from_surface_mesh_domain(
+        _surface_mesh_domain(filename, reorient),
         outfile,
         lloyd=lloyd,
         odt=odt,
@@ -278,17 +714,22 @@ def generate_volume_mesh_from_surface_mesh(
         max_cell_circumradius=max_cell_circumradius,
         exude_time_limit=exude_time_limit,
         exude_sliver_bound=exude_sliver_bound,
+        detect_features=detect_features,
+        feature_angle=feature_angle,
+        extra_feature_edges=[] if extra_feature_edges is None else extra_feature_edges,
         verbose=verbose,
-        reorient=reorient,
         seed=seed,
+        quality=mesh_quality,
+        progress=_progress(progress),
+        stats=mesh_stats,
     )
 
-    mesh = meshio.read(outfile)
-    os.remove(off_file)
-    os.remove(outfile)
-    return mesh
+    return _read_output(
+        outfile, mesh_quality, mesh_stats, start_time, reorder, dtype, index_dtype
+    )
 
 
+@cached(files=("inr_filename",))
 def generate_from_inr(
     inr_filename: str,
     lloyd: bool = False,
@@ -305,83 +746,143 @@ def generate_from_inr(
     exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    quality: bool = False,
+    progress: Callable[[dict], bool | None] | None = None,
+    stats: bool = False,
+    parallel: bool = False,
+    iso_value: float | None = None,
+    inside_is_less: bool = False,
+    label_pyramid: bool = False,
+    origin: tuple[float, float, float] | None = None,
+    affine: ArrayLike | None = None,
+    output: str = "both",
+    output_subdomains: list[int] | None = None,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
-    fh, outfile = tempfile.mkstemp(suffix=".mesh")
-    os.close(fh)
+    """
+    For `progress`, `stats`, `reorder`, `dtype`, and `index_dtype`, see
+    `generate_mesh()`.
 
-    if isinstance(max_cell_circumradius, float):
-        _generate_from_inr(
-            inr_filename,
-            outfile,
-            lloyd=lloyd,
-            odt=odt,
-            perturb=perturb,
-            exude=exude,
-            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
-            min_facet_angle=min_facet_angle,
-            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
-            max_facet_distance=max_facet_distance,
-            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
-            max_cell_circumradius=max_cell_circumradius,
-            exude_time_limit=exude_time_limit,
-            exude_sliver_bound=exude_sliver_bound,
-            verbose=verbose,
-            seed=seed,
-        )
-    else:
-        assert isinstance(max_cell_circumradius, dict)
-        if "default" in max_cell_circumradius.keys():
-            default_max_cell_circumradius = max_cell_circumradius.pop("default")
-        else:
-            default_max_cell_circumradius = 0.0
-
-        max_cell_circumradiuss = list(max_cell_circumradius.values())
-        subdomain_labels = list(max_cell_circumradius.keys())
-
-        _generate_from_inr_with_subdomain_sizing(
-            inr_filename,
-            outfile,
-            default_max_cell_circumradius,
-            max_cell_circumradiuss,
-            subdomain_labels,
-            lloyd=lloyd,
-            odt=odt,
-            perturb=perturb,
-            exude=exude,
-            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
-            min_facet_angle=min_facet_angle,
-            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
-            max_facet_distance=max_facet_distance,
-            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
-            verbose=verbose,
-            seed=seed,
+    With `parallel=True`, CGAL refines and optimizes the mesh on all cores. This
+    requires pygalmesh to be built against CGAL with TBB (set `PYGALMESH_WITH_TBB=1`
+    when building); otherwise, a warning is issued and the mesh is generated
+    sequentially. Parallel meshing isn't deterministic, so the seed doesn't determine
+    the mesh anymore.
+
+    With `label_pyramid=True`, a pyramid of the blocks of voxels that have one label is
+    precomputed. Wherever the voxels around a point have the same label, the label
+    lookups that drive the meshing then take it from the (small) pyramid instead of
+    reading from the (large) image. This speeds up the meshing of large images with
+    mostly homogeneous regions at the cost of one pass over the image.
+
+    Besides INR files, gzipped INR files as well as NRRD and NIfTI files are
+    supported. They are all read with `read_volume()`, and the voxels are passed to
+    CGAL without another copy where possible. The meshes are placed with the affine
+    from the header unless `origin` or `affine` is given.
+
+    Without `iso_value`, the image holds integer labels from 0 to 65535, and every label
+    is meshed as a subdomain. With `iso_value`, e.g., for CT scans or other float data,
+    an isosurface of the values is meshed instead; see `generate_from_array()`.
+
+    The mesh is generated in image coordinates, i.e., voxel `(i, j, k)` is at
+    `(i, j, k) * voxel_size`. To get it in world coordinates, give the `origin` of the
+    image or an `affine` 4x4 matrix that maps image to world coordinates. The latter may
+    rotate and reflect, but not scale (that's what the voxel size is for). The
+    coordinates are transformed before the mesh is written, and the mesh sizes are the
+    same in image and world coordinates.
+
+    With `output="surface"` (`"volume"`), only the triangles (tetrahedra) are returned.
+    `output_subdomains` restricts the output to the given subdomain labels; the
+    triangles are then those on the boundaries of these subdomains. Only what's kept is
+    written and read back, which saves time and memory for large meshes. The triangles
+    of such restricted outputs are oriented outward, with the subdomain they bound as
+    their `medit:ref`.
+    """
+    vol, voxel_size, file_affine = read_volume(inr_filename)
+    world = _world_affine(origin, affine)
+    if world is None:
+        world = file_affine
+
+    kwargs = {
+        "lloyd": lloyd,
+        "odt": odt,
+        "perturb": perturb,
+        "exude": exude,
+        "max_edge_size_at_feature_edges": max_edge_size_at_feature_edges,
+        "min_facet_angle": min_facet_angle,
+        "max_radius_surface_delaunay_ball": max_radius_surface_delaunay_ball,
+        "max_facet_distance": max_facet_distance,
+        "max_circumradius_edge_ratio": max_circumradius_edge_ratio,
+        "max_cell_circumradius": max_cell_circumradius,
+        "exude_time_limit": exude_time_limit,
+        "exude_sliver_bound": exude_sliver_bound,
+        "verbose": verbose,
+        "seed": seed,
+        "quality": quality,
+        "progress": progress,
+        "stats": stats,
+        "parallel": parallel,
+        "affine": world,
+        "output": output,
+        "reorder": reorder,
+        "dtype": dtype,
+        "index_dtype": index_dtype,
+    }
+
+    if iso_value is not None:
+        _check_parallel(parallel)
+        return _generate_from_gray_array(
+            vol,
+            voxel_size,
+            iso_value,
+            inside_is_less,
+            output_subdomains=_output_subdomains(output, output_subdomains),
+            **kwargs,
         )
 
-    mesh = meshio.read(outfile)
-    os.remove(outfile)
-    return mesh
+    try:
+        labels = _as_labels(vol)
+    except ValueError:
+        raise ValueError(
+            f"The values in {inr_filename} aren't labels from 0 to 65535. "
+            "To mesh an isosurface of them, give an iso_value."
+        ) from None
+    return _generate_from_labeled_array(
+        labels,
+        voxel_size,
+        label_pyramid=label_pyramid,
+        output_subdomains=output_subdomains,
+        **kwargs,
+    )
 
 
 def remesh_surface(
-    filename: str,
+    filename: str | SurfaceMeshDomain | tuple[ArrayLike, ArrayLike],
     max_edge_size_at_feature_edges: float = 0.0,
     min_facet_angle: float = 0.0,
     max_radius_surface_delaunay_ball: float = 0.0,
     max_facet_distance: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
 ):
-    mesh = meshio.read(filename)
-
-    fh, off_file = tempfile.mkstemp(suffix=".off")
-    os.close(fh)
-    meshio.write(off_file, mesh)
+    """
+    Instead of a file name, `filename` can also be a tuple `(points, triangles)` of
+    arrays, or a `SurfaceMeshDomain`. In the latter case, its polyhedron, the CGAL mesh
+    domain built from it and the detected sharp features are kept in memory and reused
+    by subsequent calls.
 
+    For `reorder`, `dtype`, and `index_dtype`, see `generate_mesh()`.
+    """
     fh, outfile = tempfile.mkstemp(suffix=".off")
     os.close(fh)
 
-    _remesh_surface(
-        off_file,
+    _remesh_surface_domain(
+        _surface_mesh_domain(filename, False),
         outfile,
         max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
         min_facet_angle=min_facet_angle,
@@ -392,9 +893,8 @@ def remesh_surface(
     )
 
     mesh = meshio.read(outfile)
-    os.remove(off_file)
     os.remove(outfile)
-    return mesh
+    return _cast(_reorder(mesh, reorder), dtype, index_dtype)
 
 
 def save_inr(vol, voxel_size: tuple[float, float, float], fname: str):
@@ -436,9 +936,11 @@ def save_inr(vol, voxel_size: tuple[float, float, float], fname: str):
     header = header + "\n" * (256 - 4 - len(header)) + "##}\n"
 
     fid.write(header.encode("ascii"))
-    fid.write(vol.tobytes(order="F"))
+    # written in Fortran order without another copy of (Fortran-ordered) volumes
+    fid.write(np.asfortranarray(vol).T.data)
 
 
+@cached(arrays=("vol",))
 def generate_from_array(
     vol,
     voxel_size: tuple[float, float, float],
@@ -454,25 +956,268 @@ def generate_from_array(
     max_circumradius_edge_ratio: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    quality: bool = False,
+    progress: Callable[[dict], bool | None] | None = None,
+    stats: bool = False,
+    parallel: bool = False,
+    iso_value: float | None = None,
+    inside_is_less: bool = False,
+    label_pyramid: bool = False,
+    downsample: int = 1,
+    relabel: dict[int, int] | None = None,
+    smooth_sigma: float = 0.0,
+    origin: tuple[float, float, float] | None = None,
+    affine: ArrayLike | None = None,
+    output: str = "both",
+    output_subdomains: list[int] | None = None,
+    reorder: str | None = None,
+    dtype: DTypeLike | None = None,
+    index_dtype: DTypeLike | None = None,
+):
+    """
+    Without `iso_value`, `vol` is a labeled image (uint8 or uint16), and every label is
+    meshed as a subdomain.
+
+    With `iso_value`, `vol` is a gray image, e.g., CT data or a sampled level set
+    function, and the region where the trilinear interpolation of the values is greater
+    than `iso_value` (less with `inside_is_less=True`) is meshed. This resolves the
+    surface within voxels. float32 and float64 arrays in Fortran order (`vol[i, j, k]`
+    at `(i, j, k) * voxel_size`) are passed to CGAL without copying; other arrays are
+    converted.
+
+    For `label_pyramid` (labeled images only), `origin`, `affine`, `output`,
+    `output_subdomains`, `reorder`, `dtype`, and `index_dtype`, see
+    `generate_from_inr()`. The region inside a gray image's isosurface is subdomain 1.
+
+    The image can be preprocessed before meshing:
+
+    - `downsample` shrinks it by an integer factor in every direction. Every block of
+      voxels gets its most frequent label, or the mean of its gray values.
+    - `relabel` maps labels to other labels, e.g., `{3: 2, 4: 0}` merges label 3 into
+      2 and removes label 4.
+    - `smooth_sigma` convolves gray images with a Gaussian of this standard deviation
+      (in the units of `voxel_size`). In labeled images, it smoothes the boundaries
+      between the labels instead: every voxel gets the label whose Gaussian-smoothed
+      indicator function is greater than 1/2 there, if there's one.
+
+    These steps run in native code on all cores. They work on one copy of the volume
+    (the downsampled one, if any); `vol` itself isn't changed.
+    """
+    world = _world_affine(origin, affine)
+    if downsample != 1 or relabel or smooth_sigma > 0.0:
+        vol, voxel_size, offset = _preprocess_array(
+            vol, voxel_size, iso_value is None, downsample, relabel, smooth_sigma
+        )
+        if offset is not None:
+            # The voxels of the downsampled image sit at the centers of the blocks.
+            world = np.eye(4) if world is None else world
+            world[:3, 3] += world[:3, :3] @ offset
+
+    if iso_value is not None:
+        _check_parallel(parallel)
+        out = _generate_from_gray_array(
+            vol,
+            voxel_size,
+            iso_value,
+            inside_is_less,
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
+            max_cell_circumradius=max_cell_circumradius,
+            max_facet_distance=max_facet_distance,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            verbose=verbose,
+            seed=seed,
+            quality=quality,
+            progress=progress,
+            stats=stats,
+            parallel=parallel,
+            affine=world,
+            output_subdomains=_output_subdomains(output, output_subdomains),
+            output=output,
+            reorder=reorder,
+            dtype=dtype,
+            index_dtype=index_dtype,
+        )
+    else:
+        out = _generate_from_labeled_array(
+            vol,
+            voxel_size,
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
+            max_facet_distance=max_facet_distance,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            max_cell_circumradius=max_cell_circumradius,
+            verbose=verbose,
+            seed=seed,
+            quality=quality,
+            progress=progress,
+            stats=stats,
+            parallel=parallel,
+            label_pyramid=label_pyramid,
+            affine=world,
+            output=output,
+            output_subdomains=output_subdomains,
+            reorder=reorder,
+            dtype=dtype,
+            index_dtype=index_dtype,
+        )
+    return out
+
+
+def _as_labels(vol):
+    # CGAL meshes labeled images with uint8 or uint16 labels
+    if vol.dtype in [np.uint8, np.uint16]:
+        return vol
+    labels = vol.astype(np.uint16, order="F")
+    if not np.array_equal(labels, vol):
+        raise ValueError("The labels must be integers from 0 to 65535.")
+    return labels
+
+
+def _generate_from_labeled_array(
+    vol,
+    voxel_size,
+    max_cell_circumradius,
+    quality,
+    stats,
+    progress,
+    parallel,
+    affine,
+    output,
+    output_subdomains,
+    reorder,
+    dtype,
+    index_dtype,
+    **kwargs,
 ):
-    assert vol.dtype in ["uint8", "uint16"]
-    fh, inr_filename = tempfile.mkstemp(suffix=".inr")
+    _check_parallel(parallel)
+    subdomains = _output_subdomains(output, output_subdomains)
+    if isinstance(max_cell_circumradius, dict):
+        sizes = dict(max_cell_circumradius)
+        default_max_cell_circumradius = sizes.pop("default", 0.0)
+    else:
+        sizes = {}
+        default_max_cell_circumradius = float(max_cell_circumradius)
+
+    start_time = time.perf_counter()
+    mesh_quality = MeshQuality() if quality else None
+    mesh_stats = MeshStats() if stats else None
+
+    # the buffer is passed to CGAL without copying it
+    vol = np.asfortranarray(_as_labels(np.asarray(vol)))
+
+    fh, outfile = tempfile.mkstemp(suffix=".mesh")
     os.close(fh)
-    save_inr(vol, voxel_size, inr_filename)
-    mesh = generate_from_inr(
-        inr_filename,
-        lloyd,
-        odt,
-        perturb,
-        exude,
-        max_edge_size_at_feature_edges,
-        min_facet_angle,
-        max_radius_surface_delaunay_ball,
-        max_facet_distance,
-        max_circumradius_edge_ratio,
-        max_cell_circumradius,
-        verbose,
-        seed,
+
+    _generate_from_labeled_image(
+        vol,
+        voxel_size,
+        outfile,
+        default_max_cell_circumradius=default_max_cell_circumradius,
+        max_cell_circumradiuss=list(sizes.values()),
+        cell_labels=list(sizes.keys()),
+        quality=mesh_quality,
+        progress=_progress(progress),
+        stats=mesh_stats,
+        parallel=parallel,
+        transform=_transform(affine),
+        output_subdomains=subdomains,
+        output=output,
+        **kwargs,
     )
-    os.remove(inr_filename)
-    return mesh
+
+    out = _read_output(
+        outfile, mesh_quality, mesh_stats, start_time, reorder, dtype, index_dtype
+    )
+    return _orient(out, affine)
+
+
+def _generate_from_gray_array(
+    vol,
+    voxel_size,
+    iso_value,
+    inside_is_less,
+    max_cell_circumradius,
+    quality,
+    stats,
+    progress,
+    affine,
+    reorder,
+    dtype,
+    index_dtype,
+    **kwargs,
+):
+    if not isinstance(max_cell_circumradius, float):
+        raise ValueError("Gray images only support a float max_cell_circumradius.")
+
+    start_time = time.perf_counter()
+    mesh_quality = MeshQuality() if quality else None
+    mesh_stats = MeshStats() if stats else None
+
+    vol = np.asarray(vol)
+    if vol.dtype not in [np.float32, np.float64]:
+        vol = vol.astype(np.float32)
+    vol = np.asfortranarray(vol)
+
+    fh, outfile = tempfile.mkstemp(suffix=".mesh")
+    os.close(fh)
+
+    _generate_from_gray_image(
+        vol,
+        voxel_size,
+        iso_value,
+        inside_is_less,
+        outfile,
+        max_cell_circumradius=max_cell_circumradius,
+        quality=mesh_quality,
+        progress=_progress(progress),
+        stats=mesh_stats,
+        transform=_transform(affine),
+        **kwargs,
+    )
+
+    out = _read_output(
+        outfile, mesh_quality, mesh_stats, start_time, reorder, dtype, index_dtype
+    )
+    return _orient(out, affine)
+
+
+def _preprocess_array(vol, voxel_size, labeled, downsample, relabel, smooth_sigma):
+    vol = np.asarray(vol)
+    # All steps below work in place on one copy of the volume: the float conversion of
+    # gray values, the downsampled image, or else a plain copy.
+    is_copy = False
+    if not labeled and vol.dtype not in [np.float32, np.float64]:
+        vol = vol.astype(np.float32, order="F")
+        is_copy = True
+
+    if downsample != 1:
+        if downsample < 1:
+            raise ValueError(f"downsample must be a positive integer, not {downsample}")
+        offset = 0.5 * (downsample - 1) * np.asarray(voxel_size, dtype=float)
+        voxel_size = tuple(downsample * h for h in voxel_size)
+        vol = _downsample_image(np.asfortranarray(vol), downsample)
+    else:
+        offset = None
+        if not is_copy:
+            vol = np.array(vol, order="F", copy=True)
+
+    if relabel:
+        if not labeled:
+            raise ValueError("Only labeled images can be relabeled.")
+        _relabel_image(vol, {int(a): int(b) for a, b in relabel.items()})
+
+    if smooth_sigma > 0.0:
+        _smooth_image(vol, [smooth_sigma / h for h in voxel_size])
+
+    return vol, voxel_size, offset
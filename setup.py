@@ -3,6 +3,14 @@ import os
 from pybind11.setup_helpers import Pybind11Extension, build_ext
 from setuptools import setup
 
+define_macros = []
+# no CGAL libraries necessary from CGAL 5.0 onwards
+libraries = ["gmp", "mpfr"]
+if os.environ.get("PYGALMESH_WITH_TBB"):
+    # parallel mesh generation, see `parallel` in generate_from_inr()
+    define_macros.append(("CGAL_LINKED_WITH_TBB", None))
+    libraries.append("tbb")
+
 # https://github.com/pybind/python_example/
 ext_modules = [
     Pybind11Extension(
@@ -11,6 +19,7 @@ ext_modules = [
         # (https://github.com/pybind/python_example/pull/53)
         sorted(
             [
+                "src/features.cpp",
                 "src/generate.cpp",
                 "src/generate_2d.cpp",
                 "src/generate_from_inr.cpp",
@@ -18,6 +27,7 @@ ext_modules = [
                 "src/generate_periodic.cpp",
                 "src/generate_surface_mesh.cpp",
                 "src/remesh_surface.cpp",
+                "src/surface_mesh_domain.cpp",
                 "src/pybind11.cpp",
             ]
         ),
@@ -26,8 +36,8 @@ ext_modules = [
             # macos/brew:
             "/usr/local/include/eigen3",
         ],
-        # no CGAL libraries necessary from CGAL 5.0 onwards
-        libraries=["gmp", "mpfr"],
+        define_macros=define_macros,
+        libraries=libraries,
     )
 ]
 
@@ -2,13 +2,44 @@
 #define DOMAIN_HPP
 
 #include <Eigen/Dense>
+#include <algorithm>
 #include <array>
+#include <functional>
 #include <limits>
+#include <map>
 #include <memory>
+#include <sstream>
+#include <stdexcept>
+#include <string>
 #include <vector>
 
 namespace pygalmesh {
 
+typedef std::function<double(const std::array<double, 3> &)> SurfaceFunction;
+
+// Helpers for DomainBase::get_serialization(). Numbers are written with enough digits
+// to be read back exactly, so different parameters never give the same string.
+inline
+std::string
+serialize_number(const double x)
+{
+  std::ostringstream out;
+  out.precision(17);
+  out << x;
+  return out.str();
+}
+
+template <typename Vector>
+std::string
+serialize_vector(const Vector & x)
+{
+  std::string out = "[";
+  for (int i = 0; i < static_cast<int>(x.size()); i++) {
+    out += (i > 0 ? "," : "") + serialize_number(x[i]);
+  }
+  return out + "]";
+}
+
 class DomainBase
 {
   public:
@@ -29,8 +60,49 @@ class DomainBase
   {
     return {};
   };
+
+  // The level set functions of the surfaces that make up the boundary of the domain.
+  // Combinations and transformations of domains collect them from their operands;
+  // everything else is a single surface. The functions refer to the domain objects,
+  // so they must not outlive them.
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    return {[this](const std::array<double, 3> & x) { return this->eval(x); }};
+  }
+
+  // A canonical string of the domain type and its parameters. Two domains with the
+  // same serialization are the same domain. Domains that can't be described this way,
+  // e.g., those defined by arbitrary code, return an empty string.
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return "";
+  }
 };
 
+// Serialization of an operation on domains; empty if any operand can't be serialized.
+inline
+std::string
+serialize_operation(
+    const std::string & name,
+    const std::vector<std::shared_ptr<const pygalmesh::DomainBase>> & domains,
+    const std::string & parameters = ""
+    )
+{
+  std::string out = name + "(";
+  for (std::size_t k = 0; k < domains.size(); k++) {
+    const std::string serialization = domains[k]->get_serialization();
+    if (serialization.empty()) {
+      return "";
+    }
+    out += (k > 0 ? "," : "") + serialization;
+  }
+  return out + (parameters.empty() ? "" : "," + parameters) + ")";
+}
+
 class Translate: public pygalmesh::DomainBase
 {
   public:
@@ -96,6 +168,26 @@ class Translate: public pygalmesh::DomainBase
     return translated_features_;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & f: domain_->get_surface_functions()) {
+      functions.push_back([this, f](const std::array<double, 3> & x) {
+        return f({x[0] - direction_[0], x[1] - direction_[1], x[2] - direction_[2]});
+      });
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation("Translate", {domain_}, serialize_vector(direction_));
+  }
+
   private:
     const std::shared_ptr<const pygalmesh::DomainBase> domain_;
     const Eigen::Vector3d direction_;
@@ -191,6 +283,37 @@ class Rotate: public pygalmesh::DomainBase
     return rotated_features_;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & f: domain_->get_surface_functions()) {
+      functions.push_back([this, f](const std::array<double, 3> & x) {
+        const auto p2 = rotate(
+            Eigen::Vector3d(x.data()),
+            normalized_axis_,
+            -sinAngle_,
+            cosAngle_
+            );
+        return f({p2[0], p2[1], p2[2]});
+      });
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation(
+        "Rotate",
+        {domain_},
+        serialize_vector(normalized_axis_) + "," +
+        serialize_number(sinAngle_) + "," + serialize_number(cosAngle_)
+        );
+  }
+
   private:
     const std::shared_ptr<const pygalmesh::DomainBase> domain_;
     const Eigen::Vector3d normalized_axis_;
@@ -256,6 +379,26 @@ class Scale: public pygalmesh::DomainBase
     return scaled_features_;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & f: domain_->get_surface_functions()) {
+      functions.push_back([this, f](const std::array<double, 3> & x) {
+        return f({x[0]/alpha_, x[1]/alpha_, x[2]/alpha_});
+      });
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation("Scale", {domain_}, serialize_number(alpha_));
+  }
+
   private:
     std::shared_ptr<const pygalmesh::DomainBase> domain_;
     const double alpha_;
@@ -326,6 +469,34 @@ class Stretch: public pygalmesh::DomainBase
     return stretched_features_;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & f: domain_->get_surface_functions()) {
+      functions.push_back([this, f](const std::array<double, 3> & x) {
+        const Eigen::Vector3d v(x.data());
+        const double beta = normalized_direction_.dot(v);
+        const auto v2 = beta/alpha_ * normalized_direction_
+           + (v - beta * normalized_direction_);
+        return f({v2[0], v2[1], v2[2]});
+      });
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation(
+        "Stretch",
+        {domain_},
+        serialize_vector(normalized_direction_) + "," + serialize_number(alpha_)
+        );
+  }
+
   private:
     std::shared_ptr<const pygalmesh::DomainBase> domain_;
     const Eigen::Vector3d normalized_direction_;
@@ -380,6 +551,25 @@ class Intersection: public pygalmesh::DomainBase
     return features;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & domain: domains_) {
+      const auto f = domain->get_surface_functions();
+      functions.insert(std::end(functions), std::begin(f), std::end(f));
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation("Intersection", domains_);
+  }
+
   private:
     std::vector<std::shared_ptr<const pygalmesh::DomainBase>> domains_;
 };
@@ -431,6 +621,25 @@ class Union: public pygalmesh::DomainBase
     return features;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & domain: domains_) {
+      const auto f = domain->get_surface_functions();
+      functions.insert(std::end(functions), std::begin(f), std::end(f));
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation("Union", domains_);
+  }
+
   private:
     std::vector<std::shared_ptr<const pygalmesh::DomainBase>> domains_;
 };
@@ -481,10 +690,172 @@ class Difference: public pygalmesh::DomainBase
     return features;
   };
 
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions = domain0_->get_surface_functions();
+    const auto f1 = domain1_->get_surface_functions();
+    functions.insert(std::end(functions), std::begin(f1), std::end(f1));
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return serialize_operation("Difference", {domain0_, domain1_});
+  }
+
   private:
     std::shared_ptr<const pygalmesh::DomainBase> domain0_;
     std::shared_ptr<const pygalmesh::DomainBase> domain1_;
 };
 
+// A domain made of several labeled parts, e.g., the materials of a multi-material
+// model. Points belong to the first part that contains them, and the cells of each part
+// get its label as subdomain index. A part can come with its own bounds for the cell
+// and facet sizes; a nonpositive size means that the global criterion applies. Facets
+// on the interface of two parts are bounded by the smaller facet size of the two. As a
+// plain domain, it is the union of the parts.
+class MultiDomain: public pygalmesh::DomainBase
+{
+  public:
+  MultiDomain(
+      const std::vector<std::shared_ptr<const pygalmesh::DomainBase>> & domains,
+      const std::vector<int> & labels,
+      const std::vector<double> & cell_sizes,
+      const std::vector<double> & facet_sizes
+      ):
+    domains_(domains),
+    labels_(labels)
+  {
+    if (
+        domains.empty() ||
+        labels.size() != domains.size() ||
+        cell_sizes.size() != domains.size() ||
+        facet_sizes.size() != domains.size()
+       ) {
+      throw std::invalid_argument(
+          "MultiDomain needs at least one part and a label and sizes for each"
+          );
+    }
+    for (std::size_t k = 0; k < domains.size(); k++) {
+      if (labels[k] <= 0) {
+        std::stringstream msg;
+        msg << "Invalid label " << labels[k] << " (labels must be positive)";
+        throw std::invalid_argument(msg.str());
+      }
+      // Parts with the same label are one subdomain, so they must agree on the sizes.
+      const auto cell_size = cell_sizes_.emplace(labels[k], cell_sizes[k]).first;
+      const auto facet_size = facet_sizes_.emplace(labels[k], facet_sizes[k]).first;
+      if (cell_size->second != cell_sizes[k] || facet_size->second != facet_sizes[k]) {
+        std::stringstream msg;
+        msg << "The parts with label " << labels[k] << " have different sizes";
+        throw std::invalid_argument(msg.str());
+      }
+    }
+  }
+
+  virtual ~MultiDomain() = default;
+
+  // The label of the part that contains x, 0 outside of all parts.
+  int
+  label(const std::array<double, 3> & x) const
+  {
+    for (std::size_t k = 0; k < domains_.size(); k++) {
+      if (domains_[k]->eval(x) < 0.0) {
+        return labels_[k];
+      }
+    }
+    return 0;
+  }
+
+  const std::vector<int> &
+  get_labels() const
+  {
+    return labels_;
+  }
+
+  double
+  cell_size(const int label) const
+  {
+    const auto it = cell_sizes_.find(label);
+    return it == cell_sizes_.end() ? 0.0 : it->second;
+  }
+
+  double
+  facet_size(const int label) const
+  {
+    const auto it = facet_sizes_.find(label);
+    return it == facet_sizes_.end() ? 0.0 : it->second;
+  }
+
+  virtual
+  double
+  eval(const std::array<double, 3> & x) const
+  {
+    double minval = std::numeric_limits<double>::max();
+    for (const auto & domain: domains_) {
+      minval = std::min(minval, domain->eval(x));
+    }
+    return minval;
+  }
+
+  virtual
+  double
+  get_bounding_sphere_squared_radius() const
+  {
+    double max = 0.0;
+    for (const auto & domain: domains_) {
+      max = std::max(max, domain->get_bounding_sphere_squared_radius());
+    }
+    return max;
+  }
+
+  virtual
+  std::vector<std::vector<std::array<double, 3>>>
+  get_features() const
+  {
+    std::vector<std::vector<std::array<double, 3>>> features;
+    for (const auto & domain: domains_) {
+      const auto f = domain->get_features();
+      features.insert(std::end(features), std::begin(f), std::end(f));
+    }
+    return features;
+  };
+
+  virtual
+  std::vector<SurfaceFunction>
+  get_surface_functions() const
+  {
+    std::vector<SurfaceFunction> functions;
+    for (const auto & domain: domains_) {
+      const auto f = domain->get_surface_functions();
+      functions.insert(std::end(functions), std::begin(f), std::end(f));
+    }
+    return functions;
+  }
+
+  virtual
+  std::string
+  get_serialization() const
+  {
+    std::vector<double> parameters;
+    for (const int label: labels_) {
+      parameters.push_back(label);
+      parameters.push_back(cell_size(label));
+      parameters.push_back(facet_size(label));
+    }
+    return serialize_operation("MultiDomain", domains_, serialize_vector(parameters));
+  }
+
+  private:
+    std::vector<std::shared_ptr<const pygalmesh::DomainBase>> domains_;
+    std::vector<int> labels_;
+    std::map<int, double> cell_sizes_;
+    std::map<int, double> facet_sizes_;
+};
+
 } // namespace pygalmesh
 #endif // DOMAIN_HPP
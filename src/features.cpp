@@ -0,0 +1,524 @@
+#include "features.hpp"
+
+#include <Eigen/Dense>
+
+#include <algorithm>
+#include <cmath>
+#include <cstddef>
+#include <functional>
+#include <map>
+#include <sstream>
+#include <stdexcept>
+#include <utility>
+
+namespace pygalmesh {
+
+typedef std::vector<Eigen::Vector3d> Polyline;
+
+// The three grid vertices of a tetrahedron face, sorted. Curve points that lie on the
+// same face are the same point.
+typedef std::array<std::size_t, 3> FaceKey;
+
+struct CurvePoint
+{
+  FaceKey face;
+  Eigen::Vector3d x;
+};
+
+static
+std::array<double, 3>
+to_array(const Eigen::Vector3d & x)
+{
+  return {x[0], x[1], x[2]};
+}
+
+static
+Eigen::Vector3d
+gradient(const SurfaceFunction & f, const Eigen::Vector3d & x, const double eps)
+{
+  Eigen::Vector3d grad;
+  for (int k = 0; k < 3; k++) {
+    Eigen::Vector3d xp = x;
+    Eigen::Vector3d xm = x;
+    xp[k] += eps;
+    xm[k] -= eps;
+    grad[k] = (f(to_array(xp)) - f(to_array(xm))) / (2 * eps);
+  }
+  return grad;
+}
+
+// Move x onto the curve {f = 0} ∩ {g = 0} with Gauss-Newton steps orthogonal to the
+// curve. The steps are bounded by max_step; if the surfaces are tangent or the
+// iteration doesn't behave, the last good point is returned.
+static
+Eigen::Vector3d
+project_to_curve(
+    const SurfaceFunction & f,
+    const SurfaceFunction & g,
+    Eigen::Vector3d x,
+    const double eps,
+    const double max_step
+    )
+{
+  for (int k = 0; k < 10; k++) {
+    const Eigen::Vector2d F(f(to_array(x)), g(to_array(x)));
+    Eigen::Matrix<double, 2, 3> J;
+    J.row(0) = gradient(f, x, eps);
+    J.row(1) = gradient(g, x, eps);
+    const Eigen::Matrix2d JJt = J * J.transpose();
+    if (std::abs(JJt.determinant()) <= 1.0e-12 * JJt.squaredNorm()) {
+      break;
+    }
+    const Eigen::Vector3d dx = J.transpose() * JJt.inverse() * F;
+    if (!(dx.norm() <= max_step)) {
+      break;
+    }
+    x -= dx;
+    if (dx.norm() < 1.0e-12 * max_step) {
+      break;
+    }
+  }
+  return x;
+}
+
+// Marching tetrahedra for two functions: Find the segment along which the zero sets
+// of the linear interpolants of f and g intersect in the tetrahedron, if any.
+static
+void
+march_tetrahedron(
+    const std::array<std::size_t, 4> & ids,
+    const std::array<Eigen::Vector3d, 4> & p,
+    const std::array<double, 4> & f,
+    const std::array<double, 4> & g,
+    std::vector<std::pair<CurvePoint, CurvePoint>> & segments
+    )
+{
+  // the polygon in which the zero set of f cuts the tetrahedron; its corners lie on
+  // the edges of the tetrahedron
+  struct EdgePoint
+  {
+    int a;
+    int b;
+    Eigen::Vector3d x;
+    double g;
+  };
+  std::vector<EdgePoint> polygon;
+  for (int a = 0; a < 4; a++) {
+    for (int b = a + 1; b < 4; b++) {
+      if ((f[a] < 0.0) != (f[b] < 0.0)) {
+        // always interpolate from the vertex with the smaller id so that neighboring
+        // tetrahedra get the same point
+        const int u = ids[a] < ids[b] ? a : b;
+        const int v = ids[a] < ids[b] ? b : a;
+        const double t = f[u] / (f[u] - f[v]);
+        polygon.push_back({u, v, p[u] + t * (p[v] - p[u]), g[u] + t * (g[v] - g[u])});
+      }
+    }
+  }
+
+  std::vector<CurvePoint> crossings;
+  for (std::size_t i = 0; i < polygon.size(); i++) {
+    for (std::size_t j = i + 1; j < polygon.size(); j++) {
+      const auto & e0 = polygon[i];
+      const auto & e1 = polygon[j];
+      // Two corners are neighbors on the polygon iff their tetrahedron edges share a
+      // vertex, i.e., span a face of the tetrahedron.
+      if (e0.a != e1.a && e0.a != e1.b && e0.b != e1.a && e0.b != e1.b) {
+        continue;
+      }
+      if ((e0.g < 0.0) == (e1.g < 0.0)) {
+        continue;
+      }
+      std::array<std::size_t, 4> v = {ids[e0.a], ids[e0.b], ids[e1.a], ids[e1.b]};
+      std::sort(v.begin(), v.end());
+      const auto last = std::unique(v.begin(), v.end());
+      if (last - v.begin() != 3) {
+        continue;
+      }
+      const double t = e0.g / (e0.g - e1.g);
+      crossings.push_back({{v[0], v[1], v[2]}, e0.x + t * (e1.x - e0.x)});
+    }
+  }
+
+  if (crossings.size() == 2) {
+    segments.push_back({crossings[0], crossings[1]});
+  }
+}
+
+// Join segments that share end points to polylines. Closed curves get the same first
+// and last point.
+static
+std::vector<Polyline>
+chain_segments(const std::vector<std::pair<CurvePoint, CurvePoint>> & segments)
+{
+  std::map<FaceKey, std::vector<std::size_t>> incident;
+  for (std::size_t k = 0; k < segments.size(); k++) {
+    incident[segments[k].first.face].push_back(k);
+    incident[segments[k].second.face].push_back(k);
+  }
+
+  std::vector<bool> used(segments.size(), false);
+  const auto walk = [&](const CurvePoint & start) {
+    Polyline polyline = {start.x};
+    FaceKey node = start.face;
+    while (true) {
+      const auto & candidates = incident[node];
+      const auto it = std::find_if(
+          candidates.begin(), candidates.end(),
+          [&](const std::size_t k) { return !used[k]; }
+          );
+      if (it == candidates.end()) {
+        break;
+      }
+      used[*it] = true;
+      const auto & segment = segments[*it];
+      const auto & next = segment.first.face == node ? segment.second : segment.first;
+      polyline.push_back(next.x);
+      node = next.face;
+    }
+    if (node == start.face && polyline.size() > 2) {
+      polyline.back() = polyline.front();
+    }
+    return polyline;
+  };
+
+  std::vector<Polyline> polylines;
+  // open curves first, starting at one of their ends
+  for (std::size_t k = 0; k < segments.size(); k++) {
+    for (const auto & end: {segments[k].first, segments[k].second}) {
+      if (!used[k] && incident[end.face].size() == 1) {
+        polylines.push_back(walk(end));
+      }
+    }
+  }
+  // what is left are closed curves
+  for (std::size_t k = 0; k < segments.size(); k++) {
+    if (!used[k]) {
+      polylines.push_back(walk(segments[k].first));
+    }
+  }
+  return polylines;
+}
+
+// Split a polyline into the pieces that lie on the boundary of the domain. The
+// transitions are located by bisection.
+static
+std::vector<Polyline>
+clip_polyline(
+    const Polyline & polyline,
+    const std::function<bool(const Eigen::Vector3d &)> & on_boundary,
+    const std::function<Eigen::Vector3d(const Eigen::Vector3d &)> & project
+    )
+{
+  if (polyline.size() < 2) {
+    return {};
+  }
+
+  std::vector<bool> is_on(polyline.size());
+  for (std::size_t k = 0; k < polyline.size(); k++) {
+    is_on[k] = on_boundary(polyline[k]);
+  }
+
+  const bool closed = polyline.front() == polyline.back();
+  if (closed && std::all_of(is_on.begin(), is_on.end(), [](bool b) { return b; })) {
+    return {polyline};
+  }
+
+  // For closed curves, start at a point off the boundary so that no piece wraps
+  // around the start.
+  Polyline points = polyline;
+  std::vector<bool> on = is_on;
+  if (closed) {
+    points.pop_back();
+    on.pop_back();
+    const auto offset = std::distance(
+        on.begin(), std::find(on.begin(), on.end(), false)
+        );
+    std::rotate(points.begin(), points.begin() + offset, points.end());
+    std::rotate(on.begin(), on.begin() + offset, on.end());
+    points.push_back(points.front());
+    on.push_back(on.front());
+  }
+
+  const auto transition = [&](Eigen::Vector3d x_on, Eigen::Vector3d x_off) {
+    const double tol = 1.0e-6 * (x_on - x_off).norm();
+    for (int k = 0; k < 50 && (x_on - x_off).norm() > tol; k++) {
+      const Eigen::Vector3d mid = project(0.5 * (x_on + x_off));
+      if (on_boundary(mid)) {
+        x_on = mid;
+      } else {
+        x_off = mid;
+      }
+    }
+    return x_on;
+  };
+
+  std::vector<Polyline> pieces;
+  Polyline piece;
+  for (std::size_t k = 0; k < points.size(); k++) {
+    if (on[k]) {
+      if (piece.empty() && k > 0) {
+        piece.push_back(transition(points[k], points[k - 1]));
+      }
+      piece.push_back(points[k]);
+    } else if (!piece.empty()) {
+      piece.push_back(transition(points[k - 1], points[k]));
+      pieces.push_back(piece);
+      piece.clear();
+    }
+  }
+  if (!piece.empty()) {
+    pieces.push_back(piece);
+  }
+  return pieces;
+}
+
+// Redistribute the points of a polyline evenly with a distance of at most h.
+static
+Polyline
+resample(
+    const Polyline & polyline,
+    const double h,
+    const std::function<Eigen::Vector3d(const Eigen::Vector3d &)> & project
+    )
+{
+  std::vector<double> arc_length = {0.0};
+  for (std::size_t k = 1; k < polyline.size(); k++) {
+    arc_length.push_back(arc_length.back() + (polyline[k] - polyline[k - 1]).norm());
+  }
+  const double length = arc_length.back();
+  const std::size_t n = std::max<std::size_t>(1, std::ceil(length / h));
+
+  Polyline resampled = {polyline.front()};
+  std::size_t j = 1;
+  for (std::size_t k = 1; k < n; k++) {
+    const double s = k * length / n;
+    while (j < polyline.size() - 1 && arc_length[j] < s) {
+      j++;
+    }
+    const double ds = arc_length[j] - arc_length[j - 1];
+    const double t = ds > 0.0 ? (s - arc_length[j - 1]) / ds : 0.0;
+    resampled.push_back(project(polyline[j - 1] + t * (polyline[j] - polyline[j - 1])));
+  }
+  resampled.push_back(polyline.back());
+  return resampled;
+}
+
+static
+double
+polyline_length(const Polyline & polyline)
+{
+  double length = 0.0;
+  for (std::size_t k = 1; k < polyline.size(); k++) {
+    length += (polyline[k] - polyline[k - 1]).norm();
+  }
+  return length;
+}
+
+std::vector<std::vector<std::array<double, 3>>>
+compute_features(
+    const pygalmesh::DomainBase & domain,
+    const double bounding_sphere_radius,
+    const double max_edge_size
+    )
+{
+  const double h = max_edge_size;
+  const double eps = 1.0e-5 * h;
+
+  const SurfaceFunction root = [&domain](const std::array<double, 3> & x) {
+    return domain.eval(x);
+  };
+  // A point is on the boundary of the domain if the estimated distance |f| / |grad f|
+  // to the zero set is small. On an intersection curve of two surfaces, this is the
+  // case unless another part of the domain covers the curve.
+  const auto on_surface = [&](const Eigen::Vector3d & x) {
+    const double val = std::abs(root(to_array(x)));
+    const double grad_norm = gradient(root, x, eps).norm();
+    return val <= 1.0e-4 * h * std::max(grad_norm, 1.0e-15);
+  };
+  // In a MultiDomain, the interfaces between the parts are boundaries, too: a point is
+  // on one if the labels around it differ.
+  const auto multi_domain = dynamic_cast<const pygalmesh::MultiDomain *>(&domain);
+  const auto on_interface = [&](const Eigen::Vector3d & x) {
+    const double delta = 1.0e-3 * h;
+    const int label = multi_domain->label(to_array(x));
+    for (int k = 0; k < 3; k++) {
+      for (const double step: {-delta, delta}) {
+        Eigen::Vector3d y = x;
+        y[k] += step;
+        if (multi_domain->label(to_array(y)) != label) {
+          return true;
+        }
+      }
+    }
+    return false;
+  };
+  const std::function<bool(const Eigen::Vector3d &)> on_boundary =
+    multi_domain ?
+    std::function<bool(const Eigen::Vector3d &)>(on_interface) :
+    std::function<bool(const Eigen::Vector3d &)>(on_surface);
+  const auto identity = [](const Eigen::Vector3d & x) { return x; };
+
+  std::vector<Polyline> features;
+
+  // the features of the primitives, clipped to the boundary
+  for (const auto & feature: domain.get_features()) {
+    Polyline polyline;
+    for (const auto & p: feature) {
+      polyline.push_back(Eigen::Vector3d(p[0], p[1], p[2]));
+    }
+    const auto pieces = clip_polyline(polyline, on_boundary, identity);
+    features.insert(features.end(), pieces.begin(), pieces.end());
+  }
+
+  // the intersection curves of the surfaces
+  const auto functions = domain.get_surface_functions();
+  if (functions.size() > 1) {
+    // Evaluate all surface functions on a grid over the bounding box of the bounding
+    // sphere, with a grid spacing of about h; curves that are much shorter than the
+    // grid spacing may be missed.
+    const double r = bounding_sphere_radius;
+    const std::size_t n = std::max<std::size_t>(8, std::ceil(2 * r / h));
+    const std::size_t max_grid_size = 512;
+    if (n > max_grid_size) {
+      std::stringstream msg;
+      msg << "Detecting the features needs a grid of " << n << "^3 cells "
+        << "(at most " << max_grid_size << "^3), since the domain is large compared "
+        << "to max_edge_size_at_feature_edges (" << h << "). "
+        << "Increase max_edge_size_at_feature_edges, "
+        << "or pass the features in extra_feature_edges instead.";
+      throw std::invalid_argument(msg.str());
+    }
+    const double spacing = 2 * r / n;
+    const auto index = [n](std::size_t i, std::size_t j, std::size_t k) {
+      return i + (n + 1) * (j + (n + 1) * k);
+    };
+    const auto grid_point = [&](std::size_t i, std::size_t j, std::size_t k) {
+      return Eigen::Vector3d(-r + i * spacing, -r + j * spacing, -r + k * spacing);
+    };
+
+    // Split each grid cube into six tetrahedra along its main diagonal (Kuhn
+    // triangulation); neighboring cubes then share the tetrahedron faces. Vertex
+    // bits: 1 -> x, 2 -> y, 4 -> z.
+    const std::array<std::array<int, 4>, 6> tetrahedra = {{
+      {0, 1, 3, 7},
+      {0, 1, 5, 7},
+      {0, 2, 3, 7},
+      {0, 2, 6, 7},
+      {0, 4, 5, 7},
+      {0, 4, 6, 7}
+    }};
+
+    // The grid is walked through one layer of cubes at a time, so only the function
+    // values on the two grid planes around the layer are kept.
+    const std::size_t plane_size = (n + 1) * (n + 1);
+    std::vector<std::vector<double>> values(
+        functions.size(), std::vector<double>(2 * plane_size)
+        );
+    const auto evaluate_plane = [&](const std::size_t k) {
+      for (std::size_t l = 0; l < functions.size(); l++) {
+        double * plane = values[l].data() + (k % 2) * plane_size;
+        for (std::size_t j = 0; j <= n; j++) {
+          for (std::size_t i = 0; i <= n; i++) {
+            plane[i + (n + 1) * j] = functions[l](to_array(grid_point(i, j, k)));
+          }
+        }
+      }
+    };
+    const auto value = [&](const std::size_t l, const std::size_t id) {
+      return values[l][id % (2 * plane_size)];
+    };
+
+    // the segments of the intersection curves of every pair of surfaces
+    std::vector<std::pair<std::size_t, std::size_t>> pairs;
+    for (std::size_t l0 = 0; l0 < functions.size(); l0++) {
+      for (std::size_t l1 = l0 + 1; l1 < functions.size(); l1++) {
+        pairs.push_back({l0, l1});
+      }
+    }
+    std::vector<std::vector<std::pair<CurvePoint, CurvePoint>>> segments(pairs.size());
+
+    evaluate_plane(0);
+    for (std::size_t k = 0; k < n; k++) {
+      evaluate_plane(k + 1);
+      for (std::size_t j = 0; j < n; j++) {
+        for (std::size_t i = 0; i < n; i++) {
+          std::array<std::size_t, 8> ids;
+          std::array<Eigen::Vector3d, 8> p;
+          for (int b = 0; b < 8; b++) {
+            ids[b] = index(i + (b & 1), j + ((b >> 1) & 1), k + ((b >> 2) & 1));
+            p[b] = grid_point(i + (b & 1), j + ((b >> 1) & 1), k + ((b >> 2) & 1));
+          }
+          // skip the cube unless both surfaces pass through it
+          const auto crosses = [&](const std::size_t l) {
+            bool has_neg = false;
+            bool has_pos = false;
+            for (const auto id: ids) {
+              (value(l, id) < 0.0 ? has_neg : has_pos) = true;
+            }
+            return has_neg && has_pos;
+          };
+          for (std::size_t m = 0; m < pairs.size(); m++) {
+            const std::size_t l0 = pairs[m].first;
+            const std::size_t l1 = pairs[m].second;
+            if (!crosses(l0) || !crosses(l1)) {
+              continue;
+            }
+            for (const auto & tet: tetrahedra) {
+              march_tetrahedron(
+                  {ids[tet[0]], ids[tet[1]], ids[tet[2]], ids[tet[3]]},
+                  {p[tet[0]], p[tet[1]], p[tet[2]], p[tet[3]]},
+                  {
+                    value(l0, ids[tet[0]]), value(l0, ids[tet[1]]),
+                    value(l0, ids[tet[2]]), value(l0, ids[tet[3]])
+                  },
+                  {
+                    value(l1, ids[tet[0]]), value(l1, ids[tet[1]]),
+                    value(l1, ids[tet[2]]), value(l1, ids[tet[3]])
+                  },
+                  segments[m]
+                  );
+            }
+          }
+        }
+      }
+    }
+
+    for (std::size_t m = 0; m < pairs.size(); m++) {
+      const auto & f = functions[pairs[m].first];
+      const auto & g = functions[pairs[m].second];
+      const auto project = [&](const Eigen::Vector3d & x) {
+        return project_to_curve(f, g, x, eps, spacing);
+      };
+      for (auto polyline: chain_segments(segments[m])) {
+        const bool closed = polyline.front() == polyline.back();
+        for (auto & x: polyline) {
+          x = project(x);
+        }
+        if (closed) {
+          polyline.back() = polyline.front();
+        }
+        for (const auto & piece: clip_polyline(polyline, on_boundary, project)) {
+          if (polyline_length(piece) > 1.0e-3 * h) {
+            features.push_back(resample(piece, h, project));
+          }
+        }
+      }
+    }
+  }
+
+  std::vector<std::vector<std::array<double, 3>>> out;
+  for (const auto & polyline: features) {
+    if (polyline.size() < 2) {
+      continue;
+    }
+    std::vector<std::array<double, 3>> feature;
+    for (const auto & x: polyline) {
+      feature.push_back(to_array(x));
+    }
+    out.push_back(feature);
+  }
+  return out;
+}
+
+} // namespace pygalmesh
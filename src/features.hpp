@@ -0,0 +1,26 @@
+#ifndef FEATURES_HPP
+#define FEATURES_HPP
+
+#include "domain.hpp"
+
+#include <array>
+#include <vector>
+
+namespace pygalmesh {
+
+// Compute the feature curves of a domain for protection: the features that the
+// domain reports itself, clipped to its boundary, plus the intersection curves of all
+// pairs of its surfaces (see DomainBase::get_surface_functions()) that lie on the
+// boundary of the domain. For a MultiDomain, the interfaces between its parts count
+// as boundary. The intersection curves are sampled with a point distance of
+// max_edge_size.
+std::vector<std::vector<std::array<double, 3>>>
+compute_features(
+    const pygalmesh::DomainBase & domain,
+    const double bounding_sphere_radius,
+    const double max_edge_size
+    );
+
+} // namespace pygalmesh
+
+#endif // FEATURES_HPP
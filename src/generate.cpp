@@ -1,6 +1,8 @@
 #define CGAL_MESH_3_VERBOSE 1
 
 #include "generate.hpp"
+#include "features.hpp"
+#include "make_mesh.hpp"
 
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 
@@ -10,7 +12,12 @@
 
 #include <CGAL/Implicit_mesh_domain_3.h>
 #include <CGAL/Mesh_domain_with_polyline_features_3.h>
-#include <CGAL/make_mesh_3.h>
+
+#include <algorithm>
+#include <functional>
+#include <limits>
+#include <map>
+#include <set>
 
 namespace pygalmesh {
 
@@ -50,6 +57,7 @@ generate_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
     const std::string & outfile,
     const std::vector<std::vector<std::array<double, 3>>> & extra_feature_edges,
+    const bool detect_features,
     const double bounding_sphere_radius,
     const bool lloyd,
     const bool odt,
@@ -76,59 +84,150 @@ generate_mesh(
     const double exude_sliver_bound,
     //
     const bool verbose,
-    const int seed
+    const int seed,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats
     )
 {
   CGAL::get_default_random() = CGAL::Random(seed);
 
+  const ActiveMeshStats active_stats(stats.get());
+  ProgressMonitor monitor(progress, stats);
+
   const double bounding_sphere_radius2 = bounding_sphere_radius > 0 ?
     bounding_sphere_radius*bounding_sphere_radius :
     // some wiggle room
     1.01 * domain->get_bounding_sphere_squared_radius();
 
+  CallCounter * domain_evals = stats ? &stats->domain_evals : nullptr;
+  CallCounter * sizing_field_evals = stats ? &stats->sizing_field_evals : nullptr;
+
   // wrap domain
   const auto d = [&](K::Point_3 p) {
-    return domain->eval({p.x(), p.y(), p.z()});
+    // The domain is evaluated throughout the run, so this is where long stretches
+    // without output are interrupted.
+    monitor.tick();
+    return counted_call(domain_evals, [&]() {
+      return domain->eval({p.x(), p.y(), p.z()});
+    });
   };
 
-  Mesh_domain cgal_domain = Mesh_domain::create_implicit_mesh_domain(
-       d,
-       K::Sphere_3(CGAL::ORIGIN, bounding_sphere_radius2)
-       );
+  // wrap sizing fields
+  const auto eval_field = [&](
+      const std::shared_ptr<pygalmesh::SizingFieldBase> & field,
+      const K::Point_3 & p
+      ) {
+    return counted_call(sizing_field_evals, [&]() {
+      return field->eval({p.x(), p.y(), p.z()});
+    });
+  };
+
+  // A MultiDomain labels its parts itself; everything else is one subdomain.
+  const auto multi_domain = std::dynamic_pointer_cast<const pygalmesh::MultiDomain>(domain);
+  const auto label = [&](const K::Point_3 & p) {
+    monitor.tick();
+    return counted_call(domain_evals, [&]() {
+      return multi_domain->label({p.x(), p.y(), p.z()});
+    });
+  };
 
-  // cgal_domain.detect_features();
+  Mesh_domain cgal_domain = multi_domain ?
+    Mesh_domain(
+        std::function<int(const K::Point_3 &)>(label),
+        K::Sphere_3(CGAL::ORIGIN, bounding_sphere_radius2)
+        ) :
+    Mesh_domain(Mesh_domain::create_implicit_mesh_domain(
+        d,
+        K::Sphere_3(CGAL::ORIGIN, bounding_sphere_radius2)
+        ));
 
-  const auto native_features = translate_feature_edges(domain->get_features());
+  // Implicit domains have no detect_features(); compute the features from the
+  // surfaces of the domain instead. Otherwise, take the features of the primitives
+  // as they are.
+  const auto native_features = translate_feature_edges(
+      detect_features ?
+      compute_features(
+        *domain,
+        std::sqrt(bounding_sphere_radius2),
+        max_edge_size_at_feature_edges_value
+        ) :
+      domain->get_features()
+      );
   cgal_domain.add_features(native_features.begin(), native_features.end());
 
   const auto polylines = translate_feature_edges(extra_feature_edges);
   cgal_domain.add_features(polylines.begin(), polylines.end());
 
-  // perhaps there's a more elegant solution here
-  // see <https://github.com/CGAL/cgal/issues/1286>
-  if (!verbose) {
-    // suppress output
-    std::cerr.setstate(std::ios_base::failbit);
+  // The sizes of the parts of a MultiDomain, by the index of their subdomain (cells)
+  // and of the surface patches between them and their neighbors (facets). Elsewhere,
+  // the global values or fields apply.
+  std::map<Mesh_domain::Index, double> cell_sizes;
+  std::map<Mesh_domain::Index, double> facet_sizes;
+  if (multi_domain) {
+    std::set<int> labels(
+        multi_domain->get_labels().begin(), multi_domain->get_labels().end()
+        );
+    labels.insert(0);
+    for (const int a: labels) {
+      if (multi_domain->cell_size(a) > 0.0) {
+        cell_sizes[cgal_domain.index_from_subdomain_index(a)] = multi_domain->cell_size(a);
+      }
+      for (const int b: labels) {
+        double size = std::numeric_limits<double>::max();
+        for (const int l: {a, b}) {
+          if (multi_domain->facet_size(l) > 0.0) {
+            size = std::min(size, multi_domain->facet_size(l));
+          }
+        }
+        if (a != b && size < std::numeric_limits<double>::max()) {
+          facet_sizes[cgal_domain.index_from_surface_patch_index(std::make_pair(a, b))] = size;
+        }
+      }
+    }
   }
 
+  // A nonpositive constant means no bound.
+  const auto unbounded = [](const double value) {
+    return value > 0.0 ? value : std::numeric_limits<double>::max();
+  };
+  const auto facet_size = [&](const K::Point_3 & p, const Mesh_domain::Index & index) {
+    const auto it = facet_sizes.find(index);
+    if (it != facet_sizes.end()) {
+      return it->second;
+    }
+    return max_radius_surface_delaunay_ball_field ?
+      eval_field(max_radius_surface_delaunay_ball_field, p) :
+      unbounded(max_radius_surface_delaunay_ball_value);
+  };
+  const auto cell_size = [&](const K::Point_3 & p, const Mesh_domain::Index & index) {
+    const auto it = cell_sizes.find(index);
+    if (it != cell_sizes.end()) {
+      return it->second;
+    }
+    return max_cell_circumradius_field ?
+      eval_field(max_cell_circumradius_field, p) :
+      unbounded(max_cell_circumradius_value);
+  };
+
   // Build the float/field values according to
   // <https://github.com/CGAL/cgal/issues/5044#issuecomment-705526982>.
 
   // nested ternary operator
-  const auto facet_criteria = max_radius_surface_delaunay_ball_field ? (
+  const auto facet_criteria = (max_radius_surface_delaunay_ball_field || !facet_sizes.empty()) ? (
       max_facet_distance_field ?
       Facet_criteria(
         min_facet_angle,
-         [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_radius_surface_delaunay_ball_field->eval({p.x(), p.y(), p.z()});
+         [&](K::Point_3 p, const int, const Mesh_domain::Index& index) {
+           return facet_size(p, index);
          },
          [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_facet_distance_field->eval({p.x(), p.y(), p.z()});
+           return eval_field(max_facet_distance_field, p);
          }
       ) : Facet_criteria(
         min_facet_angle,
-         [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_radius_surface_delaunay_ball_field->eval({p.x(), p.y(), p.z()});
+         [&](K::Point_3 p, const int, const Mesh_domain::Index& index) {
+           return facet_size(p, index);
          },
          max_facet_distance_value
       )
@@ -138,7 +237,7 @@ generate_mesh(
         min_facet_angle,
         max_radius_surface_delaunay_ball_value,
          [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_facet_distance_field->eval({p.x(), p.y(), p.z()});
+           return eval_field(max_facet_distance_field, p);
          }
       ) : Facet_criteria(
         min_facet_angle,
@@ -150,34 +249,36 @@ generate_mesh(
   const auto edge_criteria = max_edge_size_at_feature_edges_field ?
      Edge_criteria(
          [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_edge_size_at_feature_edges_field->eval({p.x(), p.y(), p.z()});
+           return eval_field(max_edge_size_at_feature_edges_field, p);
           }) : Edge_criteria(max_edge_size_at_feature_edges_value);
 
-  const auto cell_criteria = max_cell_circumradius_field ?
+  const auto cell_criteria = (max_cell_circumradius_field || !cell_sizes.empty()) ?
      Cell_criteria(
          max_circumradius_edge_ratio,
-         [&](K::Point_3 p, const int, const Mesh_domain::Index&) {
-           return max_cell_circumradius_field->eval({p.x(), p.y(), p.z()});
+         [&](K::Point_3 p, const int, const Mesh_domain::Index& index) {
+           return cell_size(p, index);
           }) : Cell_criteria(max_circumradius_edge_ratio, max_cell_circumradius_value);
 
   const auto criteria = Mesh_criteria(edge_criteria, facet_criteria, cell_criteria);
 
   // Mesh generation
-  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
+  C3t3 c3t3 = make_mesh<C3t3>(
       cgal_domain,
       criteria,
-      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
-      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
-      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
-      exude ?
-        CGAL::parameters::exude(
-          CGAL::parameters::time_limit = exude_time_limit,
-          CGAL::parameters::sliver_bound = exude_sliver_bound
-        ) :
-        CGAL::parameters::no_exude()
+      lloyd,
+      odt,
+      perturb,
+      exude,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      monitor
       );
-  if (!verbose) {
-    std::cerr.clear();
+
+  const Stopwatch output_stopwatch;
+
+  if (quality) {
+    compute_quality(c3t3, *quality);
   }
 
   // Output
@@ -185,6 +286,10 @@ generate_mesh(
   c3t3.output_to_medit(medit_file);
   medit_file.close();
 
+  if (stats) {
+    stats->output_time = output_stopwatch.elapsed();
+  }
+
   return;
 }
 
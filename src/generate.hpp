@@ -2,6 +2,9 @@
 #define GENERATE_HPP
 
 #include "domain.hpp"
+#include "mesh_quality.hpp"
+#include "mesh_stats.hpp"
+#include "progress.hpp"
 #include "sizing_field.hpp"
 
 #include <functional>
@@ -15,6 +18,7 @@ void generate_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
     const std::string & outfile,
     const std::vector<std::vector<std::array<double, 3>>> & extra_feature_edges = {},
+    const bool detect_features = false,
     const double bounding_sphere_radius = 0.0,
     const bool lloyd = false,
     const bool odt = false,
@@ -41,7 +45,10 @@ void generate_mesh(
     const double exude_sliver_bound = 0.0,
     //
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality = nullptr,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress = nullptr,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats = nullptr
     );
 
 } // namespace pygalmesh
@@ -8,23 +8,221 @@
 #include <CGAL/Delaunay_mesh_face_base_2.h>
 #include <CGAL/Delaunay_mesh_vertex_base_2.h>
 #include <CGAL/Delaunay_mesh_size_criteria_2.h>
+#include <CGAL/Triangulation_face_base_with_info_2.h>
+#include <CGAL/Triangulation_vertex_base_with_info_2.h>
 #include <CGAL/lloyd_optimize_mesh_2.h>
 
+#include <functional>
+#include <limits>
+#include <set>
+#include <sstream>
+#include <stdexcept>
+
 namespace pygalmesh {
 
 typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
-typedef CGAL::Delaunay_mesh_vertex_base_2<K> Vb;
-typedef CGAL::Delaunay_mesh_face_base_2<K> Fb;
+// The info is the index of the vertex in the output.
+typedef CGAL::Triangulation_vertex_base_with_info_2<std::size_t, K> Vb_info;
+typedef CGAL::Delaunay_mesh_vertex_base_2<K, Vb_info> Vb;
+typedef CGAL::Delaunay_mesh_face_base_2<K> Fb_mesh;
+// The info is the region of the face, see label_regions().
+typedef CGAL::Triangulation_face_base_with_info_2<int, K, Fb_mesh> Fb;
 typedef CGAL::Triangulation_data_structure_2<Vb, Fb> Tds;
 typedef CGAL::Constrained_Delaunay_triangulation_2<K, Tds> CDT;
 typedef CGAL::Delaunay_mesh_size_criteria_2<CDT> Criteria;
+typedef CDT::Face_handle Face_handle;
 typedef CDT::Vertex_handle Vertex_handle;
 typedef CDT::Point Point;
 
-std::tuple<std::vector<std::array<double, 2>>, std::vector<std::array<int, 3>>>
+// Same as CGAL::Delaunay_mesh_size_criteria_2, but with the edge size bound given by a
+// function of the position, evaluated at the centroid of the triangle. Nonpositive
+// values mean no bound.
+template <class CDT>
+class Sizing_field_criteria_2
+{
+  public:
+  typedef typename CDT::Face_handle Face_handle;
+  typedef typename CGAL::Delaunay_mesh_size_criteria_2<CDT>::Quality Quality;
+  typedef std::function<double(double, double)> Sizing_field;
+
+  Sizing_field_criteria_2(const double aspect_bound, const Sizing_field & size):
+    B_(aspect_bound),
+    size_(size)
+  {
+  }
+
+  class Is_bad
+  {
+    public:
+    Is_bad(const double aspect_bound, const Sizing_field & size):
+      B_(aspect_bound),
+      size_(size)
+    {
+    }
+
+    CGAL::Mesh_2::Face_badness
+    operator()(const Quality q) const
+    {
+      if (q.size() > 1) {
+        return CGAL::Mesh_2::IMPERATIVELY_BAD;
+      }
+      return q.sine() < B_ ? CGAL::Mesh_2::BAD : CGAL::Mesh_2::NOT_BAD;
+    }
+
+    CGAL::Mesh_2::Face_badness
+    operator()(const Face_handle & fh, Quality & q) const
+    {
+      const auto & pa = fh->vertex(0)->point();
+      const auto & pb = fh->vertex(1)->point();
+      const auto & pc = fh->vertex(2)->point();
+
+      const double a = CGAL::to_double(CGAL::squared_distance(pb, pc));
+      const double b = CGAL::to_double(CGAL::squared_distance(pc, pa));
+      const double c = CGAL::to_double(CGAL::squared_distance(pa, pb));
+
+      // the largest and the second largest squared edge length
+      double max_sq_length = a;
+      double second_max_sq_length = b;
+      if (max_sq_length < second_max_sq_length) {
+        std::swap(max_sq_length, second_max_sq_length);
+      }
+      if (c > max_sq_length) {
+        second_max_sq_length = max_sq_length;
+        max_sq_length = c;
+      } else if (c > second_max_sq_length) {
+        second_max_sq_length = c;
+      }
+
+      q.second = 0;
+      const double size = size_(
+          CGAL::to_double(pa.x() + pb.x() + pc.x()) / 3,
+          CGAL::to_double(pa.y() + pb.y() + pc.y()) / 3
+          );
+      if (size > 0) {
+        q.second = max_sq_length / (size * size);
+        if (q.size() > 1) {
+          // no need to compute the angle
+          q.first = 1;
+          return CGAL::Mesh_2::IMPERATIVELY_BAD;
+        }
+      }
+
+      // the squared sine of the smallest angle
+      const double area = 2 * CGAL::to_double(CGAL::area(pa, pb, pc));
+      q.first = (area * area) / (max_sq_length * second_max_sq_length);
+      return q.sine() < B_ ? CGAL::Mesh_2::BAD : CGAL::Mesh_2::NOT_BAD;
+    }
+
+    private:
+    const double B_;
+    const Sizing_field size_;
+  };
+
+  Is_bad
+  is_bad_object() const
+  {
+    return Is_bad(B_, size_);
+  }
+
+  private:
+  const double B_;
+  const Sizing_field size_;
+};
+
+const int outside_region = -1;
+
+// Set the info of all faces to the region they're in: outside_region for the faces
+// that are connected to the infinite face or to one of the holes without crossing a
+// constraint, k + 1 for those connected to seeds[k], and 0 for all others. The
+// in_domain marks are set for all faces that aren't outside.
+void
+label_regions(
+    CDT & cdt,
+    const std::vector<Point> & seeds,
+    const std::vector<Point> & holes
+    )
+{
+  const int unlabeled = std::numeric_limits<int>::min();
+  for (auto fit: cdt.all_face_handles()) {
+    fit->info() = unlabeled;
+  }
+
+  std::vector<Face_handle> stack;
+  const auto flood = [&](const Face_handle start, const int region) {
+    start->info() = region;
+    stack.push_back(start);
+    while (!stack.empty()) {
+      const Face_handle fh = stack.back();
+      stack.pop_back();
+      for (int i = 0; i < 3; i++) {
+        const Face_handle neighbor = fh->neighbor(i);
+        if (neighbor->info() != unlabeled || cdt.is_constrained(CDT::Edge(fh, i))) {
+          continue;
+        }
+        neighbor->info() = region;
+        stack.push_back(neighbor);
+      }
+    }
+  };
+
+  flood(cdt.infinite_face(), outside_region);
+  for (const auto & hole: holes) {
+    const Face_handle fh = cdt.locate(hole);
+    if (fh->info() == unlabeled) {
+      flood(fh, outside_region);
+    }
+  }
+  for (std::size_t k = 0; k < seeds.size(); k++) {
+    const Face_handle fh = cdt.locate(seeds[k]);
+    if (fh->info() == outside_region) {
+      std::stringstream msg;
+      msg << "Seed " << k << " " << seeds[k] << " is outside of the domain or in a hole";
+      throw std::runtime_error(msg.str());
+    }
+    if (fh->info() != unlabeled) {
+      std::stringstream msg;
+      msg << "Seeds " << fh->info() - 1 << " and " << k << " are in the same region";
+      throw std::runtime_error(msg.str());
+    }
+    flood(fh, static_cast<int>(k) + 1);
+  }
+  for (auto fit: cdt.finite_face_handles()) {
+    if (fit->info() == unlabeled) {
+      flood(fit, 0);
+    }
+    fit->set_in_domain(fit->info() != outside_region);
+  }
+}
+
+// Refine the faces which are marked as in the domain; the marks aren't recomputed.
+template <class Mesh_criteria>
+void
+refine_marked(CDT & cdt, const Mesh_criteria & criteria)
+{
+  CGAL::Delaunay_mesher_2<CDT, Mesh_criteria> mesher(cdt, criteria);
+  mesher.init(true);
+  mesher.refine_mesh();
+}
+
+// the smaller of two size bounds, where nonpositive bounds mean no bound
+double
+min_size(const double a, const double b)
+{
+  if (a <= 0.0) {
+    return b;
+  }
+  if (b <= 0.0) {
+    return a;
+  }
+  return std::min(a, b);
+}
+
+std::tuple<std::vector<double>, std::vector<std::int64_t>, std::vector<std::int64_t>>
 generate_2d(
-  const std::vector<std::array<double, 2>> & points,
-  const std::vector<std::array<int, 2>> & constraints,
+  const double * points,
+  const std::size_t num_points,
+  const std::int64_t * constraints,
+  const std::size_t num_constraints,
   // See
   // https://doc.cgal.org/latest/Mesh_2/classCGAL_1_1Delaunay__mesh__size__criteria__2.html#a58b0186eae407ba76b8f4a3d0aa85a1a
   // for what the bounds mean. Spoiler:
@@ -33,64 +231,145 @@ generate_2d(
   // edge_size S: "all segments of all triangles must be shorter than a bound S."
   const double max_circumradius_shortest_edge_ratio,
   const double max_edge_size,
-  const int num_lloyd_steps
+  const std::shared_ptr<pygalmesh::SizingFieldBase> & max_edge_size_field,
+  const int num_lloyd_steps,
+  const double * seeds,
+  const std::size_t num_seeds,
+  const double * region_max_edge_sizes,
+  const double * holes,
+  const std::size_t num_holes
 )
 {
-  CDT cdt;
+  for (std::size_t k = 0; k < 2*num_constraints; k++) {
+    if (constraints[k] < 0 || static_cast<std::size_t>(constraints[k]) >= num_points) {
+      std::stringstream msg;
+      msg << "Invalid constraint index " << constraints[k]
+        << " (number of points: " << num_points << ")";
+      throw std::runtime_error(msg.str());
+    }
+  }
+
   // construct a constrained triangulation
-  std::vector<Vertex_handle> vertices(points.size());
-  int k = 0;
-  for (auto pt: points) {
-    vertices[k] = cdt.insert(Point(pt[0], pt[1]));
-    k++;
+  // Insert everything at once: CGAL then sorts the points spatially (along a Hilbert
+  // curve) first, which makes the point location much faster than with inserting the
+  // points one by one in the input order, and looks up the vertex handles for the
+  // constraints itself. The order of insertion determines the order in which the
+  // refinement visits the triangles, so the meshes can differ from those of an
+  // insertion in input order (but they satisfy the same criteria).
+  std::vector<Point> cgal_points;
+  cgal_points.reserve(num_points);
+  for (std::size_t k = 0; k < num_points; k++) {
+    cgal_points.push_back(Point(points[2*k], points[2*k + 1]));
   }
-  for (auto c: constraints) {
-    cdt.insert_constraint(vertices[c[0]], vertices[c[1]]);
+  std::vector<std::pair<std::size_t, std::size_t>> segments;
+  segments.reserve(num_constraints);
+  for (std::size_t k = 0; k < num_constraints; k++) {
+    segments.push_back(std::make_pair(
+          static_cast<std::size_t>(constraints[2*k]),
+          static_cast<std::size_t>(constraints[2*k + 1])
+          ));
   }
+  CDT cdt;
+  cdt.insert_constraints(
+      cgal_points.begin(), cgal_points.end(),
+      segments.begin(), segments.end()
+      );
 
   // create proper mesh
-  CGAL::refine_Delaunay_mesh_2(
-      cdt,
-      Criteria(
-        0.25 / (max_circumradius_shortest_edge_ratio * max_circumradius_shortest_edge_ratio),
-        max_edge_size
-       )
-      );
+  const double aspect_bound =
+    0.25 / (max_circumradius_shortest_edge_ratio * max_circumradius_shortest_edge_ratio);
+  const auto size_at = [&](const double x, const double y) {
+    return max_edge_size_field ? max_edge_size_field->eval({x, y, 0.0}) : max_edge_size;
+  };
+
+  std::vector<Point> seed_points;
+  seed_points.reserve(num_seeds);
+  for (std::size_t k = 0; k < num_seeds; k++) {
+    seed_points.push_back(Point(seeds[2*k], seeds[2*k + 1]));
+  }
+  std::vector<Point> hole_points;
+  hole_points.reserve(num_holes);
+  for (std::size_t k = 0; k < num_holes; k++) {
+    hole_points.push_back(Point(holes[2*k], holes[2*k + 1]));
+  }
+  const bool has_regions = num_seeds > 0 || num_holes > 0;
+
+  if (has_regions) {
+    // The regions with a size bound of their own are refined first, one pass per
+    // distinct bound with only those regions marked as in the domain. Refining a region
+    // only inserts points in it or on its boundary, so the other regions stay as they
+    // are, except for the splits of shared boundary edges. The final pass over the
+    // whole domain then takes care of the shape of the triangles everywhere and of the
+    // global size bound.
+    std::set<double> region_sizes;
+    for (std::size_t k = 0; k < num_seeds; k++) {
+      if (region_max_edge_sizes[k] > 0.0) {
+        region_sizes.insert(region_max_edge_sizes[k]);
+      }
+    }
+    for (const double region_size: region_sizes) {
+      label_regions(cdt, seed_points, hole_points);
+      for (auto fit: cdt.finite_face_handles()) {
+        fit->set_in_domain(
+            fit->info() > 0 && region_max_edge_sizes[fit->info() - 1] == region_size
+            );
+      }
+      const Sizing_field_criteria_2<CDT> criteria(
+          aspect_bound,
+          [&](const double x, const double y) {
+            return min_size(region_size, size_at(x, y));
+          });
+      refine_marked(cdt, criteria);
+    }
+    label_regions(cdt, seed_points, hole_points);
+    const Sizing_field_criteria_2<CDT> criteria(aspect_bound, size_at);
+    refine_marked(cdt, criteria);
+  } else if (max_edge_size_field) {
+    CGAL::refine_Delaunay_mesh_2(cdt, Sizing_field_criteria_2<CDT>(aspect_bound, size_at));
+  } else {
+    CGAL::refine_Delaunay_mesh_2(cdt, Criteria(aspect_bound, max_edge_size));
+  }
 
   if (num_lloyd_steps > 0) {
+    if (has_regions) {
+      label_regions(cdt, seed_points, hole_points);
+    }
     CGAL::lloyd_optimize_mesh_2(
       cdt,
       CGAL::parameters::max_iteration_number = num_lloyd_steps
     );
   }
+  if (has_regions) {
+    label_regions(cdt, seed_points, hole_points);
+  }
 
-  // convert points to vector of arrays
-  std::map<Vertex_handle, int> vertex_index;
-  std::vector<std::array<double, 2>> out_points(cdt.number_of_vertices());
-  k = 0;
+  // number the vertices in the order of output
+  std::vector<double> out_points;
+  out_points.reserve(2 * cdt.number_of_vertices());
+  std::size_t k = 0;
   for (auto vit: cdt.finite_vertex_handles()) {
-    out_points[k][0] = vit->point()[0];
-    out_points[k][1] = vit->point()[1];
-    vertex_index[vit] = k;
+    out_points.push_back(vit->point().x());
+    out_points.push_back(vit->point().y());
+    vit->info() = k;
     k++;
   }
 
   // https://github.com/CGAL/cgal/issues/5068#issuecomment-706213606
-  auto nb_faces = 0u;
-  for (auto fit: cdt.finite_face_handles()) {
-    if(fit->is_in_domain()) ++nb_faces;
-  }
-  std::vector<std::array<int, 3>> out_cells(nb_faces);
-  k = 0;
+  std::vector<std::int64_t> out_cells;
+  out_cells.reserve(3 * cdt.number_of_faces());
+  std::vector<std::int64_t> out_regions;
+  out_regions.reserve(cdt.number_of_faces());
   for (auto fit: cdt.finite_face_handles()) {
     if(!fit->is_in_domain()) continue;
-    out_cells[k][0] = vertex_index[fit->vertex(0)];
-    out_cells[k][1] = vertex_index[fit->vertex(1)];
-    out_cells[k][2] = vertex_index[fit->vertex(2)];
-    k++;
+    out_cells.push_back(fit->vertex(0)->info());
+    out_cells.push_back(fit->vertex(1)->info());
+    out_cells.push_back(fit->vertex(2)->info());
+    out_regions.push_back(has_regions ? fit->info() : 0);
   }
 
-  return std::make_tuple(out_points, out_cells);
+  return std::make_tuple(
+      std::move(out_points), std::move(out_cells), std::move(out_regions)
+      );
 }
 
 } // namespace pygalmesh
@@ -1,22 +1,44 @@
 #ifndef GENERATE_2D_HPP
 #define GENERATE_2D_HPP
 
+#include "sizing_field.hpp"
+
+#include <cstddef>
+#include <cstdint>
 #include <memory>
+#include <tuple>
 #include <vector>
 
 namespace pygalmesh {
 
-std::tuple<std::vector<std::array<double, 2>>, std::vector<std::array<int, 3>>>
+// Points and constraints are given as row-major arrays of shape (num_points, 2) and
+// (num_constraints, 2); the output points and triangles come back the same way, along
+// with the region of each triangle.
+//
+// The domain consists of the regions bounded by the constraints, minus those that
+// contain one of the holes. The region that contains seeds[k] gets the id k + 1, all
+// others 0. If region_max_edge_sizes[k] is positive, it's used as the edge size bound in
+// that region (unless the global bound is smaller).
+std::tuple<std::vector<double>, std::vector<std::int64_t>, std::vector<std::int64_t>>
 generate_2d(
-  const std::vector<std::array<double, 2>> & points,
-  const std::vector<std::array<int, 2>> & constraints,
+  const double * points,
+  const std::size_t num_points,
+  const std::int64_t * constraints,
+  const std::size_t num_constraints,
   const double max_circumradius_shortest_edge_ratio,
   // https://github.com/CGAL/cgal/issues/5061#issuecomment-705520984
   // the "default" size criterion for a triangle in the 2D mesh generator refers to its
   // edge lengths. In the output mesh, all segments of all triangles must be shorter
   // than the given bound.
   const double max_edge_size,
-  const int num_lloyd_steps
+  // if given, replaces max_edge_size with a bound that varies over the domain
+  const std::shared_ptr<pygalmesh::SizingFieldBase> & max_edge_size_field,
+  const int num_lloyd_steps,
+  const double * seeds,
+  const std::size_t num_seeds,
+  const double * region_max_edge_sizes,
+  const double * holes,
+  const std::size_t num_holes
 );
 
 } // namespace pygalmesh
@@ -1,11 +1,22 @@
 #define CGAL_MESH_3_VERBOSE 1
 
 #include "generate_from_inr.hpp"
+#include "label_pyramid.hpp"
+#include "make_mesh.hpp"
 
 #include <cassert>
+#include <cmath>
+#include <iomanip>
+#include <limits>
+#include <map>
+#include <set>
+#include <sstream>
+#include <stdexcept>
+#include <type_traits>
 
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 #include <CGAL/Image_3.h>
+#include <CGAL/ImageIO.h>
 
 #include <CGAL/Mesh_triangulation_3.h>
 #include <CGAL/Mesh_complex_3_in_triangulation_3.h>
@@ -13,7 +24,7 @@
 
 #include <CGAL/Implicit_mesh_domain_3.h>
 #include <CGAL/Mesh_domain_with_polyline_features_3.h>
-#include <CGAL/make_mesh_3.h>
+#include <CGAL/tags.h>
 
 namespace pygalmesh {
 
@@ -21,21 +32,242 @@ typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
 
 typedef CGAL::Labeled_mesh_domain_3<K> Mesh_domain;
 
-// Triangulation
-typedef CGAL::Mesh_triangulation_3<Mesh_domain>::type Tr;
-typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
-
-// Mesh Criteria
-typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
-typedef Mesh_criteria::Facet_criteria Facet_criteria;
-typedef Mesh_criteria::Cell_criteria Cell_criteria;
-
 typedef CGAL::Mesh_constant_domain_field_3<Mesh_domain::R,
                                            Mesh_domain::Index> Sizing_field_cell;
 
+// Labeling function of a labeled image that answers from a LabelPyramid wherever the
+// eight voxels around the point have the same label. Elsewhere, it interpolates the
+// labels like the image domains of CGAL do.
+template <typename Word>
+class Pyramid_labeling_function
+{
+  public:
+  Pyramid_labeling_function(const CGAL::Image_3 & image):
+    image_(image),
+    pyramid_(std::make_shared<LabelPyramid<Word>>(
+          static_cast<const Word *>(image.data()),
+          image.xdim(),
+          image.ydim(),
+          image.zdim()
+          ))
+  {
+  }
+
+  int
+  operator()(const K::Point_3 & p) const
+  {
+    const std::array<double, 3> x = {
+      p.x() / image_.vx(),
+      p.y() / image_.vy(),
+      p.z() / image_.vz()
+    };
+    const std::array<std::size_t, 3> dims = {
+      image_.xdim(),
+      image_.ydim(),
+      image_.zdim()
+    };
+    std::array<std::size_t, 3> lower;
+    std::array<std::size_t, 3> upper;
+    bool is_inside = true;
+    for (int d = 0; d < 3; d++) {
+      const double l = std::floor(x[d]);
+      if (!(l >= 0.0 && l + 1.0 < dims[d])) {
+        is_inside = false;
+        break;
+      }
+      lower[d] = static_cast<std::size_t>(l);
+      upper[d] = lower[d] + 1;
+    }
+    if (is_inside) {
+      const std::int32_t label = pyramid_->label(lower, upper);
+      if (label >= 0) {
+        return label;
+      }
+    }
+    return static_cast<int>(
+        image_.labellized_trilinear_interpolation<Word>(p.x(), p.y(), p.z(), Word(0))
+        );
+  }
+
+  private:
+  const CGAL::Image_3 image_;
+  // shared by the copies CGAL makes of the function
+  const std::shared_ptr<const LabelPyramid<Word>> pyramid_;
+};
+
+// The domain of a labeled image, optionally with the labels looked up through a label
+// pyramid (see LabelPyramid). The pyramid indexes voxels from the origin, so translated
+// images and non-integer labels are left to CGAL.
+Mesh_domain
+make_labeled_image_domain(const CGAL::Image_3 & image, const bool label_pyramid)
+{
+  const _image * im = image.image();
+  if (label_pyramid && im->tx == 0.0 && im->ty == 0.0 && im->tz == 0.0) {
+    // the bounding box that CGAL uses for images
+    const CGAL::Bbox_3 bbox(
+        -1.0,
+        -1.0,
+        -1.0,
+        image.xdim() * image.vx(),
+        image.ydim() * image.vy(),
+        image.zdim() * image.vz()
+        );
+    CGAL_IMAGE_IO_CASE(
+        im,
+        if (std::is_integral<Word>::value) {
+          return Mesh_domain(Pyramid_labeling_function<Word>(image), bbox);
+        }
+        );
+  }
+  return Mesh_domain::create_labeled_image_mesh_domain(image);
+}
+
+// Move the vertices of the mesh from image to world coordinates, x -> A x + b with
+// transform = [A | b] (3x4, row by row).
+template <class C3t3>
+void
+transform_mesh(C3t3 & c3t3, const std::vector<double> & transform)
+{
+  typedef typename C3t3::Triangulation Tr;
+  typedef typename Tr::Bare_point Bare_point;
+  typedef typename Tr::Weighted_point Weighted_point;
+
+  if (transform.size() != 12) {
+    std::stringstream msg;
+    msg << "The transform must have 12 entries, not " << transform.size();
+    throw std::invalid_argument(msg.str());
+  }
+  Tr & tr = c3t3.triangulation();
+  for (auto v = tr.finite_vertices_begin(); v != tr.finite_vertices_end(); ++v) {
+    const Weighted_point & p = v->point();
+    const std::array<double, 3> x = {p.x(), p.y(), p.z()};
+    std::array<double, 3> y;
+    for (int i = 0; i < 3; i++) {
+      y[i] = transform[4 * i] * x[0]
+        + transform[4 * i + 1] * x[1]
+        + transform[4 * i + 2] * x[2]
+        + transform[4 * i + 3];
+    }
+    v->set_point(Weighted_point(Bare_point(y[0], y[1], y[2]), p.weight()));
+  }
+}
+
+// Write a part of the mesh to a medit file: the cells of the given subdomains (all if
+// there are none), and/or the facets on the boundary of these subdomains. Only what's
+// written is visited. The triangles point out of the subdomain that is their
+// reference, and the vertices have the reference of the first cell or triangle they're
+// written with.
+template <class C3t3>
 void
-generate_from_inr(
-    const std::string & inr_filename,
+output_part_to_medit(
+    const C3t3 & c3t3,
+    std::ostream & os,
+    const std::vector<int> & subdomains,
+    const bool write_cells,
+    const bool write_facets
+    )
+{
+  typedef typename C3t3::Triangulation Tr;
+  typedef typename Tr::Cell_handle Cell_handle;
+  typedef typename Tr::Vertex_handle Vertex_handle;
+
+  const Tr & tr = c3t3.triangulation();
+  const std::set<int> selected(subdomains.begin(), subdomains.end());
+  const auto is_selected = [&](const Cell_handle & c) {
+    return c3t3.is_in_complex(c) && (
+        selected.empty() || selected.count(int(c3t3.subdomain_index(c))) > 0
+        );
+  };
+
+  std::map<Vertex_handle, std::size_t> vertex_indices;
+  std::vector<Vertex_handle> vertices;
+  std::vector<int> vertex_refs;
+  const auto vertex_index = [&](const Vertex_handle & v, const int ref) {
+    const auto inserted = vertex_indices.insert({v, vertices.size() + 1});
+    if (inserted.second) {
+      vertices.push_back(v);
+      vertex_refs.push_back(ref);
+    }
+    return inserted.first->second;
+  };
+
+  std::vector<std::array<std::size_t, 3>> triangles;
+  std::vector<int> triangle_refs;
+  if (write_facets) {
+    for (auto f = c3t3.facets_in_complex_begin(); f != c3t3.facets_in_complex_end(); ++f) {
+      // the side of a selected subdomain, if any
+      auto facet = *f;
+      if (!is_selected(facet.first)) {
+        facet = tr.mirror_facet(facet);
+        if (!is_selected(facet.first)) {
+          continue;
+        }
+      }
+      const int ref = int(c3t3.subdomain_index(facet.first));
+      // Tr::vertex_triple_index() orients the facet towards the inside of the cell;
+      // reverse it.
+      const int i = facet.second;
+      triangles.push_back({
+        vertex_index(facet.first->vertex(Tr::vertex_triple_index(i, 0)), ref),
+        vertex_index(facet.first->vertex(Tr::vertex_triple_index(i, 2)), ref),
+        vertex_index(facet.first->vertex(Tr::vertex_triple_index(i, 1)), ref)
+      });
+      triangle_refs.push_back(ref);
+    }
+  }
+
+  std::vector<std::array<std::size_t, 4>> tetrahedra;
+  std::vector<int> tetrahedron_refs;
+  if (write_cells) {
+    for (auto c = c3t3.cells_in_complex_begin(); c != c3t3.cells_in_complex_end(); ++c) {
+      const Cell_handle cell = c;
+      if (!is_selected(cell)) {
+        continue;
+      }
+      const int ref = int(c3t3.subdomain_index(cell));
+      tetrahedra.push_back({
+        vertex_index(cell->vertex(0), ref),
+        vertex_index(cell->vertex(1), ref),
+        vertex_index(cell->vertex(2), ref),
+        vertex_index(cell->vertex(3), ref)
+      });
+      tetrahedron_refs.push_back(ref);
+    }
+  }
+
+  os << std::setprecision(17);
+  os << "MeshVersionFormatted 1\n"
+    << "Dimension 3\n"
+    << "Vertices\n"
+    << vertices.size() << "\n";
+  for (std::size_t k = 0; k < vertices.size(); k++) {
+    const auto & p = vertices[k]->point();
+    os << p.x() << " " << p.y() << " " << p.z() << " " << vertex_refs[k] << "\n";
+  }
+  os << "Triangles\n" << triangles.size() << "\n";
+  for (std::size_t k = 0; k < triangles.size(); k++) {
+    const auto & t = triangles[k];
+    os << t[0] << " " << t[1] << " " << t[2] << " " << triangle_refs[k] << "\n";
+  }
+  os << "Tetrahedra\n" << tetrahedra.size() << "\n";
+  for (std::size_t k = 0; k < tetrahedra.size(); k++) {
+    const auto & t = tetrahedra[k];
+    os << t[0] << " " << t[1] << " " << t[2] << " " << t[3] << " "
+      << tetrahedron_refs[k] << "\n";
+  }
+  os << "End\n";
+}
+
+// Mesh the image domain and write the result to outfile. With CGAL::Parallel_tag, the
+// refinement and the optimizers run on all cores (if CGAL was built with TBB; otherwise
+// CGAL::Parallel_if_available_tag is the same as CGAL::Sequential_tag). A nonempty
+// transform is applied to the mesh before it's written (see transform_mesh()). output is
+// "both", "surface", or "volume"; with output_subdomains, only (the boundaries of) these
+// subdomains are written (see output_part_to_medit()).
+template <class Concurrency_tag, class Cell_size>
+void
+mesh_image(
+    const Mesh_domain & cgal_domain,
     const std::string & outfile,
     const bool lloyd,
     const bool odt,
@@ -46,21 +278,32 @@ generate_from_inr(
     const double max_radius_surface_delaunay_ball,
     const double max_facet_distance,
     const double max_circumradius_edge_ratio,
-    const double max_cell_circumradius,
+    const Cell_size & max_cell_circumradius,
     const double exude_time_limit,
     const double exude_sliver_bound,
     const bool verbose,
-    const int seed
+    const std::vector<double> & transform,
+    const std::vector<int> & output_subdomains,
+    const std::string & output,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats,
+    ProgressMonitor & monitor
     )
 {
-  CGAL::get_default_random() = CGAL::Random(seed);
-
-  CGAL::Image_3 image;
-  const bool success = image.read(inr_filename.c_str());
-  if (!success) {
-    throw "Could not read image file";
+  if (output != "both" && output != "surface" && output != "volume") {
+    std::stringstream msg;
+    msg << "output must be \"both\", \"surface\", or \"volume\", not \"" << output << "\"";
+    throw std::invalid_argument(msg.str());
   }
-  Mesh_domain cgal_domain = Mesh_domain::create_labeled_image_mesh_domain(image);
+
+  // Triangulation
+  typedef typename CGAL::Mesh_triangulation_3<
+    Mesh_domain, CGAL::Default, Concurrency_tag
+    >::type Tr;
+  typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
+
+  // Mesh Criteria
+  typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
 
   Mesh_criteria criteria(
       CGAL::parameters::edge_size=max_edge_size_at_feature_edges,
@@ -72,38 +315,88 @@ generate_from_inr(
       );
 
   // Mesh generation
-  if (!verbose) {
-    // suppress output
-    std::cerr.setstate(std::ios_base::failbit);
-  }
-  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
+  C3t3 c3t3 = make_mesh<C3t3>(
       cgal_domain,
       criteria,
-      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
-      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
-      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
-      exude ?
-        CGAL::parameters::exude(
-          CGAL::parameters::time_limit = exude_time_limit,
-          CGAL::parameters::sliver_bound = exude_sliver_bound
-        ) :
-        CGAL::parameters::no_exude()
+      lloyd,
+      odt,
+      perturb,
+      exude,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      monitor
       );
-  if (!verbose) {
-    std::cerr.clear();
+
+  const Stopwatch output_stopwatch;
+
+  // the quality of the tetrahedra that are written, in the same order
+  if (quality) {
+    if (output == "surface") {
+      quality->clear();
+    } else {
+      compute_quality(c3t3, *quality, output_subdomains);
+    }
+  }
+
+  if (!transform.empty()) {
+    transform_mesh(c3t3, transform);
   }
 
   // Output
   std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
+  if (output == "both" && output_subdomains.empty()) {
+    c3t3.output_to_medit(medit_file);
+  } else {
+    output_part_to_medit(
+        c3t3,
+        medit_file,
+        output_subdomains,
+        output != "surface",
+        output != "volume"
+        );
+  }
   medit_file.close();
-  return;
+
+  if (stats) {
+    stats->output_time = output_stopwatch.elapsed();
+  }
 }
 
+// Wrap a buffer (x varying fastest) in an image without copying it; without ownership,
+// CGAL::Image_3 leaves the data alone when it's destroyed.
+static
+CGAL::Image_3
+wrap_image(
+    const void * data,
+    const std::size_t bytes_per_value,
+    const WORD_KIND word_kind,
+    const SIGN sign,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & voxel_size
+    )
+{
+  _image * im = _initImage();
+  im->xdim = shape[0];
+  im->ydim = shape[1];
+  im->zdim = shape[2];
+  im->vdim = 1;
+  im->vx = voxel_size[0];
+  im->vy = voxel_size[1];
+  im->vz = voxel_size[2];
+  im->wdim = bytes_per_value;
+  im->wordKind = word_kind;
+  im->sign = sign;
+  im->data = const_cast<void *>(data);
+  return CGAL::Image_3(im, CGAL::Image_3::NO_OWNERSHIP);
+}
 
 void
-generate_from_inr_with_subdomain_sizing(
-    const std::string & inr_filename,
+generate_from_labeled_image(
+    const void * data,
+    const std::size_t bytes_per_value,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & voxel_size,
     const std::string & outfile,
     const double default_max_cell_circumradius,
     const std::vector<double> & max_cell_circumradiuss,
@@ -120,58 +413,198 @@ generate_from_inr_with_subdomain_sizing(
     const double exude_time_limit,
     const double exude_sliver_bound,
     const bool verbose,
-    const int seed
+    const int seed,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats,
+    const bool parallel,
+    const bool label_pyramid,
+    const std::vector<double> & transform,
+    const std::vector<int> & output_subdomains,
+    const std::string & output
     )
 {
+  if (bytes_per_value != 1 && bytes_per_value != 2) {
+    std::stringstream msg;
+    msg << "Labeled images must have 1- or 2-byte unsigned integer labels, not "
+      << bytes_per_value << "-byte ones";
+    throw std::invalid_argument(msg.str());
+  }
+  if (max_cell_circumradiuss.size() != cell_labels.size()) {
+    throw std::invalid_argument("Need one max_cell_circumradius per cell label");
+  }
+
   CGAL::get_default_random() = CGAL::Random(seed);
 
-  CGAL::Image_3 image;
-  const bool success = image.read(inr_filename.c_str());
-  if (!success) {
-    throw "Could not read image file";
+  const ActiveMeshStats active_stats(stats.get());
+  ProgressMonitor monitor(progress, stats);
+
+  const CGAL::Image_3 image = wrap_image(
+      data, bytes_per_value, WK_FIXED, SGN_UNSIGNED, shape, voxel_size
+      );
+  Mesh_domain cgal_domain = make_labeled_image_domain(image, label_pyramid);
+
+  const auto mesh = [&](auto concurrency_tag, const auto & max_cell_circumradius) {
+    mesh_image<decltype(concurrency_tag)>(
+        cgal_domain,
+        outfile,
+        lloyd,
+        odt,
+        perturb,
+        exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_facet_distance,
+        max_circumradius_edge_ratio,
+        max_cell_circumradius,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        transform,
+        output_subdomains,
+        output,
+        quality,
+        stats,
+        monitor
+        );
+  };
+  const auto mesh_with = [&](const auto & max_cell_circumradius) {
+    if (parallel) {
+      mesh(CGAL::Parallel_if_available_tag(), max_cell_circumradius);
+    } else {
+      mesh(CGAL::Sequential_tag(), max_cell_circumradius);
+    }
+  };
+
+  if (cell_labels.empty()) {
+    mesh_with(default_max_cell_circumradius);
+  } else {
+    Sizing_field_cell max_cell_circumradius(default_max_cell_circumradius);
+    const int ndimensions = 3;
+    for (std::size_t i = 0; i < cell_labels.size(); i++) {
+      max_cell_circumradius.set_size(
+          max_cell_circumradiuss[i],
+          ndimensions,
+          cgal_domain.index_from_subdomain_index(cell_labels[i])
+          );
+    }
+    mesh_with(max_cell_circumradius);
   }
-  Mesh_domain cgal_domain = Mesh_domain::create_labeled_image_mesh_domain(image);
+}
 
-  Sizing_field_cell max_cell_circumradius(default_max_cell_circumradius);
-  const int ndimensions = 3;
-  for(std::vector<double>::size_type i(0); i < max_cell_circumradiuss.size(); ++i)
-    max_cell_circumradius.set_size(max_cell_circumradiuss[i], ndimensions, cgal_domain.index_from_subdomain_index(cell_labels[i]));
+// Subdomain index 1 where the (trilinearly interpolated) gray value is beyond the
+// isovalue, 0 elsewhere.
+class Gray_value_to_label
+{
+  public:
+  Gray_value_to_label(const double iso_value, const bool inside_is_less):
+    iso_value_(iso_value),
+    inside_is_less_(inside_is_less)
+  {
+  }
 
-  Mesh_criteria criteria(
-      CGAL::parameters::edge_size=max_edge_size_at_feature_edges,
-      CGAL::parameters::facet_angle=min_facet_angle,
-      CGAL::parameters::facet_size=max_radius_surface_delaunay_ball,
-      CGAL::parameters::facet_distance=max_facet_distance,
-      CGAL::parameters::cell_radius_edge_ratio=max_circumradius_edge_ratio,
-      CGAL::parameters::cell_size=max_cell_circumradius
-      );
+  int
+  operator()(const double value) const
+  {
+    return (inside_is_less_ ? value < iso_value_ : value > iso_value_) ? 1 : 0;
+  }
 
-  // Mesh generation
-  if (!verbose) {
-    // suppress output
-    std::cerr.setstate(std::ios_base::failbit);
+  private:
+  const double iso_value_;
+  const bool inside_is_less_;
+};
+
+void
+generate_from_gray_image(
+    const void * data,
+    const std::size_t bytes_per_value,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & voxel_size,
+    const double iso_value,
+    const bool inside_is_less,
+    const std::string & outfile,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const double max_facet_distance,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats,
+    const bool parallel,
+    const std::vector<double> & transform,
+    const std::vector<int> & output_subdomains,
+    const std::string & output
+    )
+{
+  if (bytes_per_value != sizeof(float) && bytes_per_value != sizeof(double)) {
+    std::stringstream msg;
+    msg << "Gray images must have 4- or 8-byte floating point values, not "
+      << bytes_per_value << "-byte ones";
+    throw std::invalid_argument(msg.str());
   }
-  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
-      cgal_domain,
-      criteria,
-      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
-      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
-      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
-      exude ?
-        CGAL::parameters::exude(
-          CGAL::parameters::time_limit = exude_time_limit,
-          CGAL::parameters::sliver_bound = exude_sliver_bound
-        ) :
-        CGAL::parameters::no_exude()
+
+  CGAL::get_default_random() = CGAL::Random(seed);
+
+  const ActiveMeshStats active_stats(stats.get());
+  ProgressMonitor monitor(progress, stats);
+
+  const CGAL::Image_3 image = wrap_image(
+      data, bytes_per_value, WK_FLOAT, SGN_SIGNED, shape, voxel_size
       );
-  if (!verbose) {
-    std::cerr.clear();
-  }
 
-  // Output
-  std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
-  medit_file.close();
+  // Points outside of the image are outside of the domain.
+  const double value_outside = inside_is_less
+    ? std::numeric_limits<double>::max()
+    : std::numeric_limits<double>::lowest();
+  Mesh_domain cgal_domain = Mesh_domain::create_gray_image_mesh_domain(
+      image,
+      CGAL::parameters::iso_value = iso_value,
+      CGAL::parameters::value_outside = value_outside,
+      CGAL::parameters::image_values_to_subdomain_indices =
+        Gray_value_to_label(iso_value, inside_is_less)
+      );
+
+  const auto mesh = [&](auto concurrency_tag) {
+    mesh_image<decltype(concurrency_tag)>(
+        cgal_domain,
+        outfile,
+        lloyd,
+        odt,
+        perturb,
+        exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_facet_distance,
+        max_circumradius_edge_ratio,
+        max_cell_circumradius,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        transform,
+        output_subdomains,
+        output,
+        quality,
+        stats,
+        monitor
+        );
+  };
+  if (parallel) {
+    mesh(CGAL::Parallel_if_available_tag());
+  } else {
+    mesh(CGAL::Sequential_tag());
+  }
   return;
 }
 
@@ -1,50 +1,88 @@
 #ifndef GENERATE_FROM_INR_HPP
 #define GENERATE_FROM_INR_HPP
 
+#include "mesh_quality.hpp"
+#include "mesh_stats.hpp"
+#include "progress.hpp"
+
+#include <array>
+#include <cstddef>
+#include <memory>
 #include <string>
 #include <vector>
 
 namespace pygalmesh {
 
-void generate_from_inr(
-    const std::string & inr_filename,
+// Mesh the labels of a labeled image (uint8 or uint16 values, x varying fastest) as
+// subdomains. The cells of the subdomains in cell_labels get the corresponding
+// max_cell_circumradiuss, all others default_max_cell_circumradius. The data isn't
+// copied.
+void
+generate_from_labeled_image(
+    const void * data,
+    const std::size_t bytes_per_value,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & voxel_size,
     const std::string & outfile,
+    const double default_max_cell_circumradius = 0.0,
+    const std::vector<double> & max_cell_circumradiuss = {},
+    const std::vector<int> & cell_labels = {},
     const bool lloyd = false,
     const bool odt = false,
     const bool perturb = true,
     const bool exude = true,
-    const double max_edge_size_at_feature_edges = 0.0,  // std::numeric_limits<double>::max(),
+    const double max_edge_size_at_feature_edges = 0.0,
     const double min_facet_angle = 0.0,
     const double max_radius_surface_delaunay_ball = 0.0,
     const double max_facet_distance = 0.0,
     const double max_circumradius_edge_ratio = 0.0,
-    const double max_cell_circumradius = 0.0,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality = nullptr,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress = nullptr,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats = nullptr,
+    const bool parallel = false,
+    const bool label_pyramid = false,
+    const std::vector<double> & transform = {},
+    const std::vector<int> & output_subdomains = {},
+    const std::string & output = "both"
     );
 
+// Mesh the region of a gray image (float or double values, x varying fastest) where the
+// trilinear interpolation of the values is greater than iso_value (or less, with
+// inside_is_less). The data isn't copied.
 void
-generate_from_inr_with_subdomain_sizing(
-    const std::string & inr_filename,
+generate_from_gray_image(
+    const void * data,
+    const std::size_t bytes_per_value,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & voxel_size,
+    const double iso_value,
+    const bool inside_is_less,
     const std::string & outfile,
-    const double default_max_cell_circumradius,
-    const std::vector<double> & max_cell_circumradiuss,
-    const std::vector<int> & cell_labels,
     const bool lloyd = false,
     const bool odt = false,
-    const bool perturb  = true,
+    const bool perturb = true,
     const bool exude = true,
     const double max_edge_size_at_feature_edges = 0.0,
     const double min_facet_angle = 0.0,
     const double max_radius_surface_delaunay_ball = 0.0,
     const double max_facet_distance = 0.0,
     const double max_circumradius_edge_ratio = 0.0,
+    const double max_cell_circumradius = 0.0,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality = nullptr,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress = nullptr,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats = nullptr,
+    const bool parallel = false,
+    const std::vector<double> & transform = {},
+    const std::vector<int> & output_subdomains = {},
+    const std::string & output = "both"
     );
 
 } // namespace pygalmesh
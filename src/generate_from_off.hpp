@@ -1,14 +1,21 @@
 #ifndef GENERATE_FROM_OFF_HPP
 #define GENERATE_FROM_OFF_HPP
 
+#include "mesh_quality.hpp"
+#include "mesh_stats.hpp"
+#include "progress.hpp"
+#include "surface_mesh_domain.hpp"
+
+#include <array>
+#include <memory>
 #include <string>
 #include <vector>
 
 namespace pygalmesh {
 
 void
-generate_from_off(
-    const std::string & infile,
+generate_from_surface_mesh_domain(
+    const std::shared_ptr<pygalmesh::SurfaceMeshDomain> & domain,
     const std::string & outfile,
     const bool lloyd = false,
     const bool odt = false,
@@ -22,9 +29,14 @@ generate_from_off(
     const double max_cell_circumradius = 0.0,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
+    const bool detect_features = false,
+    const double feature_angle = 60.0,
+    const std::vector<std::vector<std::array<double, 3>>> & extra_feature_edges = {},
     const bool verbose = true,
-    const bool reorient = false,
-    const int seed = 0
+    const int seed = 0,
+    const std::shared_ptr<pygalmesh::MeshQuality> & quality = nullptr,
+    const std::shared_ptr<pygalmesh::ProgressBase> & progress = nullptr,
+    const std::shared_ptr<pygalmesh::MeshStats> & stats = nullptr
     );
 
 } // namespace pygalmesh
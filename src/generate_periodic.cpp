@@ -12,9 +12,12 @@
 #include <CGAL/Mesh_complex_3_in_triangulation_3.h>
 #include <CGAL/Mesh_criteria_3.h>
 #include <CGAL/number_type_config.h> // CGAL_PI
+#include <algorithm>
 #include <cmath>
 #include <iostream>
 #include <fstream>
+#include <limits>
+#include <map>
 
 
 namespace pygalmesh {
@@ -48,10 +51,10 @@ typedef CGAL::Mesh_criteria_3<Tr>                           Periodic_mesh_criter
 // To avoid verbose function and named parameters call
 using namespace CGAL::parameters;
 
-void
-generate_periodic_mesh(
+static
+C3t3
+make_periodic_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
-    const std::string & outfile,
     const std::array<double, 6> bounding_cuboid,
     const bool lloyd,
     const bool odt,
@@ -63,7 +66,6 @@ generate_periodic_mesh(
     const double max_facet_distance,
     const double max_circumradius_edge_ratio,
     const double max_cell_circumradius,
-    const int number_of_copies_in_output,
     const bool verbose,
     const int seed
     )
@@ -111,6 +113,45 @@ generate_periodic_mesh(
   if (!verbose) {
     std::cerr.clear();
   }
+  return c3t3;
+}
+
+void
+generate_periodic_mesh(
+    const std::shared_ptr<pygalmesh::DomainBase> & domain,
+    const std::string & outfile,
+    const std::array<double, 6> bounding_cuboid,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const double max_facet_distance,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const int number_of_copies_in_output,
+    const bool verbose,
+    const int seed
+    )
+{
+  const C3t3 c3t3 = make_periodic_mesh(
+      domain,
+      bounding_cuboid,
+      lloyd,
+      odt,
+      perturb,
+      exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_facet_distance,
+      max_circumradius_edge_ratio,
+      max_cell_circumradius,
+      verbose,
+      seed
+      );
 
   // Output
   std::ofstream medit_file(outfile);
@@ -120,4 +161,143 @@ generate_periodic_mesh(
   return;
 }
 
+PeriodicMeshArrays
+generate_periodic_mesh_arrays(
+    const std::shared_ptr<pygalmesh::DomainBase> & domain,
+    const std::array<double, 6> bounding_cuboid,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const double max_facet_distance,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const bool verbose,
+    const int seed
+    )
+{
+  const C3t3 c3t3 = make_periodic_mesh(
+      domain,
+      bounding_cuboid,
+      lloyd,
+      odt,
+      perturb,
+      exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_facet_distance,
+      max_circumradius_edge_ratio,
+      max_cell_circumradius,
+      verbose,
+      seed
+      );
+  const Tr & tr = c3t3.triangulation();
+
+  const std::array<double, 3> period = {
+    bounding_cuboid[3] - bounding_cuboid[0],
+    bounding_cuboid[4] - bounding_cuboid[1],
+    bounding_cuboid[5] - bounding_cuboid[2]
+  };
+
+  PeriodicMeshArrays out;
+  const std::size_t num_cells = c3t3.number_of_cells_in_complex();
+  out.cells.reserve(4 * num_cells);
+  out.offsets.reserve(12 * num_cells);
+  out.subdomains.reserve(num_cells);
+  out.unrolled_cells.reserve(4 * num_cells);
+
+  // Number the vertices of the cells in the complex in the order of appearance. The
+  // vertices of the unrolled mesh start with the same ones; a copy is appended for
+  // every pair of vertex and nonzero offset that occurs in a cell.
+  std::map<Tr::Vertex_handle, std::int64_t> vertex_index;
+  // (vertex index, offset code) -> unrolled vertex index, offset code = 4*x + 2*y + z
+  std::map<std::pair<std::int64_t, int>, std::int64_t> copy_index;
+  std::vector<std::array<double, 3>> copies;
+  for (auto cit = c3t3.cells_in_complex_begin(); cit != c3t3.cells_in_complex_end(); ++cit) {
+    const Tr::Cell_handle ch = cit;
+    // CGAL doesn't guarantee that one of the vertices is in the original domain in each
+    // direction, so shift the cell such that it is.
+    std::array<std::array<int, 3>, 4> offsets;
+    std::array<int, 3> min_offset = {
+      std::numeric_limits<int>::max(),
+      std::numeric_limits<int>::max(),
+      std::numeric_limits<int>::max()
+    };
+    for (int i = 0; i < 4; i++) {
+      const auto offset = tr.get_offset(ch, i);
+      offsets[i] = {offset.x(), offset.y(), offset.z()};
+      for (int j = 0; j < 3; j++) {
+        min_offset[j] = std::min(min_offset[j], offsets[i][j]);
+      }
+    }
+
+    for (int i = 0; i < 4; i++) {
+      const auto vh = ch->vertex(i);
+      const auto inserted = vertex_index.insert(
+          std::make_pair(vh, static_cast<std::int64_t>(vertex_index.size()))
+          );
+      const std::int64_t idx = inserted.first->second;
+      if (inserted.second) {
+        const auto & p = vh->point();
+        out.points.push_back(CGAL::to_double(p.x()));
+        out.points.push_back(CGAL::to_double(p.y()));
+        out.points.push_back(CGAL::to_double(p.z()));
+      }
+      out.cells.push_back(idx);
+
+      std::array<int, 3> offset;
+      for (int j = 0; j < 3; j++) {
+        offset[j] = offsets[i][j] - min_offset[j];
+        out.offsets.push_back(offset[j]);
+      }
+
+      if (offset[0] == 0 && offset[1] == 0 && offset[2] == 0) {
+        out.unrolled_cells.push_back(idx);
+        continue;
+      }
+      const int code = 4 * offset[0] + 2 * offset[1] + offset[2];
+      const auto copy = copy_index.insert(
+          std::make_pair(std::make_pair(idx, code), static_cast<std::int64_t>(copies.size()))
+          );
+      if (copy.second) {
+        const auto & p = vh->point();
+        copies.push_back({
+            CGAL::to_double(p.x()) + offset[0] * period[0],
+            CGAL::to_double(p.y()) + offset[1] * period[1],
+            CGAL::to_double(p.z()) + offset[2] * period[2]
+            });
+        out.node_pairs.push_back(idx);
+        out.node_pairs.push_back(-1);  // set below, once the number of vertices is known
+        out.node_pair_offsets.push_back(offset[0]);
+        out.node_pair_offsets.push_back(offset[1]);
+        out.node_pair_offsets.push_back(offset[2]);
+      }
+      // temporarily store the copies with negative indices
+      out.unrolled_cells.push_back(-1 - copy.first->second);
+    }
+    out.subdomains.push_back(c3t3.subdomain_index(ch));
+  }
+
+  const std::int64_t num_vertices = vertex_index.size();
+  for (auto & idx: out.unrolled_cells) {
+    if (idx < 0) {
+      idx = num_vertices - 1 - idx;
+    }
+  }
+  for (std::size_t k = 0; k < copies.size(); k++) {
+    out.node_pairs[2*k + 1] = num_vertices + k;
+  }
+  out.unrolled_points = out.points;
+  out.unrolled_points.reserve(out.points.size() + 3 * copies.size());
+  for (const auto & c: copies) {
+    out.unrolled_points.insert(out.unrolled_points.end(), c.begin(), c.end());
+  }
+
+  return out;
+}
+
 } // namespace pygalmesh
@@ -3,12 +3,36 @@
 
 #include "domain.hpp"
 
+#include <array>
+#include <cstdint>
 #include <memory>
 #include <string>
 #include <vector>
 
 namespace pygalmesh {
 
+// A periodic mesh as row-major arrays. Every vertex appears once in points (n, 3); the
+// position of vertex j of cell k is
+//
+//   points[cells[k, j]] + offsets[k, j] * (size of the bounding cuboid)
+//
+// with offsets (m, 4, 3) in {0, 1}. In the unrolled mesh, the vertices at nonzero
+// offsets are copies: unrolled_points starts with points and is followed by the copies,
+// so that unrolled_cells (m, 4) is an ordinary mesh of one period. node_pairs (p, 2)
+// holds the pairs (vertex, copy), where the copy is the vertex shifted by
+// node_pair_offsets (p, 3). subdomains (m) are the subdomain indices of the cells.
+struct PeriodicMeshArrays
+{
+  std::vector<double> points;
+  std::vector<std::int64_t> cells;
+  std::vector<std::int64_t> offsets;
+  std::vector<std::int64_t> subdomains;
+  std::vector<double> unrolled_points;
+  std::vector<std::int64_t> unrolled_cells;
+  std::vector<std::int64_t> node_pairs;
+  std::vector<std::int64_t> node_pair_offsets;
+};
+
 void generate_periodic_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
     const std::string & outfile,
@@ -28,6 +52,24 @@ void generate_periodic_mesh(
     const int seed = 0
     );
 
+PeriodicMeshArrays
+generate_periodic_mesh_arrays(
+    const std::shared_ptr<pygalmesh::DomainBase> & domain,
+    const std::array<double, 6> bounding_cuboid,
+    const bool lloyd = false,
+    const bool odt = false,
+    const bool perturb = true,
+    const bool exude = true,
+    const double max_edge_size_at_feature_edges = 0.0,
+    const double min_facet_angle = 0.0,
+    const double max_radius_surface_delaunay_ball = 0.0,
+    const double max_facet_distance = 0.0,
+    const double max_circumradius_edge_ratio = 0.0,
+    const double max_cell_circumradius = 0.0,
+    const bool verbose = true,
+    const int seed = 0
+    );
+
 } // namespace pygalmesh
 
 #endif // GENERATE_PERIODIC_HPP
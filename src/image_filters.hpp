@@ -0,0 +1,321 @@
+#ifndef IMAGE_FILTERS_HPP
+#define IMAGE_FILTERS_HPP
+
+// Preprocessing of 3D images (x varying fastest) before meshing. The filters work in
+// place where possible, are separable and run on all cores.
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <map>
+#include <sstream>
+#include <stdexcept>
+#include <thread>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+namespace pygalmesh {
+
+// Call f(begin, end) for contiguous chunks of [0, n), one per thread.
+template <typename F>
+void
+parallel_for(const std::size_t n, const F & f)
+{
+  const std::size_t num_threads = std::max<std::size_t>(
+      1, std::min<std::size_t>(std::thread::hardware_concurrency(), n)
+      );
+  if (num_threads <= 1) {
+    f(std::size_t(0), n);
+    return;
+  }
+  std::vector<std::thread> threads;
+  threads.reserve(num_threads);
+  for (std::size_t t = 0; t < num_threads; t++) {
+    threads.emplace_back(f, n * t / num_threads, n * (t + 1) / num_threads);
+  }
+  for (auto & thread : threads) {
+    thread.join();
+  }
+}
+
+// Replace the labels according to mapping; labels not in mapping are kept.
+template <typename T>
+void
+relabel_image(
+    T * data,
+    const std::size_t size,
+    const std::map<std::int64_t, std::int64_t> & mapping
+    )
+{
+  static_assert(
+      std::is_integral<T>::value && sizeof(T) <= 2,
+      "relabeling needs 8- or 16-bit labels"
+      );
+  std::vector<T> table(std::size_t(std::numeric_limits<T>::max()) + 1);
+  for (std::size_t i = 0; i < table.size(); i++) {
+    table[i] = static_cast<T>(i);
+  }
+  for (const auto & item : mapping) {
+    for (const std::int64_t label : {item.first, item.second}) {
+      if (label < 0 || label > std::int64_t(std::numeric_limits<T>::max())) {
+        std::stringstream msg;
+        msg << "Label " << label << " doesn't fit the image type (0 to "
+          << std::int64_t(std::numeric_limits<T>::max()) << ")";
+        throw std::invalid_argument(msg.str());
+      }
+    }
+    table[item.first] = static_cast<T>(item.second);
+  }
+  parallel_for(size, [&](const std::size_t begin, const std::size_t end) {
+    for (std::size_t i = begin; i < end; i++) {
+      data[i] = table[data[i]];
+    }
+  });
+}
+
+// Shrink the image by factor in every direction; blocks at the upper ends may be
+// partial. Every block of labels becomes its most frequent label (the smallest one on
+// ties), every block of gray values their mean.
+template <typename T>
+std::array<std::size_t, 3>
+downsample_image(
+    const T * data,
+    const std::array<std::size_t, 3> & shape,
+    const std::size_t factor,
+    std::vector<T> & out
+    )
+{
+  if (factor == 0) {
+    throw std::invalid_argument("The downsampling factor must be positive");
+  }
+  const std::array<std::size_t, 3> out_shape = {
+    (shape[0] + factor - 1) / factor,
+    (shape[1] + factor - 1) / factor,
+    (shape[2] + factor - 1) / factor
+  };
+  out.resize(out_shape[0] * out_shape[1] * out_shape[2]);
+
+  parallel_for(out_shape[2], [&](const std::size_t begin, const std::size_t end) {
+    std::vector<T> block;
+    block.reserve(factor * factor * factor);
+    for (std::size_t k = begin; k < end; k++) {
+      for (std::size_t j = 0; j < out_shape[1]; j++) {
+        for (std::size_t i = 0; i < out_shape[0]; i++) {
+          block.clear();
+          for (std::size_t kk = k * factor; kk < std::min((k + 1) * factor, shape[2]); kk++) {
+            for (std::size_t jj = j * factor; jj < std::min((j + 1) * factor, shape[1]); jj++) {
+              const T * row = data + shape[0] * (jj + shape[1] * kk);
+              for (std::size_t ii = i * factor; ii < std::min((i + 1) * factor, shape[0]); ii++) {
+                block.push_back(row[ii]);
+              }
+            }
+          }
+          T & value = out[i + out_shape[0] * (j + out_shape[1] * k)];
+          if (std::is_floating_point<T>::value) {
+            double sum = 0.0;
+            for (const T v: block) {
+              sum += v;
+            }
+            value = static_cast<T>(sum / block.size());
+          } else {
+            std::sort(block.begin(), block.end());
+            std::size_t best_count = 0;
+            for (std::size_t a = 0, b = 0; a < block.size(); a = b) {
+              while (b < block.size() && block[b] == block[a]) {
+                b++;
+              }
+              if (b - a > best_count) {
+                best_count = b - a;
+                value = block[a];
+              }
+            }
+          }
+        }
+      }
+    }
+  });
+  return out_shape;
+}
+
+// Convolve the image with a Gaussian, one direction after the other. sigma is given in
+// voxels per direction; a nonpositive sigma leaves the direction alone. Values beyond
+// the image are those at its boundary.
+template <typename T>
+void
+gaussian_filter(
+    T * data,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & sigma
+    )
+{
+  static_assert(std::is_floating_point<T>::value, "smoothing needs float values");
+  const std::array<std::size_t, 3> strides = {1, shape[0], shape[0] * shape[1]};
+  const std::size_t size = shape[0] * shape[1] * shape[2];
+
+  for (int d = 0; d < 3; d++) {
+    if (sigma[d] <= 0.0 || shape[d] < 2) {
+      continue;
+    }
+    const int radius = static_cast<int>(std::ceil(3.0 * sigma[d]));
+    std::vector<double> kernel(2 * radius + 1);
+    double sum = 0.0;
+    for (int r = -radius; r <= radius; r++) {
+      kernel[r + radius] = std::exp(-0.5 * r * r / (sigma[d] * sigma[d]));
+      sum += kernel[r + radius];
+    }
+    for (auto & k: kernel) {
+      k /= sum;
+    }
+
+    // The lines in direction d start at the points with index 0 in direction d.
+    const std::size_t n = shape[d];
+    const std::size_t stride = strides[d];
+    const std::size_t num_lines = size / n;
+    parallel_for(num_lines, [&](const std::size_t begin, const std::size_t end) {
+      std::vector<T> line(n);
+      for (std::size_t l = begin; l < end; l++) {
+        // line l -> its first point
+        const std::size_t low = l % stride;
+        const std::size_t start = low + (l / stride) * stride * n;
+        T * p = data + start;
+        for (std::size_t i = 0; i < n; i++) {
+          line[i] = p[i * stride];
+        }
+        for (std::size_t i = 0; i < n; i++) {
+          double value = 0.0;
+          for (int r = -radius; r <= radius; r++) {
+            const std::ptrdiff_t idx = std::min<std::ptrdiff_t>(
+                std::max<std::ptrdiff_t>(std::ptrdiff_t(i) + r, 0), n - 1
+                );
+            value += kernel[r + radius] * line[idx];
+          }
+          p[i * stride] = static_cast<T>(value);
+        }
+      }
+    });
+  }
+}
+
+// Smooth the boundaries between the labels: a voxel gets the label whose (Gaussian
+// filtered) indicator function exceeds 1/2 there. Voxels where no label has the
+// majority keep theirs. Since the filtered indicators add up to 1, at most one label
+// has the majority.
+//
+// The indicator of a label is only filtered in the bounding box of the label, grown by
+// the radius of the filter (beyond, it's 0 before and after filtering), and one slab
+// of planes at a time, so the work is proportional to the sizes of the labels, and the
+// only extra memory is a float buffer for one slab of the largest box.
+template <typename T>
+void
+smooth_labels(
+    T * data,
+    const std::array<std::size_t, 3> & shape,
+    const std::array<double, 3> & sigma
+    )
+{
+  static_assert(std::is_integral<T>::value, "label smoothing needs integer labels");
+
+  // the bounding boxes of the labels, [lower, upper)
+  struct Box
+  {
+    std::array<std::size_t, 3> lower = {
+      std::numeric_limits<std::size_t>::max(),
+      std::numeric_limits<std::size_t>::max(),
+      std::numeric_limits<std::size_t>::max()
+    };
+    std::array<std::size_t, 3> upper = {0, 0, 0};
+  };
+  std::vector<Box> boxes(std::size_t(std::numeric_limits<T>::max()) + 1);
+  for (std::size_t k = 0; k < shape[2]; k++) {
+    for (std::size_t j = 0; j < shape[1]; j++) {
+      const T * row = data + shape[0] * (j + shape[1] * k);
+      for (std::size_t i = 0; i < shape[0]; i++) {
+        Box & box = boxes[row[i]];
+        const std::array<std::size_t, 3> x = {i, j, k};
+        for (int d = 0; d < 3; d++) {
+          box.lower[d] = std::min(box.lower[d], x[d]);
+          box.upper[d] = std::max(box.upper[d], x[d] + 1);
+        }
+      }
+    }
+  }
+  std::vector<T> labels;
+  for (std::size_t l = 0; l < boxes.size(); l++) {
+    if (boxes[l].upper[0] > 0) {
+      labels.push_back(static_cast<T>(l));
+    }
+  }
+  if (labels.size() < 2) {
+    return;
+  }
+
+  // the radii of the kernels of gaussian_filter()
+  std::array<std::size_t, 3> radius = {0, 0, 0};
+  for (int d = 0; d < 3; d++) {
+    if (sigma[d] > 0.0 && shape[d] >= 2) {
+      radius[d] = static_cast<std::size_t>(std::ceil(3.0 * sigma[d]));
+    }
+  }
+  const std::size_t slab_size = std::max<std::size_t>(32, 4 * radius[2]);
+
+  // The new labels are collected first so that all indicators are those of the input.
+  std::vector<std::pair<std::size_t, T>> changes;
+  std::vector<float> indicator;
+  for (const T label: labels) {
+    std::array<std::size_t, 3> lower;
+    std::array<std::size_t, 3> upper;
+    for (int d = 0; d < 3; d++) {
+      const Box & box = boxes[label];
+      lower[d] = box.lower[d] > radius[d] ? box.lower[d] - radius[d] : 0;
+      upper[d] = std::min(box.upper[d] + radius[d], shape[d]);
+    }
+    const std::size_t nx = upper[0] - lower[0];
+    const std::size_t ny = upper[1] - lower[1];
+
+    for (std::size_t z0 = lower[2]; z0 < upper[2]; z0 += slab_size) {
+      const std::size_t z1 = std::min(z0 + slab_size, upper[2]);
+      // the slab with the planes that the filter reaches from [z0, z1)
+      const std::size_t zl = z0 > lower[2] + radius[2] ? z0 - radius[2] : lower[2];
+      const std::size_t zh = std::min(z1 + radius[2], upper[2]);
+      const std::array<std::size_t, 3> slab_shape = {nx, ny, zh - zl};
+
+      indicator.resize(nx * ny * (zh - zl));
+      parallel_for(zh - zl, [&](const std::size_t begin, const std::size_t end) {
+        for (std::size_t k = begin; k < end; k++) {
+          for (std::size_t j = 0; j < ny; j++) {
+            const T * row = data + lower[0] + shape[0] * (lower[1] + j + shape[1] * (zl + k));
+            float * out = indicator.data() + nx * (j + ny * k);
+            for (std::size_t i = 0; i < nx; i++) {
+              out[i] = row[i] == label ? 1.0f : 0.0f;
+            }
+          }
+        }
+      });
+      gaussian_filter(indicator.data(), slab_shape, sigma);
+
+      for (std::size_t k = z0; k < z1; k++) {
+        for (std::size_t j = 0; j < ny; j++) {
+          const std::size_t offset = lower[0] + shape[0] * (lower[1] + j + shape[1] * k);
+          const float * values = indicator.data() + nx * (j + ny * (k - zl));
+          for (std::size_t i = 0; i < nx; i++) {
+            if (values[i] > 0.5f && data[offset + i] != label) {
+              changes.push_back({offset + i, label});
+            }
+          }
+        }
+      }
+    }
+  }
+
+  for (const auto & change: changes) {
+    data[change.first] = change.second;
+  }
+}
+
+} // namespace pygalmesh
+
+#endif // IMAGE_FILTERS_HPP
@@ -0,0 +1,123 @@
+#ifndef LABEL_PYRAMID_HPP
+#define LABEL_PYRAMID_HPP
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace pygalmesh {
+
+// Octree-like pyramid over a labeled 3D image (x varying fastest) that tells whether
+// the voxels in a box are all of the same label. Level 0 consists of blocks of
+// block_size^3 voxels, and every cell on level l + 1 covers 2^3 cells on level l. A cell
+// stores its label if all its voxels have it, and -1 otherwise.
+//
+// Most points at which mesh generation probes an image lie in homogeneous regions.
+// There, a look-up in the (small, cache-friendly) pyramid replaces reading the eight
+// voxels around the point from all over the (large) image.
+template <typename T>
+class LabelPyramid
+{
+  public:
+  static const std::size_t block_size = 8;
+
+  LabelPyramid(
+      const T * data,
+      const std::size_t nx,
+      const std::size_t ny,
+      const std::size_t nz
+      )
+  {
+    // level 0, in one pass over the image in memory order
+    std::array<std::size_t, 3> dims = {
+      (nx + block_size - 1) / block_size,
+      (ny + block_size - 1) / block_size,
+      (nz + block_size - 1) / block_size
+    };
+    const std::int32_t unset = -2;
+    std::vector<std::int32_t> labels(dims[0] * dims[1] * dims[2], unset);
+    std::size_t idx = 0;
+    for (std::size_t k = 0; k < nz; k++) {
+      for (std::size_t j = 0; j < ny; j++) {
+        std::int32_t * row = labels.data() + dims[0] * (j / block_size + dims[1] * (k / block_size));
+        for (std::size_t i = 0; i < nx; i++, idx++) {
+          const std::int32_t value = static_cast<std::int32_t>(data[idx]);
+          std::int32_t & label = row[i / block_size];
+          if (label == unset) {
+            label = value;
+          } else if (label != value) {
+            label = -1;
+          }
+        }
+      }
+    }
+    dims_.push_back(dims);
+    levels_.push_back(std::move(labels));
+
+    // coarser levels until a single cell covers the image
+    while (dims[0] > 1 || dims[1] > 1 || dims[2] > 1) {
+      const auto & fine = levels_.back();
+      const auto fine_dims = dims;
+      dims = {(dims[0] + 1) / 2, (dims[1] + 1) / 2, (dims[2] + 1) / 2};
+      std::vector<std::int32_t> coarse(dims[0] * dims[1] * dims[2], unset);
+      for (std::size_t k = 0; k < fine_dims[2]; k++) {
+        for (std::size_t j = 0; j < fine_dims[1]; j++) {
+          for (std::size_t i = 0; i < fine_dims[0]; i++) {
+            const std::int32_t value = fine[i + fine_dims[0] * (j + fine_dims[1] * k)];
+            std::int32_t & label = coarse[i / 2 + dims[0] * (j / 2 + dims[1] * (k / 2))];
+            if (label == unset) {
+              label = value;
+            } else if (label != value) {
+              label = -1;
+            }
+          }
+        }
+      }
+      dims_.push_back(dims);
+      levels_.push_back(std::move(coarse));
+    }
+  }
+
+  // The label of all voxels (i, j, k) with i0 <= i <= i1 etc. if they have the same,
+  // -1 otherwise. Looks at the smallest pyramid cell that contains the box, i.e., takes
+  // O(log(n)) steps; the answer can be -1 for homogeneous boxes that straddle the
+  // boundaries of large cells.
+  std::int32_t
+  label(
+      const std::array<std::size_t, 3> & lower,
+      const std::array<std::size_t, 3> & upper
+      ) const
+  {
+    std::array<std::size_t, 3> a, b;
+    for (int d = 0; d < 3; d++) {
+      a[d] = lower[d] / block_size;
+      b[d] = upper[d] / block_size;
+    }
+    for (std::size_t level = 0; level < levels_.size(); level++) {
+      if (a == b) {
+        const auto & dims = dims_[level];
+        return levels_[level][a[0] + dims[0] * (a[1] + dims[1] * a[2])];
+      }
+      for (int d = 0; d < 3; d++) {
+        a[d] /= 2;
+        b[d] /= 2;
+      }
+    }
+    return -1;
+  }
+
+  std::size_t
+  number_of_levels() const
+  {
+    return levels_.size();
+  }
+
+  private:
+  std::vector<std::array<std::size_t, 3>> dims_;
+  std::vector<std::vector<std::int32_t>> levels_;
+};
+
+} // namespace pygalmesh
+
+#endif // LABEL_PYRAMID_HPP
@@ -0,0 +1,110 @@
+#ifndef MAKE_MESH_HPP
+#define MAKE_MESH_HPP
+
+#include "progress.hpp"
+
+#include <CGAL/Mesh_criteria_3.h>
+#include <CGAL/exude_mesh_3.h>
+#include <CGAL/lloyd_optimize_mesh_3.h>
+#include <CGAL/make_mesh_3.h>
+#include <CGAL/odt_optimize_mesh_3.h>
+#include <CGAL/perturb_mesh_3.h>
+#include <CGAL/tags.h>
+
+#include <string>
+#include <type_traits>
+
+namespace pygalmesh {
+
+// whether the complex is refined by several threads
+template <class C3t3>
+constexpr bool
+is_parallel()
+{
+  return std::is_convertible<typename C3t3::Concurrency_tag, CGAL::Parallel_tag>::value;
+}
+
+// Same as CGAL::make_mesh_3, but with the optimizers run one by one in the same order
+// and with the same defaults as make_mesh_3 does, so that progress can be reported for
+// each of them. While the monitor is active, the refinement criteria poll it.
+template <class C3t3, class Mesh_domain, class Mesh_criteria>
+C3t3
+make_mesh(
+    const Mesh_domain & domain,
+    const Mesh_criteria & criteria,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    ProgressMonitor & monitor
+    )
+{
+  typedef typename C3t3::Triangulation Tr;
+  typedef MonitoredCriteria<Tr, typename Mesh_criteria::Facet_criteria, 1> Facet_criteria;
+  typedef MonitoredCriteria<Tr, typename Mesh_criteria::Cell_criteria, 2> Cell_criteria;
+  typedef CGAL::Mesh_criteria_3<
+    Tr, typename Mesh_criteria::Edge_criteria, Facet_criteria, Cell_criteria
+    > Monitored_mesh_criteria;
+
+  // perhaps there's a more elegant solution here
+  // see <https://github.com/CGAL/cgal/issues/1286>
+  const CerrSilencer silencer(verbose);
+
+  monitor.set_phase("edges");
+  const auto refine = [&](const auto & mesh_criteria) {
+    return CGAL::make_mesh_3<C3t3>(
+        domain,
+        mesh_criteria,
+        CGAL::parameters::no_lloyd(),
+        CGAL::parameters::no_odt(),
+        CGAL::parameters::no_perturb(),
+        CGAL::parameters::no_exude()
+        );
+  };
+  C3t3 c3t3 = monitor.active() ?
+    refine(Monitored_mesh_criteria(
+          criteria.edge_criteria_object(),
+          Facet_criteria(criteria.facet_criteria_object(), monitor, is_parallel<C3t3>()),
+          Cell_criteria(criteria.cell_criteria_object(), monitor, is_parallel<C3t3>())
+          )) :
+    refine(criteria);
+
+  const auto set_phase = [&](const std::string & phase) {
+    monitor.set_phase(
+        phase,
+        c3t3.triangulation().number_of_vertices(),
+        c3t3.number_of_cells_in_complex()
+        );
+  };
+
+  if (odt) {
+    set_phase("odt");
+    CGAL::odt_optimize_mesh_3(c3t3, domain);
+  }
+  if (lloyd) {
+    set_phase("lloyd");
+    CGAL::lloyd_optimize_mesh_3(c3t3, domain);
+  }
+  if (perturb) {
+    set_phase("perturb");
+    CGAL::perturb_mesh_3(c3t3, domain);
+  }
+  if (exude) {
+    set_phase("exude");
+    CGAL::exude_mesh_3(
+        c3t3,
+        CGAL::parameters::time_limit = exude_time_limit,
+        CGAL::parameters::sliver_bound = exude_sliver_bound
+        );
+  }
+  set_phase("done");
+
+  return c3t3;
+}
+
+} // namespace pygalmesh
+
+#endif // MAKE_MESH_HPP
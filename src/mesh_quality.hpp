@@ -0,0 +1,179 @@
+#ifndef MESH_QUALITY_HPP
+#define MESH_QUALITY_HPP
+
+#include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <set>
+#include <stdexcept>
+#include <vector>
+
+namespace pygalmesh {
+
+// Per-cell quality measures of a tetrahedral mesh, stored in the same order in which
+// the cells are written to the output (i.e., the order of `cells_in_complex`).
+class MeshQuality
+{
+  public:
+
+  static constexpr std::size_t num_dihedral_angle_bins = 36;  // [0, 180] degrees
+  static constexpr std::size_t num_radius_ratio_bins = 20;  // [0, 1]
+
+  MeshQuality():
+    min_dihedral_angle_histogram(num_dihedral_angle_bins, 0),
+    max_dihedral_angle_histogram(num_dihedral_angle_bins, 0),
+    radius_ratio_histogram(num_radius_ratio_bins, 0)
+  {
+  }
+
+  virtual ~MeshQuality() = default;
+
+  void
+  clear()
+  {
+    min_dihedral_angle.clear();
+    max_dihedral_angle.clear();
+    radius_ratio.clear();
+    volume.clear();
+    std::fill(min_dihedral_angle_histogram.begin(), min_dihedral_angle_histogram.end(), 0);
+    std::fill(max_dihedral_angle_histogram.begin(), max_dihedral_angle_histogram.end(), 0);
+    std::fill(radius_ratio_histogram.begin(), radius_ratio_histogram.end(), 0);
+  }
+
+  void
+  add(
+      const double min_angle,
+      const double max_angle,
+      const double ratio,
+      const double vol
+      )
+  {
+    min_dihedral_angle.push_back(static_cast<float>(min_angle));
+    max_dihedral_angle.push_back(static_cast<float>(max_angle));
+    radius_ratio.push_back(static_cast<float>(ratio));
+    volume.push_back(static_cast<float>(vol));
+
+    min_dihedral_angle_histogram[bin(min_angle / 180.0, num_dihedral_angle_bins)]++;
+    max_dihedral_angle_histogram[bin(max_angle / 180.0, num_dihedral_angle_bins)]++;
+    radius_ratio_histogram[bin(ratio, num_radius_ratio_bins)]++;
+  }
+
+  // Put the per-cell values in the order of the cells, given as the old indices in
+  // their new order, e.g., after the cells have been sorted.
+  void
+  permute(const std::vector<std::int64_t> & order)
+  {
+    for (auto * values: {&min_dihedral_angle, &max_dihedral_angle, &radius_ratio, &volume}) {
+      if (order.size() != values->size()) {
+        throw std::invalid_argument("The order doesn't match the number of cells");
+      }
+      std::vector<float> permuted(values->size());
+      for (std::size_t k = 0; k < order.size(); k++) {
+        permuted[k] = (*values)[order[k]];
+      }
+      values->swap(permuted);
+    }
+  }
+
+  std::vector<float> min_dihedral_angle;
+  std::vector<float> max_dihedral_angle;
+  std::vector<float> radius_ratio;
+  std::vector<float> volume;
+
+  std::vector<std::size_t> min_dihedral_angle_histogram;
+  std::vector<std::size_t> max_dihedral_angle_histogram;
+  std::vector<std::size_t> radius_ratio_histogram;
+
+  private:
+
+  // map a value from [0, 1] to a histogram bin; the last bin is closed on the right
+  static
+  std::size_t
+  bin(const double t, const std::size_t num_bins)
+  {
+    if (!(t > 0.0)) {
+      return 0;
+    }
+    return std::min(static_cast<std::size_t>(t * num_bins), num_bins - 1);
+  }
+};
+
+
+// Compute the quality measures of the cells in the complex in one sweep; of those in
+// the given subdomains only, if there are any, as output_part_to_medit() writes them.
+template <class C3t3>
+void
+compute_quality(
+    const C3t3 & c3t3,
+    MeshQuality & quality,
+    const std::vector<int> & subdomains = {}
+    )
+{
+  typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
+
+  const auto & tr = c3t3.triangulation();
+  const auto cp = tr.geom_traits().construct_point_3_object();
+  const std::set<int> selected(subdomains.begin(), subdomains.end());
+
+  quality.clear();
+  quality.min_dihedral_angle.reserve(c3t3.number_of_cells_in_complex());
+  quality.max_dihedral_angle.reserve(c3t3.number_of_cells_in_complex());
+  quality.radius_ratio.reserve(c3t3.number_of_cells_in_complex());
+  quality.volume.reserve(c3t3.number_of_cells_in_complex());
+
+  // the six edges of a tetrahedron plus the two vertices opposite to each of them
+  const std::array<std::array<int, 4>, 6> edges = {{
+    {0, 1, 2, 3},
+    {0, 2, 1, 3},
+    {0, 3, 1, 2},
+    {1, 2, 0, 3},
+    {1, 3, 0, 2},
+    {2, 3, 0, 1}
+  }};
+
+  for (auto cit = c3t3.cells_in_complex_begin(); cit != c3t3.cells_in_complex_end(); ++cit) {
+    if (!selected.empty() && selected.count(int(c3t3.subdomain_index(cit))) == 0) {
+      continue;
+    }
+    const std::array<K::Point_3, 4> p = {
+      cp(cit->vertex(0)->point()),
+      cp(cit->vertex(1)->point()),
+      cp(cit->vertex(2)->point()),
+      cp(cit->vertex(3)->point())
+    };
+
+    double min_angle = 180.0;
+    double max_angle = 0.0;
+    for (const auto & e: edges) {
+      const double angle = std::abs(CGAL::to_double(
+        CGAL::approximate_dihedral_angle(p[e[0]], p[e[1]], p[e[2]], p[e[3]])
+      ));
+      min_angle = std::min(min_angle, angle);
+      max_angle = std::max(max_angle, angle);
+    }
+
+    // Normalized radius ratio 3 * inradius / circumradius; 1 for the regular
+    // tetrahedron, 0 for degenerate ones.
+    const double vol = std::abs(CGAL::to_double(CGAL::volume(p[0], p[1], p[2], p[3])));
+    const double surface_area =
+      std::sqrt(CGAL::to_double(CGAL::squared_area(p[1], p[2], p[3]))) +
+      std::sqrt(CGAL::to_double(CGAL::squared_area(p[0], p[2], p[3]))) +
+      std::sqrt(CGAL::to_double(CGAL::squared_area(p[0], p[1], p[3]))) +
+      std::sqrt(CGAL::to_double(CGAL::squared_area(p[0], p[1], p[2])));
+    const double circumradius = std::sqrt(CGAL::to_double(
+      CGAL::squared_radius(p[0], p[1], p[2], p[3])
+    ));
+    const double ratio = (surface_area > 0.0 && circumradius > 0.0) ?
+      9.0 * vol / (surface_area * circumradius) :
+      0.0;
+
+    quality.add(min_angle, max_angle, ratio, vol);
+  }
+}
+
+} // namespace pygalmesh
+#endif // MESH_QUALITY_HPP
@@ -0,0 +1,126 @@
+#ifndef MESH_STATS_HPP
+#define MESH_STATS_HPP
+
+#include <chrono>
+#include <cstddef>
+#include <map>
+#include <string>
+
+namespace pygalmesh {
+
+class Stopwatch
+{
+  public:
+  Stopwatch():
+    start_(std::chrono::steady_clock::now())
+  {
+  }
+
+  double
+  elapsed() const
+  {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() - start_).count();
+  }
+
+  private:
+  const std::chrono::steady_clock::time_point start_;
+};
+
+// Number and cumulative duration (in seconds) of calls
+class CallCounter
+{
+  public:
+  std::size_t count = 0;
+  double time = 0.0;
+};
+
+// Where the time of a meshing run went. The phases are those of ProgressMonitor,
+// plus "setup" for everything before the feature protection (building the domain,
+// computing features). Calls into Python (domains or sizing fields defined in Python,
+// progress callbacks) are counted in python_calls, in addition to domain_evals or
+// sizing_field_evals.
+class MeshStats
+{
+  public:
+
+  virtual ~MeshStats() = default;
+
+  std::map<std::string, double> phase_times;
+  CallCounter domain_evals;
+  CallCounter sizing_field_evals;
+  CallCounter python_calls;
+  std::size_t max_num_vertices = 0;
+  std::size_t num_vertices = 0;
+  std::size_t num_cells = 0;
+  double output_time = 0.0;
+};
+
+// Call f() and, if counter is given, record the call and its duration.
+template <class F>
+auto
+counted_call(CallCounter * counter, const F & f)
+{
+  if (!counter) {
+    return f();
+  }
+  const Stopwatch stopwatch;
+  const auto value = f();
+  counter->time += stopwatch.elapsed();
+  counter->count++;
+  return value;
+}
+
+// The statistics of the meshing run in progress on this thread, if any, for code that
+// isn't handed them explicitly (e.g., the Python trampolines).
+inline
+MeshStats * &
+active_mesh_stats()
+{
+  static thread_local MeshStats * stats = nullptr;
+  return stats;
+}
+
+// Makes stats the active statistics while alive.
+class ActiveMeshStats
+{
+  public:
+  explicit ActiveMeshStats(MeshStats * stats):
+    previous_(active_mesh_stats())
+  {
+    active_mesh_stats() = stats;
+  }
+
+  ~ActiveMeshStats()
+  {
+    active_mesh_stats() = previous_;
+  }
+
+  private:
+  MeshStats * const previous_;
+};
+
+// Adds its lifetime to the Python calls of the active statistics, if any.
+class PythonCallTimer
+{
+  public:
+  PythonCallTimer():
+    stats_(active_mesh_stats())
+  {
+  }
+
+  ~PythonCallTimer()
+  {
+    if (stats_) {
+      stats_->python_calls.time += stopwatch_.elapsed();
+      stats_->python_calls.count++;
+    }
+  }
+
+  private:
+  MeshStats * const stats_;
+  const Stopwatch stopwatch_;
+};
+
+} // namespace pygalmesh
+
+#endif // MESH_STATS_HPP
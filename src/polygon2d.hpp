@@ -7,6 +7,7 @@
 #include <CGAL/Polygon_2_algorithms.h>
 #include <array>
 #include <memory>
+#include <string>
 #include <vector>
 
 typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
@@ -50,6 +51,16 @@ class Polygon2D {
     return false;
   }
 
+  std::string
+  get_serialization() const
+  {
+    std::string out = "Polygon2D(";
+    for (const auto & pt: points) {
+      out += "[" + serialize_number(pt.x()) + "," + serialize_number(pt.y()) + "]";
+    }
+    return out + ")";
+  }
+
   public:
   const std::vector<K::Point_2> points;
 };
@@ -227,6 +238,15 @@ class Extrude: public pygalmesh::DomainBase {
     return features;
   };
 
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return "Extrude(" + poly_->get_serialization() + "," +
+        serialize_vector(direction_) + "," + serialize_number(alpha_) + "," +
+        serialize_number(max_edge_size_at_feature_edges_) + ")";
+  }
+
   private:
   const std::shared_ptr<pygalmesh::Polygon2D> poly_;
   const std::array<double, 3> direction_;
@@ -298,6 +318,14 @@ class ring_extrude: public pygalmesh::DomainBase {
     return features;
   }
 
+  virtual
+  std::string
+  get_serialization() const
+  {
+    return "RingExtrude(" + poly_->get_serialization() + "," +
+        serialize_number(max_edge_size_at_feature_edges_) + ")";
+  }
+
   private:
   const std::shared_ptr<pygalmesh::Polygon2D> poly_;
   const double max_edge_size_at_feature_edges_;
@@ -15,6 +15,7 @@
 #include "domain.hpp"
 
 #include <memory>
+#include <string>
 #include <vector>
 
 namespace pygalmesh {
@@ -52,6 +53,13 @@ class Ball: public pygalmesh::DomainBase
       return (x0_nrm + radius_) * (x0_nrm + radius_);
     }
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Ball(" + serialize_vector(x0_) + "," + serialize_number(radius_) + ")";
+    }
+
   private:
     const std::array<double, 3> x0_;
     const double radius_;
@@ -124,6 +132,13 @@ class Cuboid: public pygalmesh::DomainBase
         };
     };
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Cuboid(" + serialize_vector(x0_) + "," + serialize_vector(x1_) + ")";
+    }
+
   private:
     const std::array<double, 3> x0_;
     const std::array<double, 3> x1_;
@@ -167,6 +182,16 @@ class Ellipsoid: public pygalmesh::DomainBase
       return (x0_nrm + radius) * (x0_nrm + radius);
     }
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Ellipsoid(" + serialize_vector(x0_) + "," +
+        serialize_number(a0_2_) + "," +
+        serialize_number(a1_2_) + "," +
+        serialize_number(a2_2_) + ")";
+    }
+
   private:
     const std::array<double, 3> x0_;
     const double a0_2_;
@@ -232,6 +257,14 @@ class Cylinder: public pygalmesh::DomainBase
       return {circ0, circ1};
     };
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Cylinder(" + serialize_number(z0_) + "," + serialize_number(z1_) + "," +
+        serialize_number(radius_) + "," + serialize_number(feature_edge_h_) + ")";
+    }
+
   private:
     const double z0_;
     const double z1_;
@@ -293,6 +326,14 @@ class Cone: public pygalmesh::DomainBase
       return {circ0};
     };
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Cone(" + serialize_number(radius_) + "," + serialize_number(height_) + "," +
+        serialize_number(feature_edge_length_) + ")";
+    }
+
   private:
     const double radius_;
     const double height_;
@@ -399,6 +440,15 @@ class Tetrahedron: public pygalmesh::DomainBase
         };
     };
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Tetrahedron(" +
+        serialize_vector(x0_) + "," + serialize_vector(x1_) + "," +
+        serialize_vector(x2_) + "," + serialize_vector(x3_) + ")";
+    }
+
   private:
     const Eigen::Vector3d x0_;
     const Eigen::Vector3d x1_;
@@ -440,6 +490,13 @@ class Torus: public pygalmesh::DomainBase
       return (major_radius_ + minor_radius_)*(major_radius_ + minor_radius_);
     }
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "Torus(" + serialize_number(major_radius_) + "," + serialize_number(minor_radius_) + ")";
+    }
+
   private:
     const double major_radius_;
     const double minor_radius_;
@@ -476,6 +533,14 @@ class HalfSpace: public pygalmesh::DomainBase
       return bounding_sphere_squared_radius_;
     }
 
+    virtual
+    std::string
+    get_serialization() const
+    {
+      return "HalfSpace(" + serialize_vector(n_) + "," + serialize_number(alpha_) + "," +
+        serialize_number(bounding_sphere_squared_radius_) + ")";
+    }
+
   private:
     const std::array<double, 3> n_;
     const double alpha_;
@@ -0,0 +1,298 @@
+#ifndef PROGRESS_HPP
+#define PROGRESS_HPP
+
+#include "mesh_stats.hpp"
+
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <iostream>
+#include <memory>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <utility>
+
+namespace pygalmesh {
+
+class ProgressBase
+{
+  public:
+
+  virtual ~ProgressBase() = default;
+
+  // Called with the current phase of the meshing run, one of "edges", "facets",
+  // "cells", "odt", "lloyd", "perturb", "exude", and "done". The counts are -1 where
+  // they aren't known. Return false to cancel the run.
+  virtual
+  bool
+  update(
+      const std::string & phase,
+      const std::int64_t num_vertices,
+      const std::int64_t num_cells,
+      const double elapsed
+      ) = 0;
+};
+
+// Runs the signal handlers (e.g., for Ctrl-C) during a meshing run and throws if one
+// of them raised; set by the Python bindings, since meshing runs don't return to the
+// interpreter. Empty by default.
+inline
+std::function<void()> &
+signal_check()
+{
+  static std::function<void()> check;
+  return check;
+}
+
+class MeshingCancelled: public std::runtime_error
+{
+  public:
+  MeshingCancelled():
+    std::runtime_error("Meshing cancelled")
+  {
+  }
+};
+
+// Forwards the state of a meshing run to a ProgressBase, at most once per interval
+// (except for phase changes which are always reported), and records the time spent in
+// each phase in a MeshStats. At the same rate, it runs the signal_check(). Without
+// any of these, all methods are no-ops.
+//
+// The monitor is polled from the code that CGAL calls during the run: the domain
+// evaluations (tick()) and the refinement criteria (refine(), see MonitoredCriteria).
+// Only the thread that created the monitor reports, checks for signals, and follows
+// the phases; with parallel meshing, the other threads just count their calls. When
+// the ProgressBase asks for cancellation or a signal handler raises, a flag is set,
+// and the next poll on the other threads throws MeshingCancelled, which unwinds the
+// run.
+class ProgressMonitor
+{
+  public:
+  explicit ProgressMonitor(
+      const std::shared_ptr<ProgressBase> & progress,
+      const std::shared_ptr<MeshStats> & stats = nullptr,
+      const double interval = 0.1
+      ):
+    progress_(progress),
+    stats_(stats),
+    signal_check_(signal_check()),
+    interval_(interval),
+    owner_(std::this_thread::get_id()),
+    start_(std::chrono::steady_clock::now()),
+    last_report_(start_),
+    phase_start_(start_)
+  {
+  }
+
+  bool
+  active() const
+  {
+    return progress_ || stats_ || signal_check_;
+  }
+
+  // Called between the steps of a run, on the thread that created the monitor.
+  void
+  set_phase(
+      const std::string & phase,
+      const std::int64_t num_vertices = -1,
+      const std::int64_t num_cells = -1
+      )
+  {
+    finish_phase();
+    phase_ = phase;
+    num_vertices_ = num_vertices;
+    num_cells_ = num_cells;
+    record_counts();
+    report(true);
+  }
+
+  // Add the time since the last change of phase to the current phase (but not to
+  // "done", i.e., to what comes after meshing).
+  void
+  finish_phase()
+  {
+    const auto now = std::chrono::steady_clock::now();
+    if (stats_ && phase_ != "done") {
+      stats_->phase_times[phase_] += std::chrono::duration<double>(now - phase_start_).count();
+    }
+    phase_start_ = now;
+  }
+
+  // Called from hot code paths such as domain evaluations; only looks at the clock
+  // every so often.
+  void
+  tick()
+  {
+    check_cancelled();
+    if (active() && poll_now()) {
+      report(false);
+    }
+  }
+
+  // Called by the refinement criteria of the facets (level 1) or the cells (level 2),
+  // with the current number of vertices (-1 if it can't be read safely). The first
+  // call of a level starts its phase.
+  void
+  refine(const int level, const std::int64_t num_vertices)
+  {
+    check_cancelled();
+    if (!active() || std::this_thread::get_id() != owner_) {
+      return;
+    }
+    if (level > refine_level_) {
+      refine_level_ = level;
+      set_phase(level == 1 ? "facets" : "cells", num_vertices);
+      return;
+    }
+    if (poll_now()) {
+      num_vertices_ = num_vertices;
+      record_counts();
+      report(false);
+    }
+  }
+
+  private:
+  // Unwind the run on every thread once cancellation was asked for.
+  void
+  check_cancelled() const
+  {
+    if (cancelled_.load(std::memory_order_relaxed)) {
+      throw MeshingCancelled();
+    }
+  }
+
+  bool
+  poll_now()
+  {
+    return (num_ticks_.fetch_add(1, std::memory_order_relaxed) + 1) % 1024 == 0;
+  }
+
+  void
+  record_counts()
+  {
+    if (!stats_ || num_vertices_ < 0) {
+      return;
+    }
+    stats_->num_vertices = num_vertices_;
+    if (stats_->num_vertices > stats_->max_num_vertices) {
+      stats_->max_num_vertices = stats_->num_vertices;
+    }
+    if (num_cells_ >= 0) {
+      stats_->num_cells = num_cells_;
+    }
+  }
+
+  void
+  report(const bool force)
+  {
+    if (std::this_thread::get_id() != owner_) {
+      return;
+    }
+    check_cancelled();
+    const auto now = std::chrono::steady_clock::now();
+    if (!force && std::chrono::duration<double>(now - last_report_).count() < interval_) {
+      return;
+    }
+    last_report_ = now;
+    if (signal_check_) {
+      try {
+        signal_check_();
+      } catch (...) {
+        cancelled_.store(true);
+        throw;
+      }
+    }
+    if (!progress_) {
+      return;
+    }
+    const double elapsed = std::chrono::duration<double>(now - start_).count();
+    if (!progress_->update(phase_, num_vertices_, num_cells_, elapsed)) {
+      cancelled_.store(true);
+      throw MeshingCancelled();
+    }
+  }
+
+  const std::shared_ptr<ProgressBase> progress_;
+  const std::shared_ptr<MeshStats> stats_;
+  const std::function<void()> signal_check_;
+  const double interval_;
+  const std::thread::id owner_;
+  const std::chrono::steady_clock::time_point start_;
+  // The state below is only accessed by the owner thread, except for the counter of
+  // polls and the cancellation flag.
+  std::chrono::steady_clock::time_point last_report_;
+  std::chrono::steady_clock::time_point phase_start_;
+  std::string phase_ = "setup";
+  std::int64_t num_vertices_ = -1;
+  std::int64_t num_cells_ = -1;
+  int refine_level_ = 0;
+  std::atomic<std::size_t> num_ticks_{0};
+  std::atomic<bool> cancelled_{false};
+};
+
+// Refinement criteria (a CGAL::Mesh_facet_criteria_3 or CGAL::Mesh_cell_criteria_3)
+// that poll a ProgressMonitor before every evaluation, which CGAL does for every facet
+// or cell that it considers for refinement. level is 1 for facets and 2 for cells.
+// The number of vertices is only read where no other thread can change it.
+template <class Tr, class Criteria, int level>
+class MonitoredCriteria: public Criteria
+{
+  public:
+  MonitoredCriteria(
+      const Criteria & criteria,
+      ProgressMonitor & monitor,
+      const bool is_parallel
+      ):
+    Criteria(criteria),
+    monitor_(&monitor),
+    is_parallel_(is_parallel)
+  {
+  }
+
+  template <class Element>
+  auto
+  operator()(const Tr & tr, const Element & element) const
+    -> decltype(std::declval<const Criteria &>()(tr, element))
+  {
+    monitor_->refine(
+        level, is_parallel_ ? -1 : static_cast<std::int64_t>(tr.number_of_vertices())
+        );
+    return Criteria::operator()(tr, element);
+  }
+
+  private:
+  ProgressMonitor * monitor_;
+  bool is_parallel_;
+};
+
+// While alive, silence std::cerr unless verbose is set, as the meshing functions have
+// always done for CGAL's output.
+class CerrSilencer
+{
+  public:
+  explicit CerrSilencer(const bool verbose):
+    verbose_(verbose)
+  {
+    if (!verbose_) {
+      // suppress output
+      std::cerr.setstate(std::ios_base::failbit);
+    }
+  }
+
+  ~CerrSilencer()
+  {
+    if (!verbose_) {
+      std::cerr.clear();
+    }
+  }
+
+  private:
+  const bool verbose_;
+};
+
+} // namespace pygalmesh
+
+#endif // PROGRESS_HPP
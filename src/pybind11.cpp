@@ -6,13 +6,21 @@
 #include "remesh_surface.hpp"
 #include "generate_periodic.hpp"
 #include "generate_surface_mesh.hpp"
+#include "image_filters.hpp"
+#include "mesh_quality.hpp"
+#include "mesh_stats.hpp"
 #include "polygon2d.hpp"
 #include "primitives.hpp"
+#include "progress.hpp"
+#include "reorder.hpp"
 #include "sizing_field.hpp"
+#include "sizing_field_2d.hpp"
+#include "surface_mesh_domain.hpp"
 
 #include <CGAL/version.h>
 
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 
 namespace py = pybind11;
@@ -26,6 +34,7 @@ public:
 
     double
     eval(const std::array<double, 3> & x) const override {
+      const PythonCallTimer timer;
       PYBIND11_OVERLOAD_PURE(double, DomainBase, eval, x);
     }
 
@@ -34,6 +43,11 @@ public:
       PYBIND11_OVERLOAD_PURE(double, DomainBase, get_bounding_sphere_squared_radius);
     }
 
+    std::string
+    get_serialization() const override {
+      PYBIND11_OVERLOAD(std::string, DomainBase, get_serialization);
+    }
+
     // std::vector<std::vector<std::array<double, 3>>>
     // get_features() const override {
     //   PYBIND11_OVERLOAD(
@@ -53,11 +67,89 @@ public:
 
     double
     eval(const std::array<double, 3> & x) const override {
+      const PythonCallTimer timer;
       PYBIND11_OVERLOAD_PURE(double, SizingFieldBase, eval, x);
     }
 };
 
 
+// https://pybind11.readthedocs.io/en/stable/advanced/classes.html#overriding-virtual-functions-in-python
+class PyProgressBase: public ProgressBase {
+public:
+    using ProgressBase::ProgressBase;
+
+    bool
+    update(
+        const std::string & phase,
+        const std::int64_t num_vertices,
+        const std::int64_t num_cells,
+        const double elapsed
+        ) override {
+      const PythonCallTimer timer;
+      PYBIND11_OVERLOAD_PURE(
+          bool, ProgressBase, update, phase, num_vertices, num_cells, elapsed
+          );
+    }
+};
+
+
+// Hand the data of a vector over to NumPy without copying it.
+template <typename T>
+py::array_t<T>
+as_array(std::vector<T> && vec, const std::vector<py::ssize_t> & shape)
+{
+  auto * data = new std::vector<T>(std::move(vec));
+  py::capsule owner(data, [](void * p) {
+    delete reinterpret_cast<std::vector<T> *>(p);
+  });
+  return py::array_t<T>(shape, data->data(), owner);
+}
+
+
+// The shape of a 3D image that is stored in Fortran order, i.e., with x varying fastest.
+std::array<std::size_t, 3>
+image_shape(const py::array & vol)
+{
+  if (vol.ndim() != 3) {
+    throw std::invalid_argument("vol must be three-dimensional");
+  }
+  if (!(vol.flags() & py::array::f_style)) {
+    throw std::invalid_argument("vol must be Fortran-contiguous");
+  }
+  return {
+    static_cast<std::size_t>(vol.shape(0)),
+    static_cast<std::size_t>(vol.shape(1)),
+    static_cast<std::size_t>(vol.shape(2))
+  };
+}
+
+// Downsample with the filter from image_filters.hpp. The result is returned in Fortran
+// order, too.
+template <typename T>
+py::array
+downsample_array(const py::array & vol, const std::size_t factor)
+{
+  const auto shape = image_shape(vol);
+  std::vector<T> out;
+  std::array<std::size_t, 3> out_shape;
+  {
+    py::gil_scoped_release release;
+    out_shape = downsample_image(
+        static_cast<const T *>(vol.data()), shape, factor, out
+        );
+  }
+  // x varying fastest is C order of the transpose
+  return as_array(
+      std::move(out),
+      {
+        static_cast<py::ssize_t>(out_shape[2]),
+        static_cast<py::ssize_t>(out_shape[1]),
+        static_cast<py::ssize_t>(out_shape[0])
+      }
+      ).attr("T");
+}
+
+
 PYBIND11_MODULE(_pygalmesh, m) {
     // m.doc() = "documentation string";
 
@@ -68,7 +160,8 @@ PYBIND11_MODULE(_pygalmesh, m) {
       .def(py::init<>())
       .def("eval", &DomainBase::eval)
       .def("get_bounding_sphere_squared_radius", &DomainBase::get_bounding_sphere_squared_radius)
-      .def("get_features", &DomainBase::get_features);
+      .def("get_features", &DomainBase::get_features)
+      .def("get_serialization", &DomainBase::get_serialization);
 
     // Sizing field base.
     // shared_ptr b/c of
@@ -77,6 +170,134 @@ PYBIND11_MODULE(_pygalmesh, m) {
       .def(py::init<>())
       .def("eval", &SizingFieldBase::eval);
 
+    py::class_<GridSizingField2D, SizingFieldBase, std::shared_ptr<GridSizingField2D>>(m, "GridSizingField2D")
+          .def(py::init([](
+              const std::array<double, 2> & origin,
+              const std::array<double, 2> & spacing,
+              const py::array_t<double, py::array::c_style | py::array::forcecast> & values
+              ) {
+                if (values.ndim() != 2) {
+                  throw std::invalid_argument("values must have shape (nx, ny)");
+                }
+                return std::make_shared<GridSizingField2D>(
+                    origin,
+                    spacing,
+                    values.data(),
+                    static_cast<std::size_t>(values.shape(0)),
+                    static_cast<std::size_t>(values.shape(1))
+                    );
+              }),
+              py::arg("origin"),
+              py::arg("spacing"),
+              py::arg("values")
+              )
+          .def("eval", &GridSizingField2D::eval);
+
+    py::class_<DistanceSizingField2D, SizingFieldBase, std::shared_ptr<DistanceSizingField2D>>(m, "DistanceSizingField2D")
+          .def(py::init([](
+              const py::array_t<double, py::array::c_style | py::array::forcecast> & points,
+              const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast> & segments,
+              const double min_size,
+              const double max_size,
+              const double grading
+              ) {
+                if (points.ndim() != 2 || points.shape(1) != 2) {
+                  throw std::invalid_argument("points must have shape (n, 2)");
+                }
+                if (segments.ndim() != 2 || segments.shape(1) != 2) {
+                  throw std::invalid_argument("segments must have shape (m, 2)");
+                }
+                return std::make_shared<DistanceSizingField2D>(
+                    points.data(),
+                    static_cast<std::size_t>(points.shape(0)),
+                    segments.data(),
+                    static_cast<std::size_t>(segments.shape(0)),
+                    min_size,
+                    max_size,
+                    grading
+                    );
+              }),
+              py::arg("points"),
+              py::arg("segments"),
+              py::arg("min_size"),
+              py::arg("max_size") = 0.0,
+              py::arg("grading") = 1.0
+              )
+          .def("eval", &DistanceSizingField2D::eval)
+          .def("distance", &DistanceSizingField2D::distance);
+
+    // Progress reporting
+    // shared_ptr b/c of
+    // <https://github.com/pybind/pybind11/issues/956#issuecomment-317022720>
+    py::class_<ProgressBase, PyProgressBase, std::shared_ptr<ProgressBase>>(m, "ProgressBase")
+      .def(py::init<>())
+      .def("update", &ProgressBase::update);
+
+    py::register_exception<MeshingCancelled>(m, "MeshingCancelled", PyExc_RuntimeError);
+
+    // Meshing runs hold the GIL, but don't return to the interpreter, so the progress
+    // monitors give signal handlers (e.g., for Ctrl-C) a chance to run, with or without
+    // a progress callback.
+    signal_check() = []() {
+      if (PyErr_CheckSignals() != 0) {
+        throw py::error_already_set();
+      }
+    };
+
+    // Mesh quality
+    py::class_<MeshQuality, std::shared_ptr<MeshQuality>>(m, "MeshQuality")
+      .def(py::init<>())
+      .def("_permute", &MeshQuality::permute)
+      .def_property_readonly_static("num_dihedral_angle_bins", [](py::object) {
+        return MeshQuality::num_dihedral_angle_bins;
+      })
+      .def_property_readonly_static("num_radius_ratio_bins", [](py::object) {
+        return MeshQuality::num_radius_ratio_bins;
+      })
+      .def_property_readonly("min_dihedral_angle", [](const MeshQuality & q) {
+        return py::array_t<float>(q.min_dihedral_angle.size(), q.min_dihedral_angle.data());
+      })
+      .def_property_readonly("max_dihedral_angle", [](const MeshQuality & q) {
+        return py::array_t<float>(q.max_dihedral_angle.size(), q.max_dihedral_angle.data());
+      })
+      .def_property_readonly("radius_ratio", [](const MeshQuality & q) {
+        return py::array_t<float>(q.radius_ratio.size(), q.radius_ratio.data());
+      })
+      .def_property_readonly("volume", [](const MeshQuality & q) {
+        return py::array_t<float>(q.volume.size(), q.volume.data());
+      })
+      .def_property_readonly("min_dihedral_angle_histogram", [](const MeshQuality & q) {
+        return py::array_t<std::size_t>(
+            q.min_dihedral_angle_histogram.size(), q.min_dihedral_angle_histogram.data()
+            );
+      })
+      .def_property_readonly("max_dihedral_angle_histogram", [](const MeshQuality & q) {
+        return py::array_t<std::size_t>(
+            q.max_dihedral_angle_histogram.size(), q.max_dihedral_angle_histogram.data()
+            );
+      })
+      .def_property_readonly("radius_ratio_histogram", [](const MeshQuality & q) {
+        return py::array_t<std::size_t>(
+            q.radius_ratio_histogram.size(), q.radius_ratio_histogram.data()
+            );
+      });
+
+    // Mesh statistics
+    py::class_<CallCounter>(m, "CallCounter")
+      .def_readonly("count", &CallCounter::count)
+      .def_readonly("time", &CallCounter::time);
+
+    py::class_<MeshStats, std::shared_ptr<MeshStats>>(m, "MeshStats")
+      .def(py::init<>())
+      .def_readonly("phase_times", &MeshStats::phase_times)
+      .def_readonly("domain_evals", &MeshStats::domain_evals)
+      .def_readonly("sizing_field_evals", &MeshStats::sizing_field_evals)
+      .def_readonly("python_calls", &MeshStats::python_calls)
+      .def_readonly("max_num_vertices", &MeshStats::max_num_vertices)
+      .def_readonly("num_vertices", &MeshStats::num_vertices)
+      .def_readonly("num_cells", &MeshStats::num_cells)
+      .def_readonly("output_time", &MeshStats::output_time);
+
     // Domain transformations
     py::class_<Translate, DomainBase, std::shared_ptr<Translate>>(m, "Translate")
           .def(py::init<
@@ -145,6 +366,44 @@ PYBIND11_MODULE(_pygalmesh, m) {
           .def("get_bounding_sphere_squared_radius", &Difference::get_bounding_sphere_squared_radius)
           .def("get_features", &Difference::get_features);
 
+    py::class_<MultiDomain, DomainBase, std::shared_ptr<MultiDomain>>(m, "MultiDomain")
+          .def(py::init([](const std::vector<py::tuple> & parts) {
+                // parts are (domain, label[, cell_size[, facet_size]]); surface meshes
+                // stand for the volume they bound
+                std::vector<std::shared_ptr<const DomainBase>> domains;
+                std::vector<int> labels;
+                std::vector<double> cell_sizes;
+                std::vector<double> facet_sizes;
+                for (const auto & part: parts) {
+                  if (part.size() < 2 || part.size() > 4) {
+                    throw std::invalid_argument(
+                        "The parts of a MultiDomain are tuples "
+                        "(domain, label[, cell_size[, facet_size]])"
+                        );
+                  }
+                  if (py::isinstance<SurfaceMeshDomain>(part[0])) {
+                    domains.push_back(std::make_shared<SurfaceMeshInterior>(
+                          part[0].cast<std::shared_ptr<SurfaceMeshDomain>>()
+                          ));
+                  } else {
+                    domains.push_back(part[0].cast<std::shared_ptr<DomainBase>>());
+                  }
+                  labels.push_back(part[1].cast<int>());
+                  const auto size = [&](const std::size_t k) {
+                    return part.size() > k && !part[k].is_none() ? part[k].cast<double>() : 0.0;
+                  };
+                  cell_sizes.push_back(size(2));
+                  facet_sizes.push_back(size(3));
+                }
+                return std::make_shared<MultiDomain>(domains, labels, cell_sizes, facet_sizes);
+              }),
+              py::arg("parts")
+              )
+          .def("eval", &MultiDomain::eval)
+          .def("label", &MultiDomain::label)
+          .def("get_bounding_sphere_squared_radius", &MultiDomain::get_bounding_sphere_squared_radius)
+          .def("get_features", &MultiDomain::get_features);
+
     // Primitives
     py::class_<Ball, DomainBase, std::shared_ptr<Ball>>(m, "Ball")
           .def(py::init<
@@ -257,20 +516,107 @@ PYBIND11_MODULE(_pygalmesh, m) {
           .def("get_bounding_sphere_squared_radius", &ring_extrude::get_bounding_sphere_squared_radius)
           .def("get_features", &ring_extrude::get_features);
 
+    // surface mesh domain
+    py::class_<SurfaceMeshDomain, std::shared_ptr<SurfaceMeshDomain>>(m, "SurfaceMeshDomain")
+          .def(py::init([](
+              // c_style | forcecast only copies if the input isn't a C-contiguous
+              // array of the right dtype already
+              const py::array_t<double, py::array::c_style | py::array::forcecast> & points,
+              const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast> & triangles,
+              const bool reorient
+              ) {
+                if (points.ndim() != 2 || points.shape(1) != 3) {
+                  throw std::invalid_argument("points must have shape (n, 3)");
+                }
+                if (triangles.ndim() != 2 || triangles.shape(1) != 3) {
+                  throw std::invalid_argument("triangles must have shape (m, 3)");
+                }
+                return std::make_shared<SurfaceMeshDomain>(
+                    points.data(),
+                    static_cast<std::size_t>(points.shape(0)),
+                    triangles.data(),
+                    static_cast<std::size_t>(triangles.shape(0)),
+                    reorient
+                    );
+              }),
+              py::arg("points"),
+              py::arg("triangles"),
+              py::arg("reorient") = false
+              )
+          .def("number_of_vertices", &SurfaceMeshDomain::number_of_vertices)
+          .def("number_of_facets", &SurfaceMeshDomain::number_of_facets);
+
     // functions
     m.def(
-        "_generate_2d", &generate_2d,
+        "_generate_2d",
+        [](
+            const py::array_t<double, py::array::c_style | py::array::forcecast> & points,
+            const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast> & constraints,
+            const double max_circumradius_shortest_edge_ratio,
+            const double max_edge_size,
+            const std::shared_ptr<SizingFieldBase> & max_edge_size_field,
+            const int num_lloyd_steps,
+            const py::array_t<double, py::array::c_style | py::array::forcecast> & seeds,
+            const py::array_t<double, py::array::c_style | py::array::forcecast> & region_max_edge_sizes,
+            const py::array_t<double, py::array::c_style | py::array::forcecast> & holes
+            ) {
+              if (points.ndim() != 2 || points.shape(1) != 2) {
+                throw std::invalid_argument("points must have shape (n, 2)");
+              }
+              if (constraints.ndim() != 2 || constraints.shape(1) != 2) {
+                throw std::invalid_argument("constraints must have shape (m, 2)");
+              }
+              if (seeds.ndim() != 2 || seeds.shape(1) != 2) {
+                throw std::invalid_argument("seeds must have shape (k, 2)");
+              }
+              if (region_max_edge_sizes.ndim() != 1 || region_max_edge_sizes.shape(0) != seeds.shape(0)) {
+                throw std::invalid_argument("region_max_edge_sizes must have shape (k,)");
+              }
+              if (holes.ndim() != 2 || holes.shape(1) != 2) {
+                throw std::invalid_argument("holes must have shape (l, 2)");
+              }
+              auto out = generate_2d(
+                  points.data(),
+                  static_cast<std::size_t>(points.shape(0)),
+                  constraints.data(),
+                  static_cast<std::size_t>(constraints.shape(0)),
+                  max_circumradius_shortest_edge_ratio,
+                  max_edge_size,
+                  max_edge_size_field,
+                  num_lloyd_steps,
+                  seeds.data(),
+                  static_cast<std::size_t>(seeds.shape(0)),
+                  region_max_edge_sizes.data(),
+                  holes.data(),
+                  static_cast<std::size_t>(holes.shape(0))
+                  );
+              auto & out_points = std::get<0>(out);
+              auto & out_cells = std::get<1>(out);
+              auto & out_regions = std::get<2>(out);
+              const py::ssize_t num_out_points = out_points.size() / 2;
+              const py::ssize_t num_out_cells = out_cells.size() / 3;
+              return py::make_tuple(
+                  as_array(std::move(out_points), {num_out_points, 2}),
+                  as_array(std::move(out_cells), {num_out_cells, 3}),
+                  as_array(std::move(out_regions), {num_out_cells})
+                  );
+            },
         py::arg("points"),
         py::arg("constraints"),
         py::arg("max_circumradius_shortest_edge_ratio") = 1.41421356237,
         py::arg("max_edge_size") = 0.0,
-        py::arg("num_lloyd_steps") = 0
+        py::arg("max_edge_size_field") = nullptr,
+        py::arg("num_lloyd_steps") = 0,
+        py::arg("seeds") = py::array_t<double>(std::vector<py::ssize_t>{0, 2}),
+        py::arg("region_max_edge_sizes") = py::array_t<double>(std::vector<py::ssize_t>{0}),
+        py::arg("holes") = py::array_t<double>(std::vector<py::ssize_t>{0, 2})
         );
     m.def(
         "_generate_mesh", &generate_mesh,
         py::arg("domain"),
         py::arg("outfile"),
         py::arg("extra_feature_edges") = std::vector<std::vector<std::array<double, 3>>>(),
+        py::arg("detect_features") = false,
         py::arg("bounding_sphere_radius") = 0.0,
         py::arg("lloyd") = false,
         py::arg("odt") = false,
@@ -289,7 +635,10 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("quality") = nullptr,
+        py::arg("progress") = nullptr,
+        py::arg("stats") = nullptr
         );
     m.def(
         "_generate_periodic_mesh", &generate_periodic_mesh,
@@ -310,6 +659,74 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("verbose") = true,
         py::arg("seed") = 0
         );
+    m.def(
+        "_generate_periodic_mesh_arrays",
+        [](
+            const std::shared_ptr<pygalmesh::DomainBase> & domain,
+            const std::array<double, 6> bounding_cuboid,
+            const bool lloyd,
+            const bool odt,
+            const bool perturb,
+            const bool exude,
+            const double max_edge_size_at_feature_edges,
+            const double min_facet_angle,
+            const double max_radius_surface_delaunay_ball,
+            const double max_facet_distance,
+            const double max_circumradius_edge_ratio,
+            const double max_cell_circumradius,
+            const bool verbose,
+            const int seed
+            ) {
+              auto out = generate_periodic_mesh_arrays(
+                  domain,
+                  bounding_cuboid,
+                  lloyd,
+                  odt,
+                  perturb,
+                  exude,
+                  max_edge_size_at_feature_edges,
+                  min_facet_angle,
+                  max_radius_surface_delaunay_ball,
+                  max_facet_distance,
+                  max_circumradius_edge_ratio,
+                  max_cell_circumradius,
+                  verbose,
+                  seed
+                  );
+              const py::ssize_t num_points = out.points.size() / 3;
+              const py::ssize_t num_cells = out.cells.size() / 4;
+              const py::ssize_t num_unrolled_points = out.unrolled_points.size() / 3;
+              const py::ssize_t num_node_pairs = out.node_pairs.size() / 2;
+              py::dict arrays;
+              arrays["points"] = as_array(std::move(out.points), {num_points, 3});
+              arrays["cells"] = as_array(std::move(out.cells), {num_cells, 4});
+              arrays["offsets"] = as_array(std::move(out.offsets), {num_cells, 4, 3});
+              arrays["subdomains"] = as_array(std::move(out.subdomains), {num_cells});
+              arrays["unrolled_points"] = as_array(
+                  std::move(out.unrolled_points), {num_unrolled_points, 3}
+                  );
+              arrays["unrolled_cells"] = as_array(std::move(out.unrolled_cells), {num_cells, 4});
+              arrays["node_pairs"] = as_array(std::move(out.node_pairs), {num_node_pairs, 2});
+              arrays["node_pair_offsets"] = as_array(
+                  std::move(out.node_pair_offsets), {num_node_pairs, 3}
+                  );
+              return arrays;
+            },
+        py::arg("domain"),
+        py::arg("bounding_cuboid"),
+        py::arg("lloyd") = false,
+        py::arg("odt") = false,
+        py::arg("perturb") = true,
+        py::arg("exude") = true,
+        py::arg("max_edge_size_at_feature_edges") = 0.0,
+        py::arg("min_facet_angle") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_facet_distance") = 0.0,
+        py::arg("max_circumradius_edge_ratio") = 0.0,
+        py::arg("max_cell_circumradius") = 0.0,
+        py::arg("verbose") = true,
+        py::arg("seed") = 0
+        );
     m.def(
         "_generate_surface_mesh", &generate_surface_mesh,
         py::arg("domain"),
@@ -322,14 +739,14 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("seed") = 0
         );
     m.def(
-        "_generate_from_off", &generate_from_off,
-        py::arg("infile"),
+        "_generate_from_surface_mesh_domain", &generate_from_surface_mesh_domain,
+        py::arg("domain"),
         py::arg("outfile"),
         py::arg("lloyd") = false,
         py::arg("odt") = false,
         py::arg("perturb") = true,
         py::arg("exude") = true,
-        py::arg("max_edge_size_at_feature_edges") = 0.0,  // std::numeric_limits<double>::max(),
+        py::arg("max_edge_size_at_feature_edges") = 0.0,
         py::arg("min_facet_angle") = 0.0,
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
         py::arg("max_facet_distance") = 0.0,
@@ -337,14 +754,91 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_cell_circumradius") = 0.0,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
+        py::arg("detect_features") = false,
+        py::arg("feature_angle") = 60.0,
+        py::arg("extra_feature_edges") = std::vector<std::vector<std::array<double, 3>>>(),
         py::arg("verbose") = true,
-        py::arg("reorient") = false,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("quality") = nullptr,
+        py::arg("progress") = nullptr,
+        py::arg("stats") = nullptr
         );
     m.def(
-        "_generate_from_inr", &generate_from_inr,
-        py::arg("inr_filename"),
+        "_generate_from_labeled_image",
+        [](
+            const py::array & vol,
+            const std::array<double, 3> & voxel_size,
+            const std::string & outfile,
+            const double default_max_cell_circumradius,
+            const std::vector<double> & max_cell_circumradiuss,
+            const std::vector<int> & cell_labels,
+            const bool lloyd,
+            const bool odt,
+            const bool perturb,
+            const bool exude,
+            const double max_edge_size_at_feature_edges,
+            const double min_facet_angle,
+            const double max_radius_surface_delaunay_ball,
+            const double max_facet_distance,
+            const double max_circumradius_edge_ratio,
+            const double exude_time_limit,
+            const double exude_sliver_bound,
+            const bool verbose,
+            const int seed,
+            const std::shared_ptr<MeshQuality> & quality,
+            const std::shared_ptr<ProgressBase> & progress,
+            const std::shared_ptr<MeshStats> & stats,
+            const bool parallel,
+            const bool label_pyramid,
+            const std::vector<double> & transform,
+            const std::vector<int> & output_subdomains,
+            const std::string & output
+            ) {
+              const auto shape = image_shape(vol);
+              if (
+                  !vol.dtype().is(py::dtype::of<std::uint8_t>()) &&
+                  !vol.dtype().is(py::dtype::of<std::uint16_t>())
+                  ) {
+                throw std::invalid_argument("vol must be of dtype uint8 or uint16");
+              }
+              generate_from_labeled_image(
+                  vol.data(),
+                  vol.itemsize(),
+                  shape,
+                  voxel_size,
+                  outfile,
+                  default_max_cell_circumradius,
+                  max_cell_circumradiuss,
+                  cell_labels,
+                  lloyd,
+                  odt,
+                  perturb,
+                  exude,
+                  max_edge_size_at_feature_edges,
+                  min_facet_angle,
+                  max_radius_surface_delaunay_ball,
+                  max_facet_distance,
+                  max_circumradius_edge_ratio,
+                  exude_time_limit,
+                  exude_sliver_bound,
+                  verbose,
+                  seed,
+                  quality,
+                  progress,
+                  stats,
+                  parallel,
+                  label_pyramid,
+                  transform,
+                  output_subdomains,
+                  output
+                  );
+            },
+        py::arg("vol"),
+        py::arg("voxel_size"),
         py::arg("outfile"),
+        py::arg("default_max_cell_circumradius") = 0.0,
+        py::arg("max_cell_circumradiuss") = std::vector<double>(),
+        py::arg("cell_labels") = std::vector<int>(),
         py::arg("lloyd") = false,
         py::arg("odt") = false,
         py::arg("perturb") = true,
@@ -354,19 +848,101 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
         py::arg("max_facet_distance") = 0.0,
         py::arg("max_circumradius_edge_ratio") = 0.0,
-        py::arg("max_cell_circumradius") = 0.0,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("quality") = nullptr,
+        py::arg("progress") = nullptr,
+        py::arg("stats") = nullptr,
+        py::arg("parallel") = false,
+        py::arg("label_pyramid") = false,
+        py::arg("transform") = std::vector<double>(),
+        py::arg("output_subdomains") = std::vector<int>(),
+        py::arg("output") = "both"
         );
     m.def(
-        "_generate_from_inr_with_subdomain_sizing", &generate_from_inr_with_subdomain_sizing,
-        py::arg("inr_filename"),
+        "_generate_from_gray_image",
+        [](
+            const py::array & vol,
+            const std::array<double, 3> & voxel_size,
+            const double iso_value,
+            const bool inside_is_less,
+            const std::string & outfile,
+            const bool lloyd,
+            const bool odt,
+            const bool perturb,
+            const bool exude,
+            const double max_edge_size_at_feature_edges,
+            const double min_facet_angle,
+            const double max_radius_surface_delaunay_ball,
+            const double max_facet_distance,
+            const double max_circumradius_edge_ratio,
+            const double max_cell_circumradius,
+            const double exude_time_limit,
+            const double exude_sliver_bound,
+            const bool verbose,
+            const int seed,
+            const std::shared_ptr<MeshQuality> & quality,
+            const std::shared_ptr<ProgressBase> & progress,
+            const std::shared_ptr<MeshStats> & stats,
+            const bool parallel,
+            const std::vector<double> & transform,
+            const std::vector<int> & output_subdomains,
+            const std::string & output
+            ) {
+              if (vol.ndim() != 3) {
+                throw std::invalid_argument("vol must be three-dimensional");
+              }
+              if (!(vol.flags() & py::array::f_style)) {
+                throw std::invalid_argument("vol must be Fortran-contiguous");
+              }
+              if (
+                  !vol.dtype().is(py::dtype::of<float>()) &&
+                  !vol.dtype().is(py::dtype::of<double>())
+                  ) {
+                throw std::invalid_argument("vol must be of dtype float32 or float64");
+              }
+              generate_from_gray_image(
+                  vol.data(),
+                  vol.itemsize(),
+                  {
+                    static_cast<std::size_t>(vol.shape(0)),
+                    static_cast<std::size_t>(vol.shape(1)),
+                    static_cast<std::size_t>(vol.shape(2))
+                  },
+                  voxel_size,
+                  iso_value,
+                  inside_is_less,
+                  outfile,
+                  lloyd,
+                  odt,
+                  perturb,
+                  exude,
+                  max_edge_size_at_feature_edges,
+                  min_facet_angle,
+                  max_radius_surface_delaunay_ball,
+                  max_facet_distance,
+                  max_circumradius_edge_ratio,
+                  max_cell_circumradius,
+                  exude_time_limit,
+                  exude_sliver_bound,
+                  verbose,
+                  seed,
+                  quality,
+                  progress,
+                  stats,
+                  parallel,
+                  transform,
+                  output_subdomains,
+                  output
+                  );
+            },
+        py::arg("vol"),
+        py::arg("voxel_size"),
+        py::arg("iso_value"),
+        py::arg("inside_is_less"),
         py::arg("outfile"),
-        py::arg("default_max_cell_circumradius"),
-        py::arg("max_cell_circumradiuss"),
-        py::arg("cell_labels"),
         py::arg("lloyd") = false,
         py::arg("odt") = false,
         py::arg("perturb") = true,
@@ -376,14 +952,22 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
         py::arg("max_facet_distance") = 0.0,
         py::arg("max_circumradius_edge_ratio") = 0.0,
+        py::arg("max_cell_circumradius") = 0.0,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("quality") = nullptr,
+        py::arg("progress") = nullptr,
+        py::arg("stats") = nullptr,
+        py::arg("parallel") = false,
+        py::arg("transform") = std::vector<double>(),
+        py::arg("output_subdomains") = std::vector<int>(),
+        py::arg("output") = "both"
         );
     m.def(
-        "_remesh_surface", &remesh_surface,
-        py::arg("infile"),
+        "_remesh_surface_domain", &remesh_surface_domain,
+        py::arg("domain"),
         py::arg("outfile"),
         py::arg("max_edge_size_at_feature_edges") = 0.0,
         py::arg("min_facet_angle") = 0.0,
@@ -392,5 +976,121 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("verbose") = true,
         py::arg("seed") = 0
         );
+    m.def(
+        "_relabel_image",
+        [](py::array vol, const std::map<std::int64_t, std::int64_t> & mapping) {
+          const auto shape = image_shape(vol);
+          const std::size_t size = shape[0] * shape[1] * shape[2];
+          if (vol.dtype().is(py::dtype::of<std::uint8_t>())) {
+            auto * data = static_cast<std::uint8_t *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            relabel_image(data, size, mapping);
+          } else if (vol.dtype().is(py::dtype::of<std::uint16_t>())) {
+            auto * data = static_cast<std::uint16_t *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            relabel_image(data, size, mapping);
+          } else {
+            throw std::invalid_argument("Only uint8 and uint16 images can be relabeled");
+          }
+        },
+        py::arg("vol"),
+        py::arg("mapping")
+        );
+    m.def(
+        "_downsample_image",
+        [](const py::array & vol, const std::size_t factor) {
+          if (vol.dtype().is(py::dtype::of<std::uint8_t>())) {
+            return downsample_array<std::uint8_t>(vol, factor);
+          } else if (vol.dtype().is(py::dtype::of<std::uint16_t>())) {
+            return downsample_array<std::uint16_t>(vol, factor);
+          } else if (vol.dtype().is(py::dtype::of<float>())) {
+            return downsample_array<float>(vol, factor);
+          } else if (vol.dtype().is(py::dtype::of<double>())) {
+            return downsample_array<double>(vol, factor);
+          }
+          throw std::invalid_argument(
+              "vol must be of dtype uint8, uint16, float32 or float64"
+              );
+        },
+        py::arg("vol"),
+        py::arg("factor")
+        );
+    m.def(
+        "_smooth_image",
+        [](py::array vol, const std::array<double, 3> & sigma) {
+          const auto shape = image_shape(vol);
+          if (vol.dtype().is(py::dtype::of<std::uint8_t>())) {
+            auto * data = static_cast<std::uint8_t *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            smooth_labels(data, shape, sigma);
+          } else if (vol.dtype().is(py::dtype::of<std::uint16_t>())) {
+            auto * data = static_cast<std::uint16_t *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            smooth_labels(data, shape, sigma);
+          } else if (vol.dtype().is(py::dtype::of<float>())) {
+            auto * data = static_cast<float *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            gaussian_filter(data, shape, sigma);
+          } else if (vol.dtype().is(py::dtype::of<double>())) {
+            auto * data = static_cast<double *>(vol.mutable_data());
+            py::gil_scoped_release release;
+            gaussian_filter(data, shape, sigma);
+          } else {
+            throw std::invalid_argument(
+                "vol must be of dtype uint8, uint16, float32 or float64"
+                );
+          }
+        },
+        py::arg("vol"),
+        py::arg("sigma")
+        );
+    m.def(
+        "_reorder_points",
+        [](
+            const py::array_t<double, py::array::c_style | py::array::forcecast> & points,
+            const std::vector<py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>> & cells,
+            const std::string & method
+            ) {
+          if (points.ndim() != 2 || (points.shape(1) != 2 && points.shape(1) != 3)) {
+            throw std::invalid_argument("points must have shape (n, 2) or (n, 3)");
+          }
+          const std::size_t num_points = points.shape(0);
+          std::vector<CellBlock> blocks;
+          for (const auto & block: cells) {
+            if (block.ndim() != 2) {
+              throw std::invalid_argument("cells must have shape (m, k)");
+            }
+            blocks.push_back({
+                block.data(),
+                static_cast<std::size_t>(block.shape(0)),
+                static_cast<std::size_t>(block.shape(1))
+                });
+          }
+
+          std::vector<std::int64_t> order;
+          if (method == "hilbert") {
+            const int dim = static_cast<int>(points.shape(1));
+            py::gil_scoped_release release;
+            order = hilbert_order(points.data(), num_points, dim);
+          } else if (method == "rcm") {
+            py::gil_scoped_release release;
+            order = rcm_order(num_points, blocks);
+          } else {
+            std::stringstream msg;
+            msg << "Unknown reordering method \"" << method << "\" (use \"hilbert\" or \"rcm\")";
+            throw std::invalid_argument(msg.str());
+          }
+          return as_array(std::move(order), {static_cast<py::ssize_t>(num_points)});
+        },
+        py::arg("points"),
+        py::arg("cells"),
+        py::arg("method")
+        );
     m.attr("_CGAL_VERSION_STR") = CGAL_VERSION_STR;
+    // whether parallel=True has an effect
+#ifdef CGAL_LINKED_WITH_TBB
+    m.attr("_PARALLEL_MESHING") = true;
+#else
+    m.attr("_PARALLEL_MESHING") = false;
+#endif
 }
@@ -9,12 +9,12 @@
 #include <CGAL/Polyhedral_mesh_domain_with_features_3.h>
 #include <CGAL/make_mesh_3.h>
 
+#include <fstream>
+
 namespace pygalmesh {
 // Domain
-typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
-typedef CGAL::Polyhedral_mesh_domain_with_features_3<K> Mesh_domain;
-// Polyhedron type
-typedef CGAL::Mesh_polyhedron_3<K>::type Polyhedron;
+typedef SurfaceMeshDomain::K K;
+typedef SurfaceMeshDomain::Mesh_domain Mesh_domain;
 // Triangulation
 typedef CGAL::Mesh_triangulation_3<Mesh_domain>::type Tr;
 typedef CGAL::Mesh_complex_3_in_triangulation_3<
@@ -24,8 +24,8 @@ typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
 
 // <https://doc.cgal.org/latest/Mesh_3/#title24>
 void
-remesh_surface(
-    const std::string & infile,
+remesh_surface_domain(
+    const std::shared_ptr<pygalmesh::SurfaceMeshDomain> & domain,
     const std::string & outfile,
     const double max_edge_size_at_feature_edges,
     const double min_facet_angle,
@@ -37,21 +37,9 @@ remesh_surface(
 {
   CGAL::get_default_random() = CGAL::Random(seed);
 
-  // Load a polyhedron
-  Polyhedron poly;
-  std::ifstream input(infile.c_str());
-  input >> poly;
-  if (!CGAL::is_triangle_mesh(poly)){
-    throw "Input geometry is not triangulated.";
-  }
-  // Create a vector with only one element: the pointer to the polyhedron.
-  std::vector<Polyhedron*> poly_ptrs_vector(1, &poly);
-  // Create a polyhedral domain with only one polyhedron and no "bounding polyhedron"
-  // so the volumetric part of the domain will be empty.
-  Mesh_domain domain(poly_ptrs_vector.begin(), poly_ptrs_vector.end());
+  // The domain, its AABB tree and the sharp features are computed on first use only.
+  const Mesh_domain & cgal_domain = domain->get_surface_domain();
 
-  // Get sharp features
-  domain.detect_features(); //includes detection of borders
   // Mesh criteria
   Mesh_criteria criteria(
       CGAL::parameters::edge_size=max_edge_size_at_feature_edges,
@@ -66,7 +54,7 @@ remesh_surface(
     std::cerr.setstate(std::ios_base::failbit);
   }
   C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
-      domain,
+      cgal_domain,
       criteria,
       CGAL::parameters::no_perturb(),
       CGAL::parameters::no_exude()
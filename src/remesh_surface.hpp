@@ -1,13 +1,16 @@
 #ifndef REMESH_SURFACE_HPP
 #define REMESH_SURFACE_HPP
 
+#include "surface_mesh_domain.hpp"
+
+#include <memory>
 #include <string>
 #include <vector>
 
 namespace pygalmesh {
 
-void remesh_surface(
-    const std::string & infilen,
+void remesh_surface_domain(
+    const std::shared_ptr<pygalmesh::SurfaceMeshDomain> & domain,
     const std::string & outfile,
     const double max_edge_size_at_feature_edges = 0.0,  // std::numeric_limits<double>::max(),
     const double min_facet_angle = 0.0,
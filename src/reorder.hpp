@@ -0,0 +1,258 @@
+#ifndef REORDER_HPP
+#define REORDER_HPP
+
+// Orders of the vertices of a mesh that improve the locality of memory accesses in
+// codes that work on it, e.g., finite element assembly and sparse matrix-vector
+// products. An order is given as the list of the old indices in their new order.
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <numeric>
+#include <sstream>
+#include <stdexcept>
+#include <utility>
+#include <vector>
+
+namespace pygalmesh {
+
+// The key of a point with integer coordinates x (of bits bits each) along the Hilbert
+// curve through the dim-dimensional grid, after J. Skilling, Programming the Hilbert
+// curve, AIP Conf. Proc. 707, 381 (2004).
+inline
+std::uint64_t
+hilbert_key(std::array<std::uint32_t, 3> x, const int dim, const int bits)
+{
+  // inverse undo
+  for (std::uint32_t q = std::uint32_t(1) << (bits - 1); q > 1; q >>= 1) {
+    const std::uint32_t p = q - 1;
+    for (int i = 0; i < dim; i++) {
+      if (x[i] & q) {
+        x[0] ^= p;
+      } else {
+        const std::uint32_t t = (x[0] ^ x[i]) & p;
+        x[0] ^= t;
+        x[i] ^= t;
+      }
+    }
+  }
+  // Gray encode
+  for (int i = 1; i < dim; i++) {
+    x[i] ^= x[i - 1];
+  }
+  std::uint32_t t = 0;
+  for (std::uint32_t q = std::uint32_t(1) << (bits - 1); q > 1; q >>= 1) {
+    if (x[dim - 1] & q) {
+      t ^= q - 1;
+    }
+  }
+  for (int i = 0; i < dim; i++) {
+    x[i] ^= t;
+  }
+  // interleave the bits, most significant first
+  std::uint64_t key = 0;
+  for (int b = bits - 1; b >= 0; b--) {
+    for (int i = 0; i < dim; i++) {
+      key = (key << 1) | ((x[i] >> b) & 1);
+    }
+  }
+  return key;
+}
+
+// Sort the points (row-major, of dimension 2 or 3) along a Hilbert curve through their
+// bounding box.
+inline
+std::vector<std::int64_t>
+hilbert_order(const double * points, const std::size_t num_points, const int dim)
+{
+  if (dim < 2 || dim > 3) {
+    throw std::invalid_argument("Hilbert ordering needs 2D or 3D points");
+  }
+  const int bits = 63 / dim;
+  const double max_coord = double((std::uint64_t(1) << bits) - 1);
+
+  std::array<double, 3> lower = {0.0, 0.0, 0.0};
+  std::array<double, 3> scale = {0.0, 0.0, 0.0};
+  for (int d = 0; d < dim; d++) {
+    double lo = std::numeric_limits<double>::max();
+    double hi = std::numeric_limits<double>::lowest();
+    for (std::size_t k = 0; k < num_points; k++) {
+      lo = std::min(lo, points[dim * k + d]);
+      hi = std::max(hi, points[dim * k + d]);
+    }
+    lower[d] = lo;
+    scale[d] = hi > lo ? max_coord / (hi - lo) : 0.0;
+  }
+
+  std::vector<std::pair<std::uint64_t, std::int64_t>> keys(num_points);
+  for (std::size_t k = 0; k < num_points; k++) {
+    std::array<std::uint32_t, 3> x = {0, 0, 0};
+    for (int d = 0; d < dim; d++) {
+      x[d] = static_cast<std::uint32_t>((points[dim * k + d] - lower[d]) * scale[d]);
+    }
+    keys[k] = {hilbert_key(x, dim, bits), std::int64_t(k)};
+  }
+  std::sort(keys.begin(), keys.end());
+
+  std::vector<std::int64_t> order(num_points);
+  for (std::size_t k = 0; k < num_points; k++) {
+    order[k] = keys[k].second;
+  }
+  return order;
+}
+
+// The cells of a mesh: num_cells rows of cell_size vertex indices (row-major).
+struct CellBlock
+{
+  const std::int64_t * data;
+  std::size_t num_cells;
+  std::size_t cell_size;
+};
+
+// Reverse Cuthill-McKee order of the vertices of the graph in which two vertices are
+// adjacent if they share a cell. Every connected component is numbered by a
+// breadth-first search from a pseudo-peripheral vertex (Gibbs, Poole, Stockmeyer),
+// visiting neighbors by increasing degree. This keeps the bandwidth of matrices on the
+// mesh small.
+inline
+std::vector<std::int64_t>
+rcm_order(const std::size_t num_points, const std::vector<CellBlock> & blocks)
+{
+  // adjacency in compressed sparse row format, first with duplicates
+  std::vector<std::int64_t> offsets(num_points + 1, 0);
+  for (const auto & block: blocks) {
+    for (std::size_t c = 0; c < block.num_cells; c++) {
+      for (std::size_t i = 0; i < block.cell_size; i++) {
+        const std::int64_t v = block.data[block.cell_size * c + i];
+        if (v < 0 || std::size_t(v) >= num_points) {
+          std::stringstream msg;
+          msg << "Invalid vertex index " << v << " (number of points: " << num_points << ")";
+          throw std::invalid_argument(msg.str());
+        }
+        offsets[v + 1] += block.cell_size - 1;
+      }
+    }
+  }
+  std::partial_sum(offsets.begin(), offsets.end(), offsets.begin());
+  std::vector<std::int64_t> neighbors(offsets.back());
+  {
+    std::vector<std::int64_t> fill(offsets.begin(), offsets.end() - 1);
+    for (const auto & block: blocks) {
+      for (std::size_t c = 0; c < block.num_cells; c++) {
+        const std::int64_t * cell = block.data + block.cell_size * c;
+        for (std::size_t i = 0; i < block.cell_size; i++) {
+          for (std::size_t j = 0; j < block.cell_size; j++) {
+            if (i != j) {
+              neighbors[fill[cell[i]]++] = cell[j];
+            }
+          }
+        }
+      }
+    }
+  }
+  // remove the duplicates, in place
+  std::size_t size = 0;
+  for (std::size_t v = 0; v < num_points; v++) {
+    const auto begin = neighbors.begin() + offsets[v];
+    const auto end = neighbors.begin() + offsets[v + 1];
+    std::sort(begin, end);
+    const auto unique_end = std::unique(begin, end);
+    offsets[v] = size;
+    size = std::copy(begin, unique_end, neighbors.begin() + size) - neighbors.begin();
+  }
+  offsets[num_points] = size;
+  neighbors.resize(size);
+
+  const auto degree = [&](const std::int64_t v) {
+    return offsets[v + 1] - offsets[v];
+  };
+
+  // Breadth-first search from start through the unnumbered vertices; appends them to
+  // order and returns the index of the first vertex of the last level.
+  std::vector<std::int64_t> level(num_points, -1);
+  std::vector<std::int64_t> stamp(num_points, -1);
+  std::int64_t search = 0;
+  const auto bfs = [&](const std::int64_t start, std::vector<std::int64_t> & order) {
+    const std::size_t begin = order.size();
+    order.push_back(start);
+    stamp[start] = search;
+    level[start] = 0;
+    std::size_t last_level_begin = begin;
+    std::vector<std::int64_t> next;
+    for (std::size_t k = begin; k < order.size(); k++) {
+      const std::int64_t v = order[k];
+      if (level[v] != level[order[last_level_begin]]) {
+        last_level_begin = k;
+      }
+      next.clear();
+      for (std::int64_t n = offsets[v]; n < offsets[v + 1]; n++) {
+        const std::int64_t w = neighbors[n];
+        if (stamp[w] != search && level[w] != -2) {
+          stamp[w] = search;
+          level[w] = level[v] + 1;
+          next.push_back(w);
+        }
+      }
+      std::stable_sort(next.begin(), next.end(), [&](const std::int64_t a, const std::int64_t b) {
+        return degree(a) < degree(b);
+      });
+      order.insert(order.end(), next.begin(), next.end());
+    }
+    search++;
+    return last_level_begin;
+  };
+
+  // Start the components at vertices of low degree.
+  std::vector<std::int64_t> by_degree(num_points);
+  std::iota(by_degree.begin(), by_degree.end(), 0);
+  std::stable_sort(by_degree.begin(), by_degree.end(), [&](const std::int64_t a, const std::int64_t b) {
+    return degree(a) < degree(b);
+  });
+
+  std::vector<std::int64_t> order;
+  order.reserve(num_points);
+  std::vector<std::int64_t> component;
+  for (const std::int64_t seed: by_degree) {
+    // numbered vertices are marked with level -2
+    if (level[seed] == -2) {
+      continue;
+    }
+    // Look for a pseudo-peripheral vertex: go to a vertex of minimum degree in the
+    // last level as long as that increases the number of levels.
+    std::int64_t start = seed;
+    component.clear();
+    std::size_t last = bfs(start, component);
+    std::int64_t depth = level[component.back()];
+    for (int iteration = 0; iteration < 10; iteration++) {
+      std::int64_t candidate = component[last];
+      for (std::size_t k = last; k < component.size(); k++) {
+        if (degree(component[k]) < degree(candidate)) {
+          candidate = component[k];
+        }
+      }
+      std::vector<std::int64_t> trial;
+      const std::size_t trial_last = bfs(candidate, trial);
+      if (level[trial.back()] <= depth) {
+        break;
+      }
+      start = candidate;
+      depth = level[trial.back()];
+      component.swap(trial);
+      last = trial_last;
+    }
+    for (const std::int64_t v: component) {
+      level[v] = -2;
+    }
+    order.insert(order.end(), component.begin(), component.end());
+  }
+
+  std::reverse(order.begin(), order.end());
+  return order;
+}
+
+} // namespace pygalmesh
+
+#endif // REORDER_HPP
@@ -0,0 +1,244 @@
+#ifndef SIZING_FIELD_2D_HPP
+#define SIZING_FIELD_2D_HPP
+
+#include "sizing_field.hpp"
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <sstream>
+#include <stdexcept>
+#include <vector>
+
+// Sizing fields for generate_2d. They only look at the first two coordinates of the
+// point they're evaluated at.
+
+namespace pygalmesh {
+
+// Bilinear interpolation of values on a regular grid; values[i*ny + j] is the value at
+// (origin[0] + i*spacing[0], origin[1] + j*spacing[1]). Outside of the grid, the value
+// at the closest grid point on the border is used.
+class GridSizingField2D: public pygalmesh::SizingFieldBase
+{
+  public:
+    GridSizingField2D(
+        const std::array<double, 2> & origin,
+        const std::array<double, 2> & spacing,
+        const double * values,
+        const std::size_t nx,
+        const std::size_t ny
+        ):
+      origin_(origin),
+      spacing_(spacing),
+      values_(values, values + nx*ny),
+      nx_(nx),
+      ny_(ny)
+    {
+      if (nx < 2 || ny < 2) {
+        throw std::invalid_argument("The grid needs at least 2 points in each direction.");
+      }
+      if (spacing[0] <= 0.0 || spacing[1] <= 0.0) {
+        throw std::invalid_argument("The grid spacing must be positive.");
+      }
+    }
+
+    virtual ~GridSizingField2D() = default;
+
+    virtual
+    double
+    eval(const std::array<double, 3> & x) const
+    {
+      std::size_t i, j;
+      double s, t;
+      locate((x[0] - origin_[0]) / spacing_[0], nx_, i, s);
+      locate((x[1] - origin_[1]) / spacing_[1], ny_, j, t);
+      return
+        (1.0 - s) * (1.0 - t) * values_[i*ny_ + j] +
+        s * (1.0 - t) * values_[(i + 1)*ny_ + j] +
+        (1.0 - s) * t * values_[i*ny_ + j + 1] +
+        s * t * values_[(i + 1)*ny_ + j + 1];
+    }
+
+  private:
+    // cell index and local coordinate in [0, 1] of the grid coordinate xi
+    static
+    void
+    locate(const double xi, const std::size_t n, std::size_t & i, double & s)
+    {
+      const double clamped = std::min(std::max(xi, 0.0), static_cast<double>(n - 1));
+      i = std::min(static_cast<std::size_t>(clamped), n - 2);
+      s = clamped - static_cast<double>(i);
+    }
+
+    const std::array<double, 2> origin_;
+    const std::array<double, 2> spacing_;
+    const std::vector<double> values_;
+    const std::size_t nx_;
+    const std::size_t ny_;
+};
+
+
+// min(min_size + grading * d, max_size), where d is the distance to the closest of the
+// given segments. Typically, the segments are the constraints of the mesh, so the mesh
+// is fine along them and grows coarser away from them. A max_size of 0 means no upper
+// bound.
+class DistanceSizingField2D: public pygalmesh::SizingFieldBase
+{
+  public:
+    DistanceSizingField2D(
+        const double * points,
+        const std::size_t num_points,
+        const std::int64_t * segments,
+        const std::size_t num_segments,
+        const double min_size,
+        const double max_size,
+        const double grading
+        ):
+      min_size_(min_size),
+      max_size_(max_size),
+      grading_(grading)
+    {
+      if (num_segments == 0) {
+        throw std::invalid_argument("Need at least one segment.");
+      }
+
+      segments_.reserve(num_segments);
+      double length_sum = 0.0;
+      for (std::size_t k = 0; k < 2*num_segments; k++) {
+        if (segments[k] < 0 || static_cast<std::size_t>(segments[k]) >= num_points) {
+          std::stringstream msg;
+          msg << "Invalid segment index " << segments[k]
+            << " (number of points: " << num_points << ")";
+          throw std::invalid_argument(msg.str());
+        }
+      }
+      for (std::size_t k = 0; k < num_segments; k++) {
+        const double * a = points + 2*segments[2*k];
+        const double * b = points + 2*segments[2*k + 1];
+        segments_.push_back({a[0], a[1], b[0], b[1]});
+        length_sum += std::hypot(b[0] - a[0], b[1] - a[1]);
+      }
+
+      // Sort the segments into the cells of a grid so that the closest one can be found
+      // without looking at all of them.
+      double xmin = std::numeric_limits<double>::max();
+      double ymin = std::numeric_limits<double>::max();
+      double xmax = std::numeric_limits<double>::lowest();
+      double ymax = std::numeric_limits<double>::lowest();
+      for (const auto & s: segments_) {
+        xmin = std::min({xmin, s[0], s[2]});
+        xmax = std::max({xmax, s[0], s[2]});
+        ymin = std::min({ymin, s[1], s[3]});
+        ymax = std::max({ymax, s[1], s[3]});
+      }
+      // cells of about the average segment length, but not too many of them
+      const double extent = std::max({xmax - xmin, ymax - ymin, 1.0e-15});
+      h_ = std::max(length_sum / num_segments, extent / 1024);
+      x0_ = xmin;
+      y0_ = ymin;
+      nx_ = static_cast<std::size_t>((xmax - xmin) / h_) + 1;
+      ny_ = static_cast<std::size_t>((ymax - ymin) / h_) + 1;
+      cells_.resize(nx_ * ny_);
+      for (std::size_t k = 0; k < segments_.size(); k++) {
+        const auto & s = segments_[k];
+        const std::size_t i0 = cell_index(std::min(s[0], s[2]) - x0_, nx_);
+        const std::size_t i1 = cell_index(std::max(s[0], s[2]) - x0_, nx_);
+        const std::size_t j0 = cell_index(std::min(s[1], s[3]) - y0_, ny_);
+        const std::size_t j1 = cell_index(std::max(s[1], s[3]) - y0_, ny_);
+        for (std::size_t i = i0; i <= i1; i++) {
+          for (std::size_t j = j0; j <= j1; j++) {
+            cells_[i*ny_ + j].push_back(k);
+          }
+        }
+      }
+    }
+
+    virtual ~DistanceSizingField2D() = default;
+
+    virtual
+    double
+    eval(const std::array<double, 3> & x) const
+    {
+      const double size = min_size_ + grading_ * distance(x[0], x[1]);
+      return max_size_ > 0.0 ? std::min(size, max_size_) : size;
+    }
+
+    double
+    distance(const double x, const double y) const
+    {
+      const std::size_t ci = cell_index(x - x0_, nx_);
+      const std::size_t cj = cell_index(y - y0_, ny_);
+
+      // Look at the rings of cells around (ci, cj) until all segments that could be
+      // closer than the closest one found so far have been looked at.
+      double min_dist2 = std::numeric_limits<double>::max();
+      const std::size_t max_r = std::max(nx_, ny_);
+      for (std::size_t r = 0; r <= max_r; r++) {
+        for (std::size_t i = (ci > r ? ci - r : 0); i <= std::min(ci + r, nx_ - 1); i++) {
+          for (std::size_t j = (cj > r ? cj - r : 0); j <= std::min(cj + r, ny_ - 1); j++) {
+            const bool on_ring =
+              i + r == ci || i == ci + r || j + r == cj || j == cj + r;
+            if (!on_ring) {
+              continue;
+            }
+            for (const auto k: cells_[i*ny_ + j]) {
+              min_dist2 = std::min(min_dist2, squared_distance(x, y, segments_[k]));
+            }
+          }
+        }
+        // The segments in the cells beyond the ring are at least this far away.
+        const double bound = std::min({
+            x - (x0_ + (static_cast<double>(ci) - r) * h_),
+            (x0_ + (static_cast<double>(ci) + r + 1) * h_) - x,
+            y - (y0_ + (static_cast<double>(cj) - r) * h_),
+            (y0_ + (static_cast<double>(cj) + r + 1) * h_) - y
+            });
+        if (bound > 0.0 && min_dist2 <= bound * bound) {
+          break;
+        }
+      }
+      return std::sqrt(min_dist2);
+    }
+
+  private:
+    std::size_t
+    cell_index(const double d, const std::size_t n) const
+    {
+      if (d <= 0.0) {
+        return 0;
+      }
+      return std::min(static_cast<std::size_t>(d / h_), n - 1);
+    }
+
+    static
+    double
+    squared_distance(const double x, const double y, const std::array<double, 4> & s)
+    {
+      const double dx = s[2] - s[0];
+      const double dy = s[3] - s[1];
+      const double len2 = dx*dx + dy*dy;
+      double t = len2 > 0.0 ? ((x - s[0])*dx + (y - s[1])*dy) / len2 : 0.0;
+      t = std::min(std::max(t, 0.0), 1.0);
+      const double ex = s[0] + t*dx - x;
+      const double ey = s[1] + t*dy - y;
+      return ex*ex + ey*ey;
+    }
+
+    const double min_size_;
+    const double max_size_;
+    const double grading_;
+    std::vector<std::array<double, 4>> segments_;
+    double x0_;
+    double y0_;
+    double h_;
+    std::size_t nx_;
+    std::size_t ny_;
+    std::vector<std::vector<std::size_t>> cells_;
+};
+
+} // namespace pygalmesh
+
+#endif // SIZING_FIELD_2D_HPP
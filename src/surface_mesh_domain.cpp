@@ -0,0 +1,169 @@
+#include "surface_mesh_domain.hpp"
+
+#include <CGAL/Polygon_mesh_processing/orient_polygon_soup.h>
+#include <CGAL/Polygon_mesh_processing/polygon_soup_to_polygon_mesh.h>
+#include <CGAL/Random.h>
+
+#include <algorithm>
+#include <cmath>
+#include <sstream>
+#include <stdexcept>
+#include <vector>
+
+namespace pygalmesh {
+
+SurfaceMeshDomain::SurfaceMeshDomain(
+    const double * points,
+    const std::size_t num_points,
+    const std::int64_t * triangles,
+    const std::size_t num_triangles,
+    const bool reorient
+    )
+{
+  if (num_triangles == 0) {
+    throw std::runtime_error("Input surface mesh has no triangles.");
+  }
+
+  std::vector<K::Point_3> cgal_points;
+  cgal_points.reserve(num_points);
+  for (std::size_t k = 0; k < num_points; k++) {
+    cgal_points.push_back(K::Point_3(points[3*k], points[3*k + 1], points[3*k + 2]));
+  }
+
+  std::vector<std::vector<std::size_t>> polygons;
+  polygons.reserve(num_triangles);
+  for (std::size_t k = 0; k < num_triangles; k++) {
+    const std::int64_t * t = triangles + 3*k;
+    for (std::size_t i = 0; i < 3; i++) {
+      if (t[i] < 0 || static_cast<std::size_t>(t[i]) >= num_points) {
+        std::stringstream msg;
+        msg << "Invalid triangle index " << t[i] << " (number of points: " << num_points << ")";
+        throw std::runtime_error(msg.str());
+      }
+    }
+    polygons.push_back({
+        static_cast<std::size_t>(t[0]),
+        static_cast<std::size_t>(t[1]),
+        static_cast<std::size_t>(t[2])
+        });
+  }
+
+  if (reorient) {
+    // fix the orientation of the faces
+    CGAL::Polygon_mesh_processing::orient_polygon_soup(cgal_points, polygons);
+  } else if (!CGAL::Polygon_mesh_processing::is_polygon_soup_a_polygon_mesh(polygons)) {
+    // Even if the mesh exists, it may not be valid, see
+    // <https://github.com/CGAL/cgal/issues/4632>
+    throw std::runtime_error(
+        "Invalid input surface mesh. "
+        "If this is due to wrong face orientation, retry with the option reorient."
+        );
+  }
+  CGAL::Polygon_mesh_processing::polygon_soup_to_polygon_mesh(
+      cgal_points, polygons, polyhedron_
+      );
+}
+
+const SurfaceMeshDomain::Volume_domain &
+SurfaceMeshDomain::get_volume_domain()
+{
+  if (!volume_domain_) {
+    // Use the default random generator so that reseeding it before each meshing run
+    // makes the results reproducible, even with a domain that is reused.
+    volume_domain_ = std::make_unique<Volume_domain>(
+        polyhedron_, &CGAL::get_default_random()
+        );
+  }
+  return *volume_domain_;
+}
+
+const SurfaceMeshDomain::Mesh_domain &
+SurfaceMeshDomain::get_volume_domain_with_features(
+    const bool detect_features,
+    const double feature_angle,
+    const std::vector<std::vector<std::array<double, 3>>> & feature_edges
+    )
+{
+  if (
+      feature_domain_ &&
+      feature_domain_detect_features_ == detect_features &&
+      (!detect_features || feature_domain_feature_angle_ == feature_angle) &&
+      feature_domain_feature_edges_ == feature_edges
+     ) {
+    return *feature_domain_;
+  }
+
+  feature_domain_ = std::make_unique<Mesh_domain>(
+      polyhedron_, &CGAL::get_default_random()
+      );
+  if (detect_features) {
+    feature_domain_->detect_features(feature_angle);
+  }
+  std::vector<std::vector<K::Point_3>> polylines;
+  polylines.reserve(feature_edges.size());
+  for (const auto & feature_edge: feature_edges) {
+    std::vector<K::Point_3> polyline;
+    polyline.reserve(feature_edge.size());
+    for (const auto & p: feature_edge) {
+      polyline.push_back(K::Point_3(p[0], p[1], p[2]));
+    }
+    polylines.push_back(polyline);
+  }
+  feature_domain_->add_features(polylines.begin(), polylines.end());
+
+  feature_domain_detect_features_ = detect_features;
+  feature_domain_feature_angle_ = feature_angle;
+  feature_domain_feature_edges_ = feature_edges;
+  return *feature_domain_;
+}
+
+const SurfaceMeshDomain::Mesh_domain &
+SurfaceMeshDomain::get_surface_domain()
+{
+  if (!surface_domain_) {
+    // Create a polyhedral domain with only one polyhedron and no "bounding polyhedron"
+    // so the volumetric part of the domain will be empty.
+    std::vector<Polyhedron*> poly_ptrs_vector(1, &polyhedron_);
+    surface_domain_ = std::make_unique<Mesh_domain>(
+        poly_ptrs_vector.begin(), poly_ptrs_vector.end(), &CGAL::get_default_random()
+        );
+    // Get sharp features
+    surface_domain_->detect_features(); //includes detection of borders
+  }
+  return *surface_domain_;
+}
+
+SurfaceMeshInterior::SurfaceMeshInterior(
+    const std::shared_ptr<const SurfaceMeshDomain> & surface
+    ):
+  surface_(surface)
+{
+  const Polyhedron & polyhedron = surface_->polyhedron();
+  if (!CGAL::is_closed(polyhedron)) {
+    throw std::runtime_error("The surface mesh doesn't bound a volume (it has borders).");
+  }
+  tree_.insert(faces(polyhedron).first, faces(polyhedron).second, polyhedron);
+  // Build the tree and the search structure for distance queries now, not lazily on
+  // the first (possibly concurrent) evaluation.
+  tree_.build();
+  tree_.accelerate_distance_queries();
+  side_ = std::make_unique<Side_of_surface>(tree_);
+
+  // the domain is bounded by a sphere around the origin
+  for (auto p = polyhedron.points_begin(); p != polyhedron.points_end(); ++p) {
+    bounding_sphere_squared_radius_ = std::max(
+        bounding_sphere_squared_radius_,
+        CGAL::to_double((*p - CGAL::ORIGIN).squared_length())
+        );
+  }
+}
+
+double
+SurfaceMeshInterior::eval(const std::array<double, 3> & x) const
+{
+  const K::Point_3 p(x[0], x[1], x[2]);
+  const double distance = std::sqrt(CGAL::to_double(tree_.squared_distance(p)));
+  return (*side_)(p) == CGAL::ON_BOUNDED_SIDE ? -distance : distance;
+}
+
+} // namespace pygalmesh
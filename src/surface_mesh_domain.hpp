@@ -0,0 +1,134 @@
+#ifndef SURFACE_MESH_DOMAIN_HPP
+#define SURFACE_MESH_DOMAIN_HPP
+
+#include "domain.hpp"
+
+#include <CGAL/AABB_face_graph_triangle_primitive.h>
+#include <CGAL/AABB_traits.h>
+#include <CGAL/AABB_tree.h>
+#include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
+#include <CGAL/Mesh_polyhedron_3.h>
+#include <CGAL/Polyhedral_mesh_domain_3.h>
+#include <CGAL/Polyhedral_mesh_domain_with_features_3.h>
+#include <CGAL/Side_of_triangle_mesh.h>
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+namespace pygalmesh {
+
+// A triangulated surface that is loaded once and can be meshed many times. The
+// polyhedron, the CGAL mesh domains built from it (including their AABB trees), and
+// the detected sharp features are kept in memory and reused across calls.
+class SurfaceMeshDomain
+{
+  public:
+  typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
+  typedef CGAL::Mesh_polyhedron_3<K>::type Polyhedron;
+  typedef CGAL::Polyhedral_mesh_domain_3<Polyhedron, K> Volume_domain;
+  typedef CGAL::Polyhedral_mesh_domain_with_features_3<K> Mesh_domain;
+
+  // Build the domain directly from contiguous row-major buffers of shape
+  // (num_points, 3) and (num_triangles, 3), e.g., the data of NumPy arrays.
+  SurfaceMeshDomain(
+      const double * points,
+      const std::size_t num_points,
+      const std::int64_t * triangles,
+      const std::size_t num_triangles,
+      const bool reorient = false
+      );
+
+  virtual ~SurfaceMeshDomain() = default;
+
+  // The domain bounded by the surface, used for volume meshing without protected
+  // features.
+  const Volume_domain &
+  get_volume_domain();
+
+  // The domain bounded by the surface with protected features. If detect_features is
+  // set, all edges at which the normals of the two adjacent facets differ by more than
+  // feature_angle (in degrees), as well as all borders, are protected; feature_edges
+  // are additional polylines to protect. The domain is rebuilt only when these
+  // settings change from one call to the next.
+  const Mesh_domain &
+  get_volume_domain_with_features(
+      const bool detect_features,
+      const double feature_angle,
+      const std::vector<std::vector<std::array<double, 3>>> & feature_edges
+      );
+
+  // The surface itself with its sharp features and borders, used for remeshing.
+  const Mesh_domain &
+  get_surface_domain();
+
+  std::size_t
+  number_of_vertices() const
+  {
+    return polyhedron_.size_of_vertices();
+  }
+
+  std::size_t
+  number_of_facets() const
+  {
+    return polyhedron_.size_of_facets();
+  }
+
+  const Polyhedron &
+  polyhedron() const
+  {
+    return polyhedron_;
+  }
+
+  private:
+  Polyhedron polyhedron_;
+  std::unique_ptr<Volume_domain> volume_domain_;
+  std::unique_ptr<Mesh_domain> feature_domain_;
+  bool feature_domain_detect_features_ = false;
+  double feature_domain_feature_angle_ = 0.0;
+  std::vector<std::vector<std::array<double, 3>>> feature_domain_feature_edges_;
+  std::unique_ptr<Mesh_domain> surface_domain_;
+};
+
+// The volume bounded by a (closed) SurfaceMeshDomain as an implicit domain, so that
+// surface meshes can be combined with each other and with the other domains, e.g., as
+// the parts of a MultiDomain. eval() is the signed distance to the surface, negative
+// inside.
+class SurfaceMeshInterior: public pygalmesh::DomainBase
+{
+  public:
+  typedef SurfaceMeshDomain::K K;
+  typedef SurfaceMeshDomain::Polyhedron Polyhedron;
+  typedef CGAL::AABB_face_graph_triangle_primitive<Polyhedron> Primitive;
+  typedef CGAL::AABB_traits<K, Primitive> Traits;
+  typedef CGAL::AABB_tree<Traits> Tree;
+  typedef CGAL::Side_of_triangle_mesh<Polyhedron, K, CGAL::Default, Tree> Side_of_surface;
+
+  explicit SurfaceMeshInterior(const std::shared_ptr<const SurfaceMeshDomain> & surface);
+
+  virtual ~SurfaceMeshInterior() = default;
+
+  virtual
+  double
+  eval(const std::array<double, 3> & x) const;
+
+  virtual
+  double
+  get_bounding_sphere_squared_radius() const
+  {
+    return bounding_sphere_squared_radius_;
+  }
+
+  private:
+  // keeps the polyhedron alive
+  const std::shared_ptr<const SurfaceMeshDomain> surface_;
+  Tree tree_;
+  std::unique_ptr<Side_of_surface> side_;
+  double bounding_sphere_squared_radius_ = 0.0;
+};
+
+} // namespace pygalmesh
+
+#endif // SURFACE_MESH_DOMAIN_HPP
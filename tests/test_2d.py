@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from helpers import compute_triangle_areas
 
 import pygalmesh
@@ -45,5 +46,119 @@ def test_disk():
     assert np.all(areas > 1.0e-5)
 
 
+def test_array_input():
+    # non-contiguous float32 points, int32 constraints, and a duplicate point
+    points = np.array(
+        [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]], dtype=np.float32
+    )
+    points = np.column_stack([points, np.zeros(len(points), dtype=np.float32)])[:, :2]
+    assert not points.flags["C_CONTIGUOUS"]
+    constraints = np.array([[0, 1], [1, 2], [2, 3], [3, 4]], dtype=np.int32)
+
+    mesh = pygalmesh.generate_2d(points, constraints, max_edge_size=1.0e-1)
+
+    cells = mesh.get_cells_type("triangle")
+    assert mesh.points.dtype == np.float64
+    assert mesh.points.shape[1] == 2
+    assert cells.dtype == np.int64
+    assert cells.shape[1] == 3
+    assert np.all(cells < len(mesh.points))
+    areas = compute_triangle_areas(mesh.points, cells)
+    assert abs(np.sum(areas) - 1.0) < 1.0e-10
+
+
+def test_sizing_field():
+    points = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    constraints = [[0, 1], [1, 2], [2, 3], [3, 0]]
+
+    uniform = pygalmesh.generate_2d(points, constraints, max_edge_size=0.05)
+    num_uniform = len(uniform.get_cells_type("triangle"))
+
+    # fine along the boundary, coarse inside
+    field = pygalmesh.DistanceSizingField2D(
+        points, constraints, min_size=0.05, max_size=0.3, grading=1.0
+    )
+    assert abs(field.eval([0.5, 0.5, 0.0]) - 0.3) < 1.0e-14
+    assert abs(field.eval([0.1, 0.5, 0.0]) - 0.15) < 1.0e-14
+    graded = pygalmesh.generate_2d(points, constraints, max_edge_size=field)
+    cells = graded.get_cells_type("triangle")
+    assert len(cells) < num_uniform
+    areas = compute_triangle_areas(graded.points, cells)
+    assert abs(np.sum(areas) - 1.0) < 1.0e-10
+
+    # the same with a Python function
+    graded_py = pygalmesh.generate_2d(
+        points,
+        constraints,
+        max_edge_size=lambda x: min(0.05 + min(x[0], 1 - x[0], x[1], 1 - x[1]), 0.3),
+    )
+    assert len(graded_py.get_cells_type("triangle")) < num_uniform
+
+    # a constant grid field is the same as a constant bound
+    grid = pygalmesh.GridSizingField2D([0.0, 0.0], [1.0, 1.0], np.full((2, 2), 0.05))
+    assert abs(grid.eval([0.3, 0.7, 0.0]) - 0.05) < 1.0e-14
+    mesh = pygalmesh.generate_2d(points, constraints, max_edge_size=grid)
+    assert len(mesh.get_cells_type("triangle")) > 0
+
+
+def test_regions():
+    # two squares side by side, with a square hole in the right one
+    points = np.array(
+        [
+            [0.0, 0.0],
+            [1.0, 0.0],
+            [2.0, 0.0],
+            [2.0, 1.0],
+            [1.0, 1.0],
+            [0.0, 1.0],
+            [1.4, 0.4],
+            [1.6, 0.4],
+            [1.6, 0.6],
+            [1.4, 0.6],
+        ]
+    )
+    constraints = [
+        [0, 1],
+        [1, 2],
+        [2, 3],
+        [3, 4],
+        [4, 5],
+        [5, 0],
+        [1, 4],
+        [6, 7],
+        [7, 8],
+        [8, 9],
+        [9, 6],
+    ]
+
+    mesh = pygalmesh.generate_2d(
+        points,
+        constraints,
+        seeds=[[0.5, 0.5], [1.2, 0.5]],
+        holes=[[1.5, 0.5]],
+        region_max_edge_size=[0.05, 0.2],
+    )
+    cells = mesh.get_cells_type("triangle")
+    regions = mesh.cell_data["region"][0]
+    assert regions.shape == (len(cells),)
+    assert set(regions) == {1, 2}
+
+    areas = compute_triangle_areas(mesh.points, cells)
+    assert abs(np.sum(areas[regions == 1]) - 1.0) < 1.0e-10
+    assert abs(np.sum(areas[regions == 2]) - 0.96) < 1.0e-10
+    # the left region is finer
+    assert np.sum(regions == 1) > 2 * np.sum(regions == 2)
+
+    # all triangles are on one side of the divider
+    centroids = np.sum(mesh.points[cells], axis=1) / 3
+    assert np.all(centroids[regions == 1, 0] < 1.0)
+    assert np.all(centroids[regions == 2, 0] > 1.0)
+
+    with pytest.raises(RuntimeError):
+        pygalmesh.generate_2d(
+            points, constraints, seeds=[[1.5, 0.5]], holes=[[1.5, 0.5]]
+        )
+
+
 if __name__ == "__main__":
     test_disk()
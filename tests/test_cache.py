@@ -0,0 +1,125 @@
+import meshio
+import numpy as np
+
+import pygalmesh
+
+
+def test_cache(tmp_path):
+    ball = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+
+    with pygalmesh.cache(tmp_path, max_bytes=2**30):
+        mesh0 = pygalmesh.generate_mesh(ball, max_cell_circumradius=0.2, verbose=False)
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+
+        # equal domains give a cache hit
+        mesh1 = pygalmesh.generate_mesh(
+            pygalmesh.Ball([0.0, 0.0, 0.0], 1.0),
+            max_cell_circumradius=0.2,
+            verbose=False,
+        )
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+        assert np.array_equal(mesh0.points, mesh1.points)
+        assert np.array_equal(
+            mesh0.get_cells_type("tetra"), mesh1.get_cells_type("tetra")
+        )
+
+        # other criteria or seeds don't
+        pygalmesh.generate_mesh(ball, max_cell_circumradius=0.3, verbose=False)
+        pygalmesh.generate_mesh(ball, max_cell_circumradius=0.2, seed=1, verbose=False)
+        assert len(list(tmp_path.glob("*.npz"))) == 3
+
+        # domains defined in Python aren't cached
+        class Ball(pygalmesh.DomainBase):
+            def eval(self, x):
+                return x[0] ** 2 + x[1] ** 2 + x[2] ** 2 - 1.0
+
+            def get_bounding_sphere_squared_radius(self):
+                return 2.0
+
+        pygalmesh.generate_mesh(Ball(), max_cell_circumradius=0.3, verbose=False)
+        assert len(list(tmp_path.glob("*.npz"))) == 3
+
+    # the cache is off again outside of the context
+    pygalmesh.generate_mesh(ball, max_cell_circumradius=0.4, verbose=False)
+    assert len(list(tmp_path.glob("*.npz"))) == 3
+
+
+def test_cache_eviction(tmp_path):
+    ball = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+
+    with pygalmesh.cache(tmp_path, max_bytes=2**30):
+        pygalmesh.generate_mesh(ball, max_cell_circumradius=0.2, verbose=False)
+    size = sum(f.stat().st_size for f in tmp_path.glob("*.npz"))
+
+    # room for just one mesh of that size
+    with pygalmesh.cache(tmp_path, max_bytes=int(1.5 * size)):
+        pygalmesh.generate_mesh(ball, max_cell_circumradius=0.21, verbose=False)
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+
+def test_cache_corrupted(tmp_path):
+    mesh = meshio.Mesh(
+        np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]),
+        [("tetra", np.array([[0, 1, 2, 3]]))],
+    )
+    with pygalmesh.cache(tmp_path) as mesh_cache:
+        mesh_cache.store("key", mesh)
+        assert mesh_cache.load("key") is not None
+
+        # damaged entries are misses
+        path = tmp_path / "key.npz"
+        path.write_bytes(path.read_bytes()[:20])
+        assert mesh_cache.load("key") is None
+        path.write_bytes(b"")
+        assert mesh_cache.load("key") is None
+
+
+def test_cache_nrrd(tmp_path):
+    n = 20
+    x = np.arange(n) - (n - 1) / 2
+    vol = x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2 < 64
+    header = "\n".join(
+        [
+            "NRRD0004",
+            "type: uint8",
+            "dimension: 3",
+            f"sizes: {n} {n} {n}",
+            "spacings: 0.1 0.1 0.1",
+            "encoding: raw",
+        ]
+    )
+    filename = tmp_path / "ball.nrrd"
+    with open(filename, "wb") as f:
+        f.write((header + "\n\n").encode())
+        f.write(vol.astype(np.uint8).tobytes(order="F"))
+
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    with pygalmesh.cache(cache_dir):
+        pygalmesh.generate_from_inr(filename, max_cell_circumradius=0.5, verbose=False)
+        # one entry, for the NRRD file
+        assert len(list(cache_dir.glob("*.npz"))) == 1
+
+
+def test_cache_array(tmp_path):
+    n = 20
+    x = np.arange(n) - (n - 1) / 2
+    vol = (
+        x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2 < 64
+    ).astype(np.uint8)
+    h = (0.1, 0.1, 0.1)
+
+    with pygalmesh.cache(tmp_path):
+        mesh0 = pygalmesh.generate_from_array(
+            vol, h, max_cell_circumradius=0.5, verbose=False
+        )
+        # arrays are keyed by their contents, not their memory layout
+        mesh1 = pygalmesh.generate_from_array(
+            np.asfortranarray(vol), h, max_cell_circumradius=0.5, verbose=False
+        )
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+        assert np.array_equal(mesh0.points, mesh1.points)
+
+        vol[0, 0, 0] = 1
+        pygalmesh.generate_from_array(vol, h, max_cell_circumradius=0.5, verbose=False)
+        assert len(list(tmp_path.glob("*.npz"))) == 2
@@ -1,5 +1,8 @@
+import warnings
+
 import helpers
 import numpy as np
+import pytest
 
 import pygalmesh
 
@@ -70,3 +73,269 @@ def test_from_array_with_subdomain_sizing():
     # Debian needs 2.0e-2 here.
     # <https://github.com/nschloe/pygalmesh/issues/60>
     assert abs(vol - ref) < ref * 2.0e-2
+
+
+def test_from_array_parallel():
+    n = 100
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint8)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+    vol[ii * ii + jj * jj + kk * kk < (0.5 * n) ** 2] = 2
+
+    with warnings.catch_warnings():
+        # without TBB, pygalmesh warns and meshes sequentially
+        warnings.simplefilter("ignore")
+        mesh = pygalmesh.generate_from_array(
+            vol,
+            h,
+            max_cell_circumradius={1: 20 * min(h), 2: 5 * min(h)},
+            max_facet_distance=min(h),
+            verbose=False,
+            parallel=True,
+        )
+
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi
+    assert abs(vol - ref) < ref * 4.0e-2
+
+
+def test_from_array_label_pyramid():
+    n = 100
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint8)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+    vol[ii * ii + jj * jj + kk * kk < (0.5 * n) ** 2] = 2
+
+    kwargs = {
+        "max_cell_circumradius": 20 * min(h),
+        "max_facet_distance": min(h),
+        "verbose": False,
+        "seed": 1,
+    }
+    mesh = pygalmesh.generate_from_array(vol, h, label_pyramid=True, **kwargs)
+
+    vol1 = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi
+    assert abs(vol1 - ref) < ref * 4.0e-2
+
+    # The pyramid only answers where the labels around a point agree, so the labels,
+    # and with them the mesh, are the same as without it.
+    ref_mesh = pygalmesh.generate_from_array(vol, h, label_pyramid=False, **kwargs)
+    assert np.array_equal(mesh.points, ref_mesh.points)
+    assert [c.type for c in mesh.cells] == [c.type for c in ref_mesh.cells]
+    for cell_block, ref_block in zip(mesh.cells, ref_mesh.cells):
+        assert np.array_equal(cell_block.data, ref_block.data)
+    assert all(
+        np.array_equal(a, b)
+        for a, b in zip(mesh.cell_data["medit:ref"], ref_mesh.cell_data["medit:ref"])
+    )
+
+
+def test_from_array_preprocessing():
+    n = 200
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint16)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+    vol[ii * ii + jj * jj + kk * kk < (0.5 * n) ** 2] = 2
+    ref_vol = vol.copy()
+
+    # merge the inner ball into the outer one
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        h,
+        max_cell_circumradius=10 * min(h),
+        max_facet_distance=2 * min(h),
+        verbose=False,
+        downsample=2,
+        relabel={2: 1},
+        smooth_sigma=2 * min(h),
+    )
+    # the input is left alone
+    assert np.array_equal(vol, ref_vol)
+
+    assert set(np.unique(mesh.cell_data_dict["medit:ref"]["tetra"])) == {1}
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi
+    assert abs(vol - ref) < ref * 4.0e-2
+
+
+def _gaussian_filter(vol, sigma):
+    # reference: separable convolution with the values at the boundary continued
+    for axis, s in enumerate(sigma):
+        radius = int(np.ceil(3 * s))
+        kernel = np.exp(-0.5 * np.arange(-radius, radius + 1) ** 2 / s**2)
+        kernel /= kernel.sum()
+        padding = [(0, 0)] * 3
+        padding[axis] = (radius, radius)
+        padded = np.pad(vol, padding, mode="edge")
+        vol = sum(
+            w * np.take(padded, np.arange(r, r + vol.shape[axis]), axis=axis)
+            for r, w in enumerate(kernel)
+        )
+    return vol
+
+
+def test_smooth_labels():
+    rng = np.random.default_rng(0)
+    vol = np.zeros((40, 30, 50), dtype=np.uint8, order="F")
+    vol[5:15, 5:20, 10:30] = 1
+    vol[20:35, 10:25, 30:45] = 2
+    vol[rng.random(vol.shape) < 0.02] = 3
+    # smooth_sigma is in world units: 1.0, 1.5 and 2.0 voxels
+    h = (3.0, 2.0, 1.5)
+    sigma = (1.0, 1.5, 2.0)
+
+    ref = vol.copy()
+    for label in np.unique(vol):
+        ref[_gaussian_filter((vol == label).astype(float), sigma) > 0.5] = label
+
+    kwargs = {
+        "max_cell_circumradius": 10.0,
+        "max_facet_distance": 2.0,
+        "verbose": False,
+        "seed": 1,
+    }
+    mesh = pygalmesh.generate_from_array(vol, h, smooth_sigma=3.0, **kwargs)
+    ref_mesh = pygalmesh.generate_from_array(ref, h, **kwargs)
+    assert np.array_equal(mesh.points, ref_mesh.points)
+    for cell_block, ref_block in zip(mesh.cells, ref_mesh.cells):
+        assert cell_block.type == ref_block.type
+        assert np.array_equal(cell_block.data, ref_block.data)
+
+
+def test_from_array_affine():
+    n = 50
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint8)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+
+    kwargs = {"max_cell_circumradius": 10 * min(h), "verbose": False}
+    mesh = pygalmesh.generate_from_array(vol, h, **kwargs)
+    # rotate by 90 degrees around z, mirror z, and move
+    affine = np.array(
+        [
+            [0.0, -1.0, 0.0, 1.0],
+            [1.0, 0.0, 0.0, 2.0],
+            [0.0, 0.0, -1.0, 3.0],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+    )
+    moved = pygalmesh.generate_from_array(vol, h, affine=affine, **kwargs)
+
+    assert np.allclose(moved.points, mesh.points @ affine[:3, :3].T + affine[:3, 3])
+    # the mirrored cells are turned back
+    tetra = mesh.get_cells_type("tetra")
+    assert np.array_equal(moved.get_cells_type("tetra")[:, [1, 0, 2, 3]], tetra)
+
+    with pytest.raises(ValueError):
+        pygalmesh.generate_from_array(
+            vol, h, affine=np.diag([2.0, 2.0, 2.0, 1.0]), **kwargs
+        )
+
+
+def test_from_array_output_selection():
+    n = 100
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint8)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+    vol[ii * ii + jj * jj + kk * kk < (0.5 * n) ** 2] = 2
+    kwargs = {
+        "max_cell_circumradius": 10 * min(h),
+        "max_facet_distance": min(h),
+        "verbose": False,
+    }
+
+    # the boundary of the inner eighth of a ball
+    surface = pygalmesh.generate_from_array(
+        vol, h, output="surface", output_subdomains=[2], **kwargs
+    )
+    assert [c.type for c in surface.cells] == ["triangle"]
+    assert set(surface.cell_data["medit:ref"][0]) == {2}
+    triangles = surface.get_cells_type("triangle")
+    area = sum(helpers.compute_triangle_areas(surface.points, triangles))
+    ref = 5.0 / 16.0 * np.pi * 0.5**2
+    assert abs(area - ref) < ref * 4.0e-2
+    # the triangles point outward, so the divergence theorem gives the volume
+    p0, p1, p2 = (surface.points[triangles[:, m]] for m in range(3))
+    vol2 = np.sum(np.cross(p1 - p0, p2 - p0) * p0) / 6.0
+    ref = 1.0 / 6.0 * np.pi * 0.5**3
+    assert abs(vol2 - ref) < ref * 4.0e-2
+
+    # the outer shell
+    shell = pygalmesh.generate_from_array(
+        vol, h, output="volume", output_subdomains=[1], **kwargs
+    )
+    assert [c.type for c in shell.cells] == ["tetra"]
+    assert set(shell.cell_data["medit:ref"][0]) == {1}
+    vol1 = sum(helpers.compute_volumes(shell.points, shell.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi * (1.0 - 0.5**3)
+    assert abs(vol1 - ref) < ref * 4.0e-2
+
+
+def test_from_array_output_selection_quality():
+    n = 40
+    h = (1.0 / n, 1.0 / n, 1.0 / n)
+    i = np.arange(n)
+    ii, jj, kk = np.meshgrid(i, i, i)
+    vol = np.zeros((n, n, n), dtype=np.uint8)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+    vol[ii * ii + jj * jj + kk * kk < (0.5 * n) ** 2] = 2
+    kwargs = {"max_cell_circumradius": 10 * min(h), "verbose": False, "quality": True}
+
+    # the quality measures are those of the tetrahedra that are returned
+    shell, quality = pygalmesh.generate_from_array(
+        vol, h, output_subdomains=[1], reorder="hilbert", **kwargs
+    )
+    tets = shell.get_cells_type("tetra")
+    ref = helpers.compute_volumes(shell.points, tets)
+    assert quality.volume.shape == (len(tets),)
+    assert np.all(np.abs(quality.volume - ref) < 1.0e-6 * (1.0 + ref))
+    assert sum(quality.radius_ratio_histogram) == len(tets)
+
+    surface, quality = pygalmesh.generate_from_array(vol, h, output="surface", **kwargs)
+    assert len(surface.get_cells_type("tetra")) == 0
+    assert len(quality.volume) == 0
+    assert sum(quality.radius_ratio_histogram) == 0
+
+
+def test_from_gray_array():
+    # signed distance to a sphere of radius 0.4, sampled coarsely
+    n = 40
+    x = np.linspace(-0.5, 0.5, n)
+    h = x[1] - x[0]
+    dist = np.sqrt(
+        x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2
+    )
+    vol = (dist - 0.4).astype(np.float32)
+
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        (h, h, h),
+        iso_value=0.0,
+        inside_is_less=True,
+        max_cell_circumradius=0.05,
+        max_facet_distance=0.1 * h,
+        verbose=False,
+    )
+
+    # the surface is resolved within the voxels
+    r = np.linalg.norm(mesh.points - 0.5, axis=1)
+    assert np.max(r) < 0.4 + 0.2 * h
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 4.0 / 3.0 * np.pi * 0.4**3
+    assert abs(vol - ref) < ref * 2.0e-2
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+from _pygalmesh import Ball
+
+import pygalmesh
+
+
+def _modules_after(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return set(out.stdout.split())
+
+
+def test_lazy_import():
+    # neither the extension module nor meshio is loaded by the import alone
+    modules = _modules_after("import pygalmesh")
+    assert "_pygalmesh" not in modules
+    assert "meshio" not in modules
+    assert "pygalmesh._cli" not in modules
+
+    # domains don't need meshio either
+    modules = _modules_after("import pygalmesh; pygalmesh.Ball")
+    assert "_pygalmesh" in modules
+    assert "meshio" not in modules
+
+    modules = _modules_after("import pygalmesh; pygalmesh.generate_mesh")
+    assert "meshio" in modules
+
+
+def test_public_names():
+    for name in pygalmesh.__all__:
+        assert getattr(pygalmesh, name) is not None
+    assert set(pygalmesh.__all__) <= set(dir(pygalmesh))
+    assert pygalmesh.Ball is Ball
@@ -35,6 +35,53 @@ def test_schwarz():
     return mesh
 
 
+def test_periodic_data():
+    class Schwarz(pygalmesh.DomainBase):
+        def __init__(self):
+            super().__init__()
+
+        def eval(self, x):
+            x2 = np.cos(x[0] * 2 * np.pi)
+            y2 = np.cos(x[1] * 2 * np.pi)
+            z2 = np.cos(x[2] * 2 * np.pi)
+            return x2 + y2 + z2
+
+    mesh, periodic = pygalmesh.generate_periodic_mesh(
+        Schwarz(),
+        [0, 0, 0, 1, 1, 1],
+        max_cell_circumradius=0.1,
+        min_facet_angle=30,
+        max_radius_surface_delaunay_ball=0.1,
+        max_facet_distance=0.05,
+        max_circumradius_edge_ratio=2.0,
+        verbose=False,
+        periodic_data=True,
+    )
+
+    points = periodic["points"]
+    cells = periodic["cells"]
+    offsets = periodic["offsets"]
+    num_points = len(points)
+    assert np.all(points >= 0.0) and np.all(points <= 1.0)
+    assert offsets.shape == (len(cells), 4, 3)
+    assert set(np.unique(offsets)) <= {0, 1}
+
+    # the unrolled mesh has the vertices at the positions given by the offsets
+    tetra = mesh.get_cells_type("tetra")
+    assert np.allclose(mesh.points[tetra], points[cells] + offsets)
+    assert np.allclose(mesh.points[:num_points], points)
+
+    # the copies are the vertices shifted by the pair offsets
+    node_pairs = periodic["node_pairs"]
+    assert len(node_pairs) == len(mesh.points) - num_points
+    assert np.all(node_pairs[:, 0] < num_points)
+    assert np.all(node_pairs[:, 1] >= num_points)
+    assert np.allclose(
+        mesh.points[node_pairs[:, 1]],
+        mesh.points[node_pairs[:, 0]] + periodic["node_pair_offsets"],
+    )
+
+
 if __name__ == "__main__":
     import meshio
 
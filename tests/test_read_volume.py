@@ -0,0 +1,239 @@
+import gzip
+import pathlib
+import shutil
+import struct
+import tempfile
+
+import helpers
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+def _ball(n, dtype):
+    x = np.arange(n)
+    r2 = x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2
+    vol = np.zeros((n, n, n), dtype=dtype)
+    vol[r2 < n**2] = 1
+    vol[r2 < (0.5 * n) ** 2] = 2
+    # make the axes distinguishable
+    vol[-1, 0, 0] = 3
+    return vol
+
+
+def _write_nifti(filename, vol, voxel_size, origin, quatern=None, scl=(0.0, 0.0)):
+    # with an sform, or with a qform from the quaternion (b, c, d, qfac)
+    header = bytearray(352)
+    struct.pack_into("<i", header, 0, 348)
+    struct.pack_into("<8h", header, 40, 3, *vol.shape, 1, 1, 1, 1)
+    struct.pack_into("<2h", header, 70, 512, 16)
+    qfac = 1.0 if quatern is None else quatern[3]
+    struct.pack_into("<8f", header, 76, qfac, *voxel_size, 1.0, 1.0, 1.0, 1.0)
+    struct.pack_into("<f", header, 108, 352.0)
+    struct.pack_into("<2f", header, 112, *scl)
+    if quatern is None:
+        struct.pack_into("<2h", header, 252, 0, 1)
+        struct.pack_into("<4f", header, 280, voxel_size[0], 0.0, 0.0, origin[0])
+        struct.pack_into("<4f", header, 296, 0.0, voxel_size[1], 0.0, origin[1])
+        struct.pack_into("<4f", header, 312, 0.0, 0.0, voxel_size[2], origin[2])
+    else:
+        struct.pack_into("<2h", header, 252, 1, 0)
+        struct.pack_into("<6f", header, 256, *quatern[:3], *origin)
+    header[344:348] = b"n+1\0"
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(vol.astype("<u2").tobytes(order="F"))
+
+
+def _write_nrrd(filename, vol, directions, origin):
+    header = "\n".join(
+        [
+            "NRRD0004",
+            "type: short",
+            "dimension: 3",
+            "space: left-posterior-superior",
+            "sizes: " + " ".join(str(n) for n in vol.shape),
+            "space directions: "
+            + " ".join("(" + ",".join(str(c) for c in d) + ")" for d in directions),
+            "endian: little",
+            "space origin: (" + ",".join(str(c) for c in origin) + ")",
+            "encoding: raw",
+        ]
+    )
+    with open(filename, "wb") as f:
+        f.write((header + "\n\n").encode())
+        f.write(vol.astype("<i2").tobytes(order="F"))
+
+
+def _gzip(filename, gz_filename):
+    with open(filename, "rb") as f_in, gzip.open(gz_filename, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+
+def test_inr():
+    vol = _ball(20, np.uint16)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.inr"
+        pygalmesh.save_inr(vol, (0.1, 0.2, 0.3), filename)
+        _gzip(filename, pathlib.Path(tmp) / "ball.inr.gz")
+
+        data, voxel_size, affine = pygalmesh.read_volume(filename)
+        assert isinstance(data, np.memmap)
+        assert np.array_equal(data, vol)
+        assert np.allclose(voxel_size, (0.1, 0.2, 0.3))
+        assert np.array_equal(affine, np.eye(4))
+        del data
+
+        data, voxel_size, _ = pygalmesh.read_volume(pathlib.Path(tmp) / "ball.inr.gz")
+        assert np.array_equal(data, vol)
+        assert np.allclose(voxel_size, (0.1, 0.2, 0.3))
+
+
+def test_nrrd():
+    vol = _ball(20, np.int16)
+    header = "\n".join(
+        [
+            "NRRD0004",
+            "# written by hand",
+            "type: short",
+            "dimension: 3",
+            "space: left-posterior-superior",
+            "sizes: 20 20 20",
+            "space directions: (0.5,0,0) (0,0.5,0) (0,0,2)",
+            "endian: big",
+            "space origin: (1,2,3)",
+        ]
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = pathlib.Path(tmp) / "ball.nrrd"
+        with open(raw, "wb") as f:
+            f.write((header + "\nencoding: raw\n\n").encode())
+            f.write(vol.astype(">i2").tobytes(order="F"))
+        compressed = pathlib.Path(tmp) / "ball_gz.nrrd"
+        with open(compressed, "wb") as f:
+            f.write((header + "\nencoding: gzip\n\n").encode())
+            f.write(gzip.compress(vol.astype(">i2").tobytes(order="F")))
+
+        for filename in [raw, compressed]:
+            data, voxel_size, affine = pygalmesh.read_volume(filename)
+            assert data.dtype == np.int16
+            assert np.array_equal(data, vol)
+            assert np.allclose(voxel_size, (0.5, 0.5, 2.0))
+            assert np.allclose(affine[:3, :3], np.eye(3))
+            assert np.allclose(affine[:3, 3], (1.0, 2.0, 3.0))
+            del data
+
+
+def test_nrrd_directions():
+    vol = _ball(10, np.int16)
+    # the first two axes swapped, the third one flipped
+    directions = [(0, 0.5, 0), (0.5, 0, 0), (0, 0, -2)]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.nrrd"
+        _write_nrrd(filename, vol, directions, (1, 2, 3))
+        data, voxel_size, affine = pygalmesh.read_volume(filename)
+        assert np.allclose(voxel_size, (0.5, 0.5, 2.0))
+        # voxel (i, j, k) is at origin + i * d0 + j * d1 + k * d2
+        ijk = np.array([1.0, 2.0, 3.0])
+        ref = np.array([1, 2, 3]) + ijk @ np.array(directions)
+        assert np.allclose(affine[:3, :3] @ (ijk * voxel_size) + affine[:3, 3], ref)
+        del data
+
+        _write_nrrd(filename, vol, [(0.5, 0.5, 0), (0, 0.5, 0), (0, 0, 2)], (0, 0, 0))
+        with pytest.raises(ValueError, match="orthogonal"):
+            pygalmesh.read_volume(filename)
+
+
+def test_nifti():
+    vol = _ball(20, np.uint16)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.nii"
+        _write_nifti(filename, vol, (0.1, 0.2, 0.3), (-1.0, 0.0, 1.0))
+        _gzip(filename, pathlib.Path(tmp) / "ball.nii.gz")
+
+        for f in [filename, pathlib.Path(tmp) / "ball.nii.gz"]:
+            data, voxel_size, affine = pygalmesh.read_volume(f)
+            assert np.array_equal(data, vol)
+            assert np.allclose(voxel_size, (0.1, 0.2, 0.3))
+            assert np.allclose(affine[:3, :3], np.eye(3))
+            assert np.allclose(affine[:3, 3], (-1.0, 0.0, 1.0))
+            del data
+
+
+def test_nifti_qform():
+    vol = _ball(10, np.uint16)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.nii"
+        # 90 degrees about z (b = c = 0, d = sin(45 degrees)), left-handed
+        d = np.sqrt(0.5)
+        _write_nifti(filename, vol, (0.1, 0.2, 0.3), (-1.0, 0.0, 1.0), (0, 0, d, -1))
+        data, voxel_size, affine = pygalmesh.read_volume(filename)
+        assert np.allclose(voxel_size, (0.1, 0.2, 0.3))
+        rotation = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, -1.0]]
+        assert np.allclose(affine[:3, :3], rotation, atol=1.0e-6)
+        assert np.allclose(affine[:3, 3], (-1.0, 0.0, 1.0))
+        del data
+
+
+def test_nifti_scaling():
+    vol = _ball(10, np.uint16)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.nii"
+        _write_nifti(filename, vol, (1.0, 1.0, 1.0), (0, 0, 0), scl=(2.0, 1.0))
+        data, _, _ = pygalmesh.read_volume(filename)
+        assert np.array_equal(data, 2 * vol + 1)
+
+
+def test_generate_from_nifti():
+    n = 50
+    h = 1.0 / n
+    vol = _ball(n, np.uint16)
+    vol[-1, 0, 0] = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "ball.nii"
+        _write_nifti(filename, vol, (h, h, h), (1.0, 0.0, 0.0))
+        mesh = pygalmesh.generate_from_inr(
+            filename,
+            max_cell_circumradius=10 * h,
+            max_facet_distance=h,
+            verbose=False,
+        )
+
+    # the mesh is placed at the origin of the image
+    assert abs(min(mesh.points[:, 0]) - 1.0) < 2 * h
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi
+    assert abs(vol - ref) < ref * 4.0e-2
+
+
+def test_generate_from_gray_nifti():
+    n = 30
+    h = 1.0 / n
+    x = (np.arange(n) - 0.5 * (n - 1)) * h
+    r = np.sqrt(x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / "distance.nii"
+        # the distances from the center, scaled to floats
+        _write_nifti(
+            filename, np.round(1000 * r), (h, h, h), (1.0, 0.0, 0.0), scl=(1.0e-3, 0.0)
+        )
+
+        # the values aren't labels
+        with pytest.raises(ValueError):
+            pygalmesh.generate_from_inr(filename, verbose=False)
+
+        mesh = pygalmesh.generate_from_inr(
+            filename,
+            iso_value=0.4,
+            inside_is_less=True,
+            max_cell_circumradius=0.1,
+            max_facet_distance=0.5 * h,
+            verbose=False,
+        )
+
+    center = 1.0 + 0.5 * (n - 1) * h
+    assert abs(min(mesh.points[:, 0]) - (center - 0.4)) < 2 * h
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 4.0 / 3.0 * np.pi * 0.4**3
+    assert abs(vol - ref) < ref * 4.0e-2
@@ -54,3 +54,23 @@ def test_remesh_surface():
     vol = sum(triangle_areas)
     ref = 1.2357989593759846
     assert abs(vol - ref) < ref * 1.0e-3, vol
+
+
+def test_remesh_surface_from_arrays():
+    this_dir = pathlib.Path(__file__).resolve().parent
+    surface = meshio.read(this_dir / "meshes" / "elephant.vtu")
+    mesh = pygalmesh.remesh_surface(
+        (surface.points, surface.get_cells_type("triangle")),
+        max_edge_size_at_feature_edges=0.025,
+        min_facet_angle=25,
+        max_radius_surface_delaunay_ball=0.1,
+        max_facet_distance=0.001,
+        verbose=False,
+    )
+
+    triangle_areas = helpers.compute_triangle_areas(
+        mesh.points, mesh.get_cells_type("triangle")
+    )
+    vol = sum(triangle_areas)
+    ref = 1.2357989593759846
+    assert abs(vol - ref) < ref * 1.0e-3, vol
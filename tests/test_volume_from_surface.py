@@ -3,6 +3,8 @@ import tempfile
 
 import helpers
 import meshio
+import numpy as np
+import pytest
 
 import pygalmesh
 
@@ -51,3 +53,138 @@ def test_volume_from_surface():
 
     vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
     assert abs(vol - 0.044164693065) < (1.0 + vol) * tol
+
+
+def test_volume_from_surface_domain():
+    this_dir = pathlib.Path(__file__).resolve().parent
+    surface = meshio.read(this_dir / "meshes" / "elephant.vtu")
+    domain = pygalmesh.SurfaceMeshDomain(
+        surface.points, surface.get_cells_type("triangle")
+    )
+    assert domain.number_of_vertices() == len(surface.points)
+    assert domain.number_of_facets() == len(surface.get_cells_type("triangle"))
+
+    # the domain is built once and reused for several meshing runs
+    vols = []
+    for max_facet_distance in [0.008, 0.004]:
+        mesh = pygalmesh.generate_volume_mesh_from_surface_mesh(
+            domain,
+            min_facet_angle=0.5,
+            max_radius_surface_delaunay_ball=0.15,
+            max_facet_distance=max_facet_distance,
+            max_circumradius_edge_ratio=3.0,
+            verbose=False,
+        )
+        vols.append(
+            sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+        )
+
+    tol = 2.0e-2
+    for vol in vols:
+        assert abs(vol - 0.044164693065) < (1.0 + vol) * tol
+
+
+def test_volume_from_surface_features():
+    # unit cube, outward-oriented triangles
+    points = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 1.0],
+            [1.0, 1.0, 1.0],
+            [0.0, 1.0, 1.0],
+        ]
+    )
+    triangles = np.array(
+        [
+            [0, 2, 1],
+            [0, 3, 2],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 1, 5],
+            [0, 5, 4],
+            [1, 2, 6],
+            [1, 6, 5],
+            [2, 3, 7],
+            [2, 7, 6],
+            [3, 0, 4],
+            [3, 4, 7],
+        ]
+    )
+    mesh = pygalmesh.generate_volume_mesh_from_surface_mesh(
+        (points, triangles),
+        max_edge_size_at_feature_edges=0.2,
+        max_radius_surface_delaunay_ball=0.2,
+        max_cell_circumradius=0.2,
+        detect_features=True,
+        verbose=False,
+    )
+
+    # with protected edges and corners, the cube is reproduced exactly
+    tol = 1.0e-12
+    assert np.all(np.abs(np.min(mesh.points, axis=0)) < tol)
+    assert np.all(np.abs(np.max(mesh.points, axis=0) - 1.0) < tol)
+
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    assert abs(vol - 1.0) < 1.0e-10
+
+
+def test_volume_from_surface_multi_domain():
+    # two unit cubes side by side, outward-oriented triangles
+    points = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 1.0],
+            [1.0, 1.0, 1.0],
+            [0.0, 1.0, 1.0],
+        ]
+    )
+    triangles = np.array(
+        [
+            [0, 2, 1],
+            [0, 3, 2],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 1, 5],
+            [0, 5, 4],
+            [1, 2, 6],
+            [1, 6, 5],
+            [2, 3, 7],
+            [2, 7, 6],
+            [3, 0, 4],
+            [3, 4, 7],
+        ]
+    )
+    left = pygalmesh.SurfaceMeshDomain(points, triangles)
+    right = pygalmesh.SurfaceMeshDomain(points + [1.0, 0.0, 0.0], triangles)
+    domain = pygalmesh.MultiDomain([(left, 1, 0.1), (right, 2, 0.3)])
+    assert domain.label([0.5, 0.5, 0.5]) == 1
+    assert domain.label([1.5, 0.5, 0.5]) == 2
+    assert domain.label([2.5, 0.5, 0.5]) == 0
+
+    mesh = pygalmesh.generate_volume_mesh_from_surface_mesh(
+        domain,
+        max_radius_surface_delaunay_ball=0.2,
+        max_facet_distance=0.01,
+        verbose=False,
+    )
+
+    labels = mesh.get_cell_data("medit:ref", "tetra")
+    assert set(labels) == {1, 2}
+    vols = helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra"))
+    for label in [1, 2]:
+        assert abs(sum(vols[labels == label]) - 1.0) < 5.0e-2
+    assert np.mean(vols[labels == 1]) < np.mean(vols[labels == 2])
+
+    for kwargs in [{"reorient": True}, {"feature_angle": 30.0}]:
+        with pytest.raises(ValueError):
+            pygalmesh.generate_volume_mesh_from_surface_mesh(
+                domain, max_radius_surface_delaunay_ball=0.2, verbose=False, **kwargs
+            )
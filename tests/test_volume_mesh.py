@@ -1,5 +1,6 @@
 import helpers
 import numpy as np
+import pytest
 
 import pygalmesh
 
@@ -59,6 +60,76 @@ def test_balls_union():
     assert abs(vol - ref_vol) < 0.1
 
 
+def test_balls_union_detect_features():
+    radius = 1.0
+    displacement = 0.5
+    s0 = pygalmesh.Ball([displacement, 0, 0], radius)
+    s1 = pygalmesh.Ball([-displacement, 0, 0], radius)
+    u = pygalmesh.Union([s0, s1])
+
+    # the intersection circle is found without passing it in extra_feature_edges
+    mesh = pygalmesh.generate_mesh(
+        u,
+        max_cell_circumradius=0.15,
+        max_edge_size_at_feature_edges=0.1,
+        detect_features=True,
+        verbose=False,
+    )
+
+    # the crease is protected, so there are mesh points right on it
+    a = np.sqrt(radius**2 - displacement**2)
+    r = np.sqrt(mesh.points[:, 1] ** 2 + mesh.points[:, 2] ** 2)
+    is_on_crease = (np.abs(mesh.points[:, 0]) < 1.0e-10) & (np.abs(r - a) < 1.0e-2)
+    assert np.sum(is_on_crease) > np.pi * a / 0.1
+
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    h = radius - displacement
+    ref_vol = 2 * (
+        4.0 / 3.0 * np.pi * radius**3 - h * np.pi / 6.0 * (3 * a**2 + h**2)
+    )
+    assert abs(vol - ref_vol) < 0.1
+
+
+def test_detect_features_too_fine():
+    u = pygalmesh.Union(
+        [pygalmesh.Ball([0.5, 0, 0], 1.0), pygalmesh.Ball([-0.5, 0, 0], 1.0)]
+    )
+    # the search grid for the intersection curves would need too many cells
+    with pytest.raises(ValueError, match="max_edge_size_at_feature_edges"):
+        pygalmesh.generate_mesh(
+            u,
+            max_cell_circumradius=0.15,
+            max_edge_size_at_feature_edges=1.0e-3,
+            detect_features=True,
+            verbose=False,
+        )
+
+
+def test_detect_features_size():
+    u = pygalmesh.Union(
+        [pygalmesh.Ball([0.5, 0, 0], 1.0), pygalmesh.Ball([-0.5, 0, 0], 1.0)]
+    )
+    # ints are sizes, too
+    mesh = pygalmesh.generate_mesh(
+        u,
+        max_cell_circumradius=1,
+        max_edge_size_at_feature_edges=1,
+        detect_features=True,
+        verbose=False,
+    )
+    assert len(mesh.get_cells_type("tetra")) > 0
+
+    for size in [0, -1.0, True, lambda x: 0.1]:
+        with pytest.raises(ValueError, match="max_edge_size_at_feature_edges"):
+            pygalmesh.generate_mesh(
+                u,
+                max_cell_circumradius=1,
+                max_edge_size_at_feature_edges=size,
+                detect_features=True,
+                verbose=False,
+            )
+
+
 def test_balls_intersection():
     radius = 1.0
     displacement = 0.5
@@ -610,6 +681,211 @@ def test_ball_with_sizing_field():
     assert abs(vol - 4.0 / 3.0 * np.pi) < 0.15
 
 
+def test_quality():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    mesh, quality = pygalmesh.generate_mesh(
+        s, max_cell_circumradius=0.2, verbose=False, quality=True
+    )
+
+    tets = mesh.get_cells_type("tetra")
+    for arr in [
+        quality.min_dihedral_angle,
+        quality.max_dihedral_angle,
+        quality.radius_ratio,
+        quality.volume,
+    ]:
+        assert arr.dtype == np.float32
+        assert arr.shape == (len(tets),)
+
+    assert np.all(quality.min_dihedral_angle > 0.0)
+    assert np.all(quality.min_dihedral_angle <= quality.max_dihedral_angle)
+    assert np.all(quality.max_dihedral_angle < 180.0)
+    assert np.all(quality.radius_ratio > 0.0)
+    assert np.all(quality.radius_ratio <= 1.0 + 1.0e-6)
+
+    ref = helpers.compute_volumes(mesh.points, tets)
+    assert np.all(np.abs(quality.volume - ref) < 1.0e-6 * (1.0 + ref))
+
+    assert len(quality.min_dihedral_angle_histogram) == 36
+    assert len(quality.radius_ratio_histogram) == 20
+    assert sum(quality.min_dihedral_angle_histogram) == len(tets)
+    assert sum(quality.max_dihedral_angle_histogram) == len(tets)
+    assert sum(quality.radius_ratio_histogram) == len(tets)
+
+
+def test_progress():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+
+    events = []
+    mesh = pygalmesh.generate_mesh(
+        s, max_cell_circumradius=0.2, verbose=False, progress=events.append
+    )
+    phases = [event["phase"] for event in events]
+    assert phases[0] == "edges"
+    # the refinement is followed through the criteria
+    assert phases.index("facets") < phases.index("cells") < phases.index("perturb")
+    assert all(
+        event["num_vertices"] > 0
+        for event in events
+        if event["phase"] in ["facets", "cells"]
+    )
+    assert "perturb" in phases
+    assert "exude" in phases
+    assert phases[-1] == "done"
+    assert events[-1]["num_vertices"] > 0
+    assert events[-1]["num_cells"] == len(mesh.get_cells_type("tetra"))
+    elapsed = [event["elapsed"] for event in events]
+    assert elapsed == sorted(elapsed)
+
+    # cancel once the volume is refined
+    def cancel(event):
+        return event["phase"] != "perturb"
+
+    with pytest.raises(pygalmesh.MeshingCancelled):
+        pygalmesh.generate_mesh(
+            s, max_cell_circumradius=0.2, verbose=False, progress=cancel
+        )
+
+
+def test_stats():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    mesh, stats = pygalmesh.generate_mesh(
+        s,
+        max_cell_circumradius=lambda x: 0.2,
+        verbose=False,
+        stats=True,
+    )
+
+    for phase in ["setup", "edges", "facets", "cells", "perturb", "exude"]:
+        assert stats["phase_times"][phase] >= 0.0
+    assert stats["domain_evals"] > 0
+    assert stats["domain_eval_time"] > 0.0
+    assert stats["sizing_field_evals"] > 0
+    # the sizing field is a Python function
+    assert stats["python_calls"] >= stats["sizing_field_evals"]
+    assert stats["num_cells"] == len(mesh.get_cells_type("tetra"))
+    assert stats["max_num_vertices"] >= stats["num_vertices"] > 0
+    assert stats["total_time"] >= sum(stats["phase_times"].values())
+
+
+def test_multi_domain():
+    inner = pygalmesh.Ball([0.0, 0.0, 0.0], 0.5)
+    outer = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    domain = pygalmesh.MultiDomain([(inner, 2, 0.05, 0.05), (outer, 1, 0.3)])
+    assert domain.label([0.0, 0.0, 0.0]) == 2
+    assert domain.label([0.7, 0.0, 0.0]) == 1
+    assert domain.label([1.5, 0.0, 0.0]) == 0
+
+    mesh = pygalmesh.generate_mesh(
+        domain,
+        max_radius_surface_delaunay_ball=0.3,
+        max_facet_distance=0.01,
+        verbose=False,
+    )
+
+    tets = mesh.get_cells_type("tetra")
+    labels = mesh.get_cell_data("medit:ref", "tetra")
+    assert set(labels) == {1, 2}
+    vols = helpers.compute_volumes(mesh.points, tets)
+    ref = 4.0 / 3.0 * np.pi * 0.5**3
+    assert abs(sum(vols[labels == 2]) - ref) < 0.05 * ref
+    ref = 4.0 / 3.0 * np.pi - ref
+    assert abs(sum(vols[labels == 1]) - ref) < 0.05 * ref
+    # the inner ball is meshed much finer
+    assert np.mean(vols[labels == 2]) < 0.2 * np.mean(vols[labels == 1])
+
+    with pytest.raises(ValueError):
+        pygalmesh.MultiDomain([(inner, 0)])
+    with pytest.raises(ValueError):
+        pygalmesh.MultiDomain([(inner, 1, 0.1), (outer, 1, 0.2)])
+
+
+def test_multi_domain_detect_features():
+    # two overlapping balls inside a larger one; they meet in a circle inside the domain
+    a = pygalmesh.Ball([0.0, 0.0, 0.0], 0.5)
+    b = pygalmesh.Ball([0.5, 0.0, 0.0], 0.5)
+    outer = pygalmesh.Ball([0.0, 0.0, 0.0], 1.5)
+    domain = pygalmesh.MultiDomain([(a, 2), (b, 3), (outer, 1)])
+    mesh = pygalmesh.generate_mesh(
+        domain,
+        max_cell_circumradius=0.2,
+        max_edge_size_at_feature_edges=0.1,
+        detect_features=True,
+        verbose=False,
+    )
+
+    # the interface crease is protected, so there are mesh points right on it
+    r = np.sqrt(mesh.points[:, 1] ** 2 + mesh.points[:, 2] ** 2)
+    is_on_crease = (np.abs(mesh.points[:, 0] - 0.25) < 1.0e-6) & (
+        np.abs(r - np.sqrt(0.1875)) < 1.0e-2
+    )
+    assert np.sum(is_on_crease) > 2 * np.pi * np.sqrt(0.1875) / 0.2
+
+
+def test_dtypes():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    ref = pygalmesh.generate_mesh(s, max_cell_circumradius=0.2, verbose=False)
+    mesh = pygalmesh.generate_mesh(
+        s,
+        max_cell_circumradius=0.2,
+        verbose=False,
+        dtype=np.float32,
+        index_dtype=np.uint32,
+    )
+    assert mesh.points.dtype == np.float32
+    assert np.allclose(mesh.points, ref.points, atol=1.0e-6)
+    for cell_block, ref_block in zip(mesh.cells, ref.cells):
+        assert cell_block.data.dtype == np.uint32
+        assert np.array_equal(cell_block.data, ref_block.data)
+
+    # too many points for int8 indices
+    with pytest.raises(ValueError):
+        pygalmesh.generate_mesh(
+            s, max_cell_circumradius=0.2, verbose=False, index_dtype=np.int8
+        )
+    with pytest.raises(ValueError):
+        pygalmesh.generate_mesh(
+            s, max_cell_circumradius=0.2, verbose=False, dtype=np.int32
+        )
+
+
+def test_reorder():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    ref = pygalmesh.generate_mesh(s, max_cell_circumradius=0.1, verbose=False)
+
+    def spread(mesh):
+        # of the point indices of the cells
+        tets = mesh.get_cells_type("tetra")
+        return np.max(tets, axis=1) - np.min(tets, axis=1)
+
+    ref_volume = sum(helpers.compute_volumes(ref.points, ref.get_cells_type("tetra")))
+    for reorder in ["hilbert", "rcm"]:
+        mesh, quality = pygalmesh.generate_mesh(
+            s,
+            max_cell_circumradius=0.1,
+            verbose=False,
+            quality=True,
+            reorder=reorder,
+        )
+        assert mesh.points.shape == ref.points.shape
+        tets = mesh.get_cells_type("tetra")
+        assert tets.shape == ref.get_cells_type("tetra").shape
+        # the cells are sorted by their smallest point index
+        assert np.all(np.diff(np.min(tets, axis=1)) >= 0)
+        # ... and their quality measures with them
+        vols = helpers.compute_volumes(mesh.points, tets)
+        assert np.all(np.abs(quality.volume - vols) < 1.0e-6 * (1.0 + vols))
+        assert abs(sum(vols) - ref_volume) < 1.0e-10 * ref_volume
+        assert np.mean(spread(mesh)) < np.mean(spread(ref))
+        if reorder == "rcm":
+            assert np.max(spread(mesh)) < np.max(spread(ref))
+
+    with pytest.raises(ValueError):
+        pygalmesh.generate_mesh(
+            s, max_cell_circumradius=0.1, verbose=False, reorder="random"
+        )
+
+
 if __name__ == "__main__":
     test_ball()
     # test_ball_with_sizing_field()